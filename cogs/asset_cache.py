@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+from collections import OrderedDict
+
+import aiohttp
+from PIL import Image, ImageFont
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSET_DIR = os.path.join(BASE_DIR, "data", "assets")
+INDEX_FILE = os.path.join(ASSET_DIR, "index.json")
+
+POPPINS_BOLD = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf"
+POPPINS_REGULAR = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf"
+ZAHRAAA_FONT = "https://github.com/MFarelS/RajinNulis-BOT/raw/master/font/Zahraaa.ttf"
+MAGERNULIS_IMAGE = "https://github.com/MFarelS/RajinNulis-BOT/raw/master/MFarelSZ/Farelll/magernulis1.jpg"
+
+# Aset statis yang dipakai renderer kartu; diunduh sekali saat startup.
+PREFETCH_URLS = [POPPINS_BOLD, POPPINS_REGULAR, ZAHRAAA_FONT, MAGERNULIS_IMAGE]
+
+DOWNLOAD_TIMEOUT = 30
+DISCORD_ASSET_CACHE_SIZE = 256
+
+_index = None
+_blobs = {}
+_fonts = {}
+_images = {}
+_inflight = {}
+_discord_assets = OrderedDict()
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                _index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _index = {}
+    return _index
+
+
+def _blob_path(digest):
+    return os.path.join(ASSET_DIR, digest[:2], digest)
+
+
+def _store_blob(url, data):
+    # Disimpan berdasarkan sha256 isi file; index hanya memetakan URL -> digest.
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    index = _load_index()
+    index[url] = digest
+    tmp_index = INDEX_FILE + ".tmp"
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=4)
+    os.replace(tmp_index, INDEX_FILE)
+
+
+def _read_blob(url):
+    global _index
+    digest = _load_index().get(url)
+    if not digest:
+        # Index bisa saja baru ditulis proses lain (misal prefetch di proses bot utama).
+        _index = None
+        digest = _load_index().get(url)
+        if not digest:
+            return None
+    try:
+        with open(_blob_path(digest), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if hashlib.sha256(data).hexdigest() != digest:
+        log.warning(f"Aset {url} di disk tidak cocok dengan digest, diunduh ulang.")
+        return None
+    return data
+
+
+def get_cached_bytes(url):
+    """Isi aset dari memori/disk tanpa akses jaringan, atau None jika belum pernah diunduh."""
+    data = _blobs.get(url)
+    if data is None:
+        data = _read_blob(url)
+        if data is not None:
+            _blobs[url] = data
+    return data
+
+
+async def _download(url):
+    timeout = aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+
+async def fetch(url):
+    """Ambil aset dari cache, atau unduh sekali (request paralel untuk URL yang sama digabung)."""
+    data = _blobs.get(url)
+    if data is not None:
+        return data
+    data = await asyncio.to_thread(get_cached_bytes, url)
+    if data is not None:
+        return data
+
+    task = _inflight.get(url)
+    if task is None:
+        task = _inflight[url] = asyncio.ensure_future(_download(url))
+    try:
+        data = await asyncio.shield(task)
+    finally:
+        if task.done():
+            _inflight.pop(url, None)
+    if _blobs.get(url) is None:
+        _blobs[url] = data
+        await asyncio.to_thread(_store_blob, url, data)
+    return data
+
+
+async def prefetch(urls=PREFETCH_URLS):
+    """Pastikan semua aset statis ada di cache. Dipanggil di background saat startup."""
+    results = await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            log.warning(f"Gagal prefetch aset {url}: {result}")
+    log.info(f"Prefetch aset selesai: {sum(1 for r in results if not isinstance(r, Exception))}/{len(urls)} tersedia.")
+
+
+def _schedule_fetch(url):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if url not in _inflight:
+        loop.create_task(prefetch([url]))
+
+
+def get_font(url, size):
+    """
+    ImageFont dari cache memori, key (url, size). Tidak pernah mengakses jaringan:
+    jika font belum ter-cache, pakai font default dan jadwalkan unduhan di background.
+    """
+    key = (url, size)
+    font = _fonts.get(key)
+    if font is not None:
+        return font
+    data = get_cached_bytes(url)
+    if data is None:
+        _schedule_fetch(url)
+        return ImageFont.load_default()
+    font = _fonts[key] = ImageFont.truetype(io.BytesIO(data), size)
+    return font
+
+
+def get_image(url):
+    """Salinan gambar dari cache (aman untuk digambar ulang), atau None jika belum ter-cache."""
+    img = _images.get(url)
+    if img is None:
+        data = get_cached_bytes(url)
+        if data is None:
+            _schedule_fetch(url)
+            return None
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        _images[url] = img
+    return img.copy()
+
+
+async def read_discord_asset(asset):
+    """
+    Baca avatar/ikon Discord dengan cache LRU di memori. URL asset Discord
+    memuat hash kontennya, jadi key URL otomatis berganti saat gambar diganti.
+    """
+    key = str(asset.url)
+    data = _discord_assets.get(key)
+    if data is not None:
+        _discord_assets.move_to_end(key)
+        return data
+    data = await asset.read()
+    _discord_assets[key] = data
+    while len(_discord_assets) > DISCORD_ASSET_CACHE_SIZE:
+        _discord_assets.popitem(last=False)
+    return data
@@ -0,0 +1,71 @@
+EQ_BANDS = (31, 62, 125, 250, 500, 1000, 2000, 4000, 8000, 16000)
+MAX_EQ_GAIN = 12
+MAX_BASS_GAIN = 20
+NIGHTCORE_RATE = 1.25
+SAMPLE_RATE = 48000
+
+
+def default_settings():
+    return {"bands": {}, "bass": 0, "nightcore": False, "normalize": False}
+
+
+def normalize_settings(raw):
+    """Rapikan pengaturan efek dari equalizer.json (key band jadi string, nilai dibatasi)."""
+    settings = default_settings()
+    if not isinstance(raw, dict):
+        return settings
+    for freq, gain in (raw.get("bands") or {}).items():
+        try:
+            freq, gain = int(freq), float(gain)
+        except (TypeError, ValueError):
+            continue
+        if freq in EQ_BANDS and gain:
+            settings["bands"][str(freq)] = max(-MAX_EQ_GAIN, min(MAX_EQ_GAIN, gain))
+    try:
+        settings["bass"] = max(0, min(MAX_BASS_GAIN, float(raw.get("bass") or 0)))
+    except (TypeError, ValueError):
+        pass
+    settings["nightcore"] = bool(raw.get("nightcore"))
+    settings["normalize"] = bool(raw.get("normalize"))
+    return settings
+
+
+def build_filter_chain(settings):
+    """String filter ffmpeg untuk -af, atau None jika tidak ada efek aktif."""
+    if not settings:
+        return None
+    filters = [
+        f"equalizer=f={freq}:t=o:w=1:g={gain:g}"
+        for freq, gain in sorted(settings.get("bands", {}).items(), key=lambda item: int(item[0]))
+        if gain
+    ]
+    if settings.get("bass"):
+        filters.append(f"bass=g={settings['bass']:g}:f=110:w=0.6")
+    if settings.get("nightcore"):
+        # Naikkan tempo dan pitch sekaligus dengan memutar sampel lebih cepat.
+        filters.append(f"aresample={SAMPLE_RATE},asetrate={int(SAMPLE_RATE * NIGHTCORE_RATE)},aresample={SAMPLE_RATE}")
+    if settings.get("normalize"):
+        filters.append("dynaudnorm=f=150:g=15")
+    return ",".join(filters) or None
+
+
+def playback_speed(settings):
+    """Kecepatan putar relatif (dipakai untuk menghitung posisi lagu saat efek diganti)."""
+    return NIGHTCORE_RATE if settings and settings.get("nightcore") else 1.0
+
+
+def describe(settings):
+    parts = []
+    bands = settings.get("bands", {})
+    if bands:
+        parts.append("EQ " + ", ".join(
+            f"{int(freq) // 1000}k:{gain:+g}" if int(freq) >= 1000 else f"{freq}:{gain:+g}"
+            for freq, gain in sorted(bands.items(), key=lambda item: int(item[0]))
+        ))
+    if settings.get("bass"):
+        parts.append(f"Bass boost +{settings['bass']:g} dB")
+    if settings.get("nightcore"):
+        parts.append("Nightcore")
+    if settings.get("normalize"):
+        parts.append("Normalisasi")
+    return " • ".join(parts) or "Tidak ada efek aktif"
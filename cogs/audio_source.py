@@ -0,0 +1,139 @@
+import discord
+
+# Volume 100% tidak perlu diskalakan, jadi audio bisa langsung dikirim sebagai Opus
+# tanpa decode ke PCM di Python. Volume lain memakai jalur PCM; efek (-af) selalu
+# dijalankan di dalam proses ffmpeg.
+PASSTHROUGH_VOLUME = 1.0
+
+
+def ffmpeg_options(base, start=0, options=None, audio_filter=None):
+    """Salin opsi ffmpeg dasar, tambahkan seek (-ss), ganti 'options' jika diminta, dan pasang -af."""
+    result = dict(base)
+    if start:
+        result['before_options'] = f"{result.get('before_options', '')} -ss {int(start)}".strip()
+    if options is not None:
+        result['options'] = options
+    if audio_filter:
+        result['options'] = f"{result.get('options', '')} -af {audio_filter}".strip()
+    return result
+
+
+class OpusPassthroughSource(discord.FFmpegOpusAudio):
+    """
+    Sumber audio Opus untuk lagu dengan volume 100%. Stream Opus (WebM) diteruskan
+    apa adanya oleh ffmpeg (-c:a copy); format lain, atau jika ada filter efek, di-encode
+    ke Opus oleh ffmpeg, sehingga discord.py tidak perlu decode PCM dan encode ulang.
+    """
+
+    def __init__(self, source, *, data, **kwargs):
+        super().__init__(source, **kwargs)
+        self.data = data
+        self.title = data.get('title')
+        self.url = data.get('url')
+        self.thumbnail = data.get('thumbnail')
+        self.webpage_url = data.get('webpage_url')
+        self.duration = data.get('duration')
+        self.uploader = data.get('uploader')
+        self.requester = data.get('requester', 'N/A')
+
+    @classmethod
+    async def create(cls, filename, data, options, audio_filter=None):
+        # Codec dari hasil yt-dlp dipakai langsung agar tidak perlu menjalankan ffprobe
+        # di sela pergantian lagu; probe hanya jika codec tidak diketahui.
+        options = ffmpeg_options(options, options='-vn', audio_filter=audio_filter)
+        if audio_filter:
+            # Tanpa codec: discord.py memetakan 'opus'/'libopus' ke -c:a copy, dan stream
+            # copy tidak bisa difilter. None berarti encode ulang dengan libopus.
+            return cls(filename, data=data, bitrate=128, **options)
+        acodec = data.get('acodec')
+        if acodec and acodec != 'none':
+            bitrate = int(min(data.get('abr') or 128, 512))
+            return cls(filename, data=data, codec=acodec, bitrate=bitrate, **options)
+        return await cls.from_probe(filename, data=data, method='fallback', **options)
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import io
+    import resource
+    import time
+    import types
+
+    parser = argparse.ArgumentParser(description="Benchmark CPU per stream: jalur PCM vs Opus passthrough.")
+    parser.add_argument("source", nargs="?", help="file audio lokal atau URL stream (misal hasil yt-dlp -g)")
+    parser.add_argument("--seconds", type=int, default=60, help="panjang audio yang diproses per mode")
+    parser.add_argument("--ffmpeg", default="ffmpeg")
+    parser.add_argument("--check", action="store_true", help="hanya periksa argumen ffmpeg sumber Opus dengan filter efek")
+    args = parser.parse_args()
+
+    class ArgsOnlySource(OpusPassthroughSource):
+        # Tangkap argumen ffmpeg tanpa menjalankan prosesnya.
+        def _spawn_process(self, args, **subprocess_kwargs):
+            self.ffmpeg_args = args
+            return types.SimpleNamespace(stdout=io.BytesIO())
+
+        def cleanup(self):
+            pass
+
+    def check_filtered_args():
+        base = {'executable': args.ffmpeg, 'before_options': '-nostdin', 'options': '-vn'}
+        for acodec in ('opus', 'aac', None):
+            data = {'acodec': acodec, 'abr': 160}
+            source = asyncio.run(ArgsOnlySource.create("input.webm", data, base, audio_filter="bass=g=10"))
+            ffmpeg_args = source.ffmpeg_args
+            assert '-af' in ffmpeg_args, ffmpeg_args
+            assert 'copy' not in ffmpeg_args, f"stream copy tidak bisa difilter: {ffmpeg_args}"
+        print("OK: sumber dengan filter efek di-encode ulang, tanpa -c:a copy.")
+
+    if args.check:
+        check_filtered_args()
+        raise SystemExit
+    if not args.source:
+        parser.error("source wajib diisi kecuali dengan --check")
+
+    if not discord.opus.is_loaded():
+        discord.opus._load_default()
+    base = {'executable': args.ffmpeg, 'before_options': '-nostdin', 'options': f'-vn -t {args.seconds}'}
+
+    def children_cpu():
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return usage.ru_utime + usage.ru_stime
+
+    def drain(source, encode):
+        # Baca frame 20 ms secepat mungkin, meniru kerja AudioPlayer tanpa sleep.
+        encoder = discord.opus.Encoder() if encode else None
+        frames = 0
+        while True:
+            data = source.read()
+            if not data:
+                break
+            if encoder is not None:
+                encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+            frames += 1
+        source.cleanup()
+        return frames
+
+    async def run(name, make_source, encode):
+        source = await make_source()
+        cpu_py, cpu_ff, wall = time.process_time(), children_cpu(), time.perf_counter()
+        frames = drain(source, encode)
+        cpu_py, cpu_ff = time.process_time() - cpu_py, children_cpu() - cpu_ff
+        audio_seconds = frames * 0.02
+        per_minute = (cpu_py + cpu_ff) / audio_seconds * 60 if audio_seconds else 0
+        streams = 60 / per_minute if per_minute else float('inf')
+        print(f"{name:<18} {audio_seconds:6.1f} s audio | python {cpu_py:5.2f} s, ffmpeg {cpu_ff:5.2f} s | "
+              f"{per_minute:5.2f} CPU-detik per menit audio | ~{streams:.0f} stream per core "
+              f"(wall {time.perf_counter() - wall:.1f} s)")
+
+    async def main():
+        async def pcm():
+            return discord.PCMVolumeTransformer(discord.FFmpegPCMAudio(args.source, **base), volume=0.8)
+
+        async def opus():
+            return await discord.FFmpegOpusAudio.from_probe(args.source, method='fallback', **base)
+
+        await run("PCM + volume", pcm, encode=True)
+        await run("Opus passthrough", opus, encode=False)
+
+    asyncio.run(main())
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import pickle
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+from pilmoji import Pilmoji
+
+from cogs.asset_cache import get_cached_bytes, get_font, POPPINS_BOLD, POPPINS_REGULAR
+
+log = logging.getLogger(__name__)
+
+MAX_WORKERS = 2
+RESULT_CACHE_SIZE = 128
+LATENCY_WINDOW = 200
+
+
+def _circle_mask(size):
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    return mask
+
+
+def render_rank_card(data):
+    width = 1000
+    height = 330
+
+    background = Image.new('RGBA', (width, height), (20, 22, 25, 255))
+    draw = ImageDraw.Draw(background)
+
+    draw.polygon([(0, 0), (1000, 0), (1000, 330), (0, 330)], fill=(15, 15, 20, 255))
+    draw.polygon([(0, 330), (320, 330), (450, 0), (0, 0)], fill=(30, 35, 45, 255))
+    draw.line((448, 0, 318, 330), fill=(0, 255, 200, 255), width=6)
+
+    draw.ellipse((40, 55, 260, 275), outline=(0, 255, 200, 180), width=4)
+    draw.ellipse((25, 40, 275, 290), outline=(255, 255, 255, 40), width=1)
+    draw.line((150, 10, 150, 45), fill=(0, 255, 200, 255), width=3)
+    draw.line((150, 285, 150, 320), fill=(0, 255, 200, 255), width=3)
+    draw.line((5, 165, 40, 165), fill=(0, 255, 200, 255), width=3)
+    draw.line((260, 165, 295, 165), fill=(0, 255, 200, 255), width=3)
+
+    avatar_img = Image.open(BytesIO(data["avatar"])).convert("RGBA")
+    avatar_img = avatar_img.resize((200, 200))
+    background.paste(avatar_img, (50, 65), _circle_mask(200))
+
+    font_title = get_font(POPPINS_BOLD, 45)
+    font_rank = get_font(POPPINS_BOLD, 65)
+    font_subtitle = get_font(POPPINS_BOLD, 35)
+    font_text = get_font(POPPINS_REGULAR, 22)
+    font_small = get_font(POPPINS_REGULAR, 18)
+
+    guild_name = data["guild_name"]
+    if data.get("guild_icon"):
+        try:
+            g_img = Image.open(BytesIO(data["guild_icon"])).convert("RGBA").resize((35, 35))
+            background.paste(g_img, (480, 45), _circle_mask(35))
+            draw.text((525, 50), f"{guild_name}", font=font_small, fill=(180, 180, 180, 255))
+        except Exception:
+            draw.text((480, 50), f"Server: {guild_name}", font=font_small, fill=(180, 180, 180, 255))
+    else:
+        draw.text((480, 50), f"Server: {guild_name}", font=font_small, fill=(180, 180, 180, 255))
+
+    draw.text((480, 85), f"{data['name']}", font=font_title, fill=(255, 255, 255, 255))
+
+    draw.text((480, 145), f"Level {data['level']}", font=font_subtitle, fill=(0, 255, 200, 255))
+    draw.text((650, 155), f"|  Saldo: {data['balance']} RSWN", font=font_text, fill=(255, 215, 0, 255))
+
+    with Pilmoji(background) as pilmoji:
+        pilmoji.text((480, 195), f"Badges: {data['badges']}", font=font_text, fill=(200, 200, 200, 255))
+
+    draw.text((950, 80), f"#{data['rank_pos']}", font=font_rank, fill=(255, 215, 0, 255), anchor="ra")
+
+    bar_x1 = 480
+    bar_y1 = 235
+    bar_x2 = 950
+    bar_y2 = 260
+
+    draw.rounded_rectangle([(bar_x1, bar_y1), (bar_x2, bar_y2)], radius=12, fill=(40, 45, 55, 255))
+
+    progress_ratio = data["progress_ratio"]
+    if progress_ratio > 0:
+        current_bar_x2 = bar_x1 + (bar_x2 - bar_x1) * progress_ratio
+        if current_bar_x2 < bar_x1 + 24:
+            current_bar_x2 = bar_x1 + 24
+        draw.rounded_rectangle([(bar_x1, bar_y1), (current_bar_x2, bar_y2)], radius=12, fill=(0, 255, 200, 255))
+
+    draw.text((950, 210), data["progress_text"], font=font_small, fill=(185, 187, 190, 255), anchor="ra")
+
+    footer = f"© {data['bot_name']} Leveling System"
+    try:
+        bot_img = Image.open(BytesIO(data["bot_avatar"])).convert("RGBA").resize((25, 25))
+        background.paste(bot_img, (740, 285), _circle_mask(25))
+    except Exception:
+        pass
+    draw.text((775, 288), footer, font=font_small, fill=(100, 100, 100, 255))
+
+    buffer = BytesIO()
+    background.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _render_member_card(data, bg_color, circle_fill, accent, title_color, grayscale):
+    width = 800
+    height = 250
+    background = Image.new('RGBA', (width, height), bg_color)
+    draw = ImageDraw.Draw(background)
+
+    draw.ellipse((-150, -50, 320, 400), fill=circle_fill)
+    draw.ellipse((-130, -30, 300, 380), outline=accent[:3] + (180,), width=4)
+
+    try:
+        avatar_img = Image.open(BytesIO(data["avatar"])).convert("RGBA")
+        avatar_img = avatar_img.resize((150, 150))
+        mask = _circle_mask(150)
+        if grayscale:
+            gray = avatar_img.convert('L')
+            avatar_img = Image.new("RGBA", gray.size)
+            avatar_img.paste(gray, (0, 0), mask)
+        background.paste(avatar_img, (60, 50), mask)
+        draw.ellipse((56, 46, 214, 214), outline=accent, width=6)
+    except Exception:
+        pass
+
+    font_bold = get_font(POPPINS_BOLD, 42)
+    font_title = get_font(POPPINS_BOLD, 22)
+
+    text_x = 360
+
+    draw.text((text_x, 40), data["title"], font=font_title, fill=title_color)
+    draw.text((text_x, 70), data["name"], font=font_bold, fill=(255, 255, 255, 255))
+
+    draw.line([(text_x, 135), (750, 135)], fill=(100, 100, 100, 80), width=2)
+    return background, draw
+
+
+def render_welcome_card(data):
+    background, draw = _render_member_card(
+        data, (20, 22, 26, 255), (30, 34, 45, 255), (88, 101, 242, 255), (114, 137, 218, 255), grayscale=False
+    )
+    font_sub = get_font(POPPINS_REGULAR, 20)
+    font_small = get_font(POPPINS_REGULAR, 16)
+    text_x = 360
+
+    draw.text((text_x, 150), f"Selamat datang di {data['guild_name']}!", font=font_sub, fill=(200, 200, 200, 255))
+    draw.text((text_x, 185), "Semoga betah dan aktif terus ya!", font=font_sub, fill=(150, 255, 150, 255))
+
+    badge_text = f"Member #{data['member_count']}"
+    draw.rounded_rectangle([(630, 20), (760, 50)], radius=15, fill=(40, 44, 52, 255), outline=(88, 101, 242, 180), width=1)
+    draw.text((650, 25), badge_text, font=font_small, fill=(200, 200, 200, 255))
+
+    buffer = BytesIO()
+    background.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_goodbye_card(data):
+    background, draw = _render_member_card(
+        data, (26, 20, 20, 255), (40, 25, 25, 255), (242, 88, 88, 255), (235, 100, 100, 255), grayscale=True
+    )
+    font_sub = get_font(POPPINS_REGULAR, 20)
+    text_x = 360
+
+    draw.text((text_x, 150), f"Telah meninggalkan {data['guild_name']}...", font=font_sub, fill=(180, 180, 180, 255))
+    draw.text((text_x, 185), "Yah, padahal lagi seru-serunya...", font=font_sub, fill=(255, 150, 150, 255))
+
+    buffer = BytesIO()
+    background.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "rank": render_rank_card,
+    "welcome": render_welcome_card,
+    "goodbye": render_goodbye_card,
+}
+
+
+def _render(kind, data):
+    return RENDERERS[kind](data)
+
+
+class CardRenderer:
+    """
+    Layanan render kartu Pillow di process pool. Input berupa data polos
+    (bytes avatar, teks, angka) sehingga bisa dikirim ke proses lain, dan
+    hasil PNG di-memoize berdasarkan hash input.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._results = OrderedDict()
+        self._inflight = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.queue_depth = 0
+        self.rendered = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: proses bot punya banyak thread (pymongo, executor), fork bisa deadlock.
+            ctx = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._executor
+
+    @staticmethod
+    def cache_key(kind, data):
+        payload = pickle.dumps((kind, sorted(data.items())), protocol=pickle.HIGHEST_PROTOCOL)
+        return hashlib.sha256(payload).hexdigest()
+
+    async def render(self, kind, data):
+        """Render kartu dan kembalikan bytes PNG."""
+        key = self.cache_key(kind, data)
+        png = self._results.get(key)
+        if png is not None:
+            self._results.move_to_end(key)
+            self.cache_hits += 1
+            return png
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._render_in_pool(kind, data))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.cache_hits += 1
+        png = await asyncio.shield(task)
+
+        # Hasil yang masih memakai font default (font belum ter-cache) tidak disimpan.
+        if get_cached_bytes(POPPINS_BOLD) is None or get_cached_bytes(POPPINS_REGULAR) is None:
+            return png
+        self._results[key] = png
+        while len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return png
+
+    async def _render_in_pool(self, kind, data):
+        loop = asyncio.get_running_loop()
+        self.queue_depth += 1
+        start = time.perf_counter()
+        try:
+            try:
+                png = await loop.run_in_executor(self._get_executor(), _render, kind, data)
+            except BrokenProcessPool:
+                log.warning("Process pool render kartu rusak, dibuat ulang.")
+                self._executor = None
+                png = await loop.run_in_executor(self._get_executor(), _render, kind, data)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        self.rendered += 1
+        return png
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        if latencies:
+            avg = sum(latencies) / len(latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        else:
+            avg = p95 = 0.0
+        return {
+            "queue_depth": self.queue_depth,
+            "rendered": self.rendered,
+            "cache_hits": self.cache_hits,
+            "cached": len(self._results),
+            "failures": self.failures,
+            "avg_ms": avg,
+            "p95_ms": p95,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_instance = None
+
+
+def get_renderer():
+    global _instance
+    if _instance is None:
+        _instance = CardRenderer()
+    return _instance
@@ -0,0 +1,204 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+LEVEL_FILE = os.path.join(BASE_DIR, "data", "level_data.json")
+BANK_FILE = os.path.join(BASE_DIR, "data", "bank_data.json")
+CONFIG_FILE = os.path.join(BASE_DIR, "data", "config.json")
+
+# File yang dibaca/ditulis oleh banyak cog sekaligus. Semua akses ke file ini
+# wajib lewat store supaya tidak ada cog yang menimpa data cog lain dari disk.
+SHARED_FILES = {LEVEL_FILE, BANK_FILE, CONFIG_FILE}
+
+FLUSH_INTERVAL = 30
+
+
+class JsonStore:
+    """
+    Menyimpan isi satu file JSON di memori (write-behind).
+    Perubahan cukup ditandai dengan mark_dirty(), lalu ditulis ke disk
+    secara batch oleh timer atau saat bot dimatikan.
+
+    compact=True untuk cache besar: ditulis tanpa indentasi dan diserialisasi di
+    thread dari salinan dangkal dua level (dict atas dan tiap section). Syaratnya,
+    nilai di dalam section diganti utuh, tidak pernah diubah di tempat.
+    """
+
+    def __init__(self, path, compact=False):
+        self.path = path
+        self.compact = compact
+        self._data = None
+        self._dirty = set()
+        self._flush_task = None
+        self._async_lock = None
+        self._write_lock = threading.Lock()
+        self._listeners = []
+        self._flush_hooks = []
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._read()
+        return self._data
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    def _read(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            log.warning(f"File {self.path} rusak (JSON tidak valid). Memulai dengan data kosong.")
+            return {}
+
+    def add_listener(self, callback):
+        """Daftarkan callback(keys) yang dipanggil setiap kali mark_dirty() dipanggil."""
+        self._listeners.append(callback)
+
+    def add_flush_hook(self, callback):
+        """Daftarkan callback() yang dipanggil tepat sebelum data diserialisasi ke disk."""
+        self._flush_hooks.append(callback)
+
+    def mark_dirty(self, *keys):
+        """Tandai key (misal guild_id, user_id) sebagai berubah dan jadwalkan flush."""
+        self._dirty.add(keys or ("*",))
+        for callback in self._listeners:
+            try:
+                callback(keys)
+            except Exception as e:
+                log.error(f"Listener store {self.path} gagal: {e}", exc_info=True)
+        self._ensure_flusher()
+
+    def replace(self, new_data):
+        """Ganti seluruh isi store tanpa mengganti objek dict yang sudah dipegang cog lain."""
+        current = self.data
+        if new_data is not current:
+            current.clear()
+            current.update(new_data)
+        self.mark_dirty()
+
+    def _ensure_flusher(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error(f"Gagal flush {self.path}: {e}", exc_info=True)
+
+    def _snapshot(self):
+        if not self._dirty:
+            return None, 0
+        for callback in self._flush_hooks:
+            try:
+                callback()
+            except Exception as e:
+                log.error(f"Flush hook store {self.path} gagal: {e}", exc_info=True)
+        if self._data is None:
+            return None, 0
+        if self.compact:
+            snapshot = {key: value.copy() if isinstance(value, dict) else value for key, value in self._data.items()}
+        else:
+            snapshot = json.dumps(self._data, indent=4)
+        count = len(self._dirty)
+        self._dirty.clear()
+        return snapshot, count
+
+    def _write(self, payload):
+        if not isinstance(payload, str):
+            payload = json.dumps(payload, separators=(",", ":"))
+        with self._write_lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+
+    async def flush(self):
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            payload, count = self._snapshot()
+            if payload is None:
+                return 0
+            await asyncio.to_thread(self._write, payload)
+            log.debug(f"Flush {count} perubahan ke {self.path}.")
+            return count
+
+    def flush_sync(self):
+        payload, count = self._snapshot()
+        if payload is None:
+            return 0
+        self._write(payload)
+        return count
+
+
+_stores = {}
+
+
+def is_shared(path):
+    return os.path.abspath(path) in SHARED_FILES
+
+
+def get_store(path, compact=False):
+    full_path = os.path.abspath(path)
+    store = _stores.get(full_path)
+    if store is None:
+        store = _stores[full_path] = JsonStore(full_path, compact=compact)
+    return store
+
+
+def level_store():
+    return get_store(LEVEL_FILE)
+
+
+def bank_store():
+    return get_store(BANK_FILE)
+
+
+def get_bank_user(user_id):
+    """Ambil (atau buat) entri bank milik user dari store bersama."""
+    return bank_store().data.setdefault(str(user_id), {"balance": 0, "debt": 0})
+
+
+def get_level_user(guild_id, user_id, default=None):
+    """Ambil (atau buat) entri level milik user di guild tertentu dari store bersama."""
+    guild_data = level_store().data.setdefault(str(guild_id), {})
+    return guild_data.setdefault(str(user_id), default if default is not None else {"exp": 0, "level": 0})
+
+
+async def flush_all():
+    for store in list(_stores.values()):
+        try:
+            await store.flush()
+        except Exception as e:
+            log.error(f"Gagal flush {store.path}: {e}", exc_info=True)
+
+
+def flush_all_sync():
+    for store in list(_stores.values()):
+        try:
+            store.flush_sync()
+        except Exception as e:
+            log.error(f"Gagal flush {store.path}: {e}", exc_info=True)
+
+
+atexit.register(flush_all_sync)
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, time
 import string
 import pytz # Import pytz untuk zona waktu
 import sys # Import sys untuk mencetak error ke stderr
+from cogs import data_store
 
 # --- Helper Functions (Diulang agar cog ini mandiri) ---
 def load_json_from_root(file_path, default_value=None):
@@ -15,6 +16,8 @@ def load_json_from_root(file_path, default_value=None):
     try:
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
         full_path = os.path.join(base_dir, file_path)
+        if data_store.is_shared(full_path):
+            return data_store.get_store(full_path).data
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         with open(full_path, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -44,6 +47,9 @@ def save_json_to_root(data, file_path):
     """Menyimpan data ke file JSON di root direktori proyek."""
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     full_path = os.path.join(base_dir, file_path)
+    if data_store.is_shared(full_path):
+        data_store.get_store(full_path).replace(data)
+        return
     os.makedirs(os.path.dirname(full_path), exist_ok=True) # Pastikan direktori 'data/' ada
     with open(full_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4)
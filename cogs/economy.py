@@ -4,6 +4,7 @@ import json
 import os
 import random
 from datetime import datetime
+from cogs import data_store
 
 class Economy(commands.Cog):
     def __init__(self, bot):  # Perbaikan: __init__ bukan init
@@ -27,14 +28,9 @@ class Economy(commands.Cog):
     @commands.has_permissions(administrator=True)  
     async def add_money(self, ctx, member: discord.Member, amount: int):  
         """Add money to a user's account (Admin only)"""
-        bank_data = self.load_data("bank_data.json")  
         user_id = str(member.id)  
-          
-        if user_id not in bank_data:  
-            bank_data[user_id] = {"balance": 0, "debt": 0}  
-          
-        bank_data[user_id]["balance"] += amount  
-        self.save_data(bank_data, "bank_data.json")  
+        data_store.get_bank_user(user_id)["balance"] += amount  
+        data_store.bank_store().mark_dirty(user_id)  
         await ctx.send(f"✅ Added {amount} RSWN to {member.mention}'s account!")
 
 async def setup(bot):
@@ -8,10 +8,13 @@ import aiohttp
 from io import BytesIO
 from datetime import datetime, time, timedelta
 import pytz
+from cogs import data_store
 
 def load_json_from_root(file_path):
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     full_path = os.path.join(base_dir, file_path)
+    if data_store.is_shared(full_path):
+        return data_store.get_store(full_path).data
     os.makedirs(os.path.dirname(full_path), exist_ok=True)
     try:
         with open(full_path, 'r', encoding='utf-8') as f:
@@ -30,6 +33,9 @@ def load_json_from_root(file_path):
 def save_json_to_root(data, file_path):
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     full_path = os.path.join(base_dir, file_path)
+    if data_store.is_shared(full_path):
+        data_store.get_store(full_path).replace(data)
+        return
     os.makedirs(os.path.dirname(full_path), exist_ok=True)
     with open(full_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4)
@@ -13,11 +13,12 @@ from google.api_core import exceptions as google_exceptions
 import logging
 import re
 import aiohttp
-import io
-from PIL import Image
 import imagehash
 from collections import deque
-from pymongo import MongoClient
+from cogs.persistence import get_persistence
+from cogs.text_matcher import get_matcher
+from cogs.image_hash_index import ImageHashIndex
+from cogs.image_ingest import get_message_images, image_phash, release_message_images
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
 log = logging.getLogger('UnifiedAI')
@@ -50,9 +51,13 @@ URL_REGEX = re.compile(r'https?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*(),]|%[0-9a-fA-
 INVITE_REGEX = re.compile(r'(?:https?://)?(?:www\.)?(?:discord\.(?:gg|io|me|li)|discordapp\.com/invite)/[a-zA-Z0-9]+', re.IGNORECASE)
 SARA_REGEX = re.compile(r'\b(babi|anjing|monyet|hitam|cina|pribumi|kafir|yatim|lonte|bangsat|tolol|ngentot|memek|kontol)\b', re.IGNORECASE)
 
-mongo_client = None
-mongo_db = None
-mongo_col = None
+MONGO_COLLECTION = "bot_data"
+persistence = None
+
+CONFIG_CACHE_TTL = 30
+_config_cache = {}
+_config_versions = {}
+config_cache_stats = {"hits": 0, "misses": 0}
 
 API_KEYS = []
 default_key = os.getenv("GOOGLE_API_KEY")
@@ -83,14 +88,14 @@ def rotate_api_key():
 configure_genai()
 
 def calculate_dhash(image):
-    hash_val = str(imagehash.phash(image))
-    log.info(f"[HASH_EXTRACT] phash = {hash_val}")
+    hash_val = image_phash(image)
+    log.debug(f"[HASH_EXTRACT] phash = {hash_val}")
     return hash_val
 
 def hamming_distance(h1, h2):
     try:
         dist = imagehash.hex_to_hash(h1) - imagehash.hex_to_hash(h2)
-        log.info(f"[HASH_COMPARE] {h1} vs {h2} = {dist}")
+        log.debug(f"[HASH_COMPARE] {h1} vs {h2} = {dist}")
         return dist
     except Exception as e:
         log.error(f"[HASH_COMPARE] Error: {e}")
@@ -99,14 +104,20 @@ def hamming_distance(h1, h2):
 def get_learned_path(guild_id):
     return f'data/learned_{guild_id}.json'
 
-def load_json_file(path, default):
-    if mongo_col is not None:
-        try:
-            doc = mongo_col.find_one({"_id": path})
-            if doc and "data" in doc:
-                return doc["data"]
-        except Exception:
-            pass
+def _file_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def _read_json_file(path, default):
+    if persistence is not None:
+        data = persistence.cached(MONGO_COLLECTION, path)
+        if data is not None:
+            return data
+    return _read_disk_json(path, default)
+
+def _read_disk_json(path, default):
     if not os.path.exists(path):
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, 'w', encoding='utf-8') as f: json.dump(default, f, indent=4)
@@ -116,21 +127,47 @@ def load_json_file(path, default):
     except:
         return default
 
+def load_json_file(path, default, ttl=CONFIG_CACHE_TTL):
+    # Cache per path: isi file dipakai ulang sampai disimpan ulang lewat save_json_file
+    # atau TTL habis (untuk file yang diubah cog lain, mis. settings/filters moderasi).
+    # Saat pertama dimuat mirror MongoDB yang dipakai; setelah itu, jika file di disk
+    # diubah di luar bot (mtime berubah), isi disk yang menang dan mirror disamakan.
+    entry = _config_cache.get(path)
+    now = time.monotonic()
+    if entry is not None and (ttl is None or now - entry["loaded_at"] < ttl):
+        config_cache_stats["hits"] += 1
+        return entry["data"]
+    config_cache_stats["misses"] += 1
+    mtime = _file_mtime(path)
+    if entry is not None and mtime is not None and mtime != entry["mtime"]:
+        data = _read_disk_json(path, default)
+        if persistence is not None and data != entry["data"]:
+            persistence.upsert(MONGO_COLLECTION, path, data, mode="set")
+    else:
+        data = _read_json_file(path, default)
+    if entry is not None and entry["data"] == data:
+        data = entry["data"]
+    else:
+        _config_versions[path] = _config_versions.get(path, 0) + 1
+    _config_cache[path] = {"data": data, "loaded_at": now, "mtime": _file_mtime(path)}
+    return data
+
+def get_config_version(path):
+    """Nomor versi isi file di cache; naik setiap kali isinya berubah."""
+    return _config_versions.get(path, 0)
+
 def save_json_file(path, data):
+    _config_cache[path] = {"data": data, "loaded_at": time.monotonic(), "mtime": None}
+    _config_versions[path] = _config_versions.get(path, 0) + 1
     try:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, 'w', encoding='utf-8') as f: json.dump(data, f, indent=4)
     except Exception:
         pass
-    if mongo_col is not None:
-        try:
-            mongo_col.update_one(
-                {"_id": path},
-                {"$set": {"data": data, "updated_at": time.time()}},
-                upsert=True
-            )
-        except Exception:
-            pass
+    # Tulisan bot sendiri bukan perubahan dari luar.
+    _config_cache[path]["mtime"] = _file_mtime(path)
+    if persistence is not None:
+        persistence.upsert(MONGO_COLLECTION, path, data, mode="set")
 
 async def send_long_message(ctx_or_channel, text):
     for chunk in [text[i:i+DISCORD_MSG_LIMIT] for i in range(0, len(text), DISCORD_MSG_LIMIT)]:
@@ -310,6 +347,9 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
             "blocked_image_hashes": [],
             "image_block_channel_id": None
         })
+        self.image_hash_index = ImageHashIndex(self.cyber_config.get("blocked_image_hashes", []))
+        self._indexed_hash_list = self.cyber_config.get("blocked_image_hashes")
+        self._indexed_hash_count = len(self._indexed_hash_list or [])
 
         self.data = load_json_file(CACHE_FILE_PATH, {
             'sensitive_keywords': ['steampowered', 'steam', 'paypal', 'discord', 'nitro', 'login', 'bank', 'freefire', 'ff', 'mobilelegends', 'ml', 'pubg', 'dana', 'gopay', 'ovo', 'claim', 'diamond', 'voucher', 'giveaway'],
@@ -592,21 +632,7 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
             pass
 
     async def get_images_from_message(self, message):
-        images = []
-        for att in message.attachments:
-            log.info(f"[IMG_READ] filename={att.filename} content_type={att.content_type}")
-            if any(att.filename.lower().endswith(ext) for ext in ['png', 'jpg', 'jpeg', 'webp', 'gif']):
-                try:
-                    img_data = await att.read()
-                    img = Image.open(io.BytesIO(img_data))
-                    if img.mode in ('RGBA', 'P'):
-                        img = img.convert('RGB')
-                    img.thumbnail((800, 800))
-                    images.append(img)
-                    log.info(f"[IMG_READ] OK: {att.filename}")
-                except Exception as e:
-                    log.error(f"[IMG_READ] FAIL {att.filename}: {e}")
-        return images
+        return await get_message_images(message)
 
     async def process_and_send_response(self, send_target, user, ctx_data, prompt_text, images=None, guild_id=None):
         if images is None:
@@ -914,8 +940,27 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
                 except: pass
             except Exception: pass
 
+    def get_image_hash_index(self):
+        # Index dibangun sekali lalu ditambah incremental; dibangun ulang hanya
+        # jika daftar hash diganti dari luar (reload config) atau berkurang.
+        hashes = self.cyber_config.setdefault("blocked_image_hashes", [])
+        if hashes is not self._indexed_hash_list or len(hashes) < self._indexed_hash_count:
+            self.image_hash_index = ImageHashIndex(hashes)
+        elif len(hashes) > self._indexed_hash_count:
+            for img_hash in hashes[self._indexed_hash_count:]:
+                self.image_hash_index.add(img_hash)
+        self._indexed_hash_list = hashes
+        self._indexed_hash_count = len(hashes)
+        return self.image_hash_index
+
     @commands.Cog.listener()
     async def on_message(self, message):
+        try:
+            await self._handle_message(message)
+        finally:
+            release_message_images(message.id)
+
+    async def _handle_message(self, message):
         if message.author.bot: return
 
         if message.guild:
@@ -942,11 +987,13 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
             if valid_images:
                 self.cyber_config.setdefault("blocked_image_hashes", [])
                 new_hashes = 0
+                hash_index = self.get_image_hash_index()
                 for img in valid_images:
                     img_hash = calculate_dhash(img)
-                    if img_hash not in self.cyber_config["blocked_image_hashes"]:
+                    if hash_index.add(img_hash):
                         self.cyber_config["blocked_image_hashes"].append(img_hash)
                         new_hashes += 1
+                self._indexed_hash_count = len(self.cyber_config["blocked_image_hashes"])
                 save_json_file(CYBER_CONFIG_FILE, self.cyber_config)
                 if (message.author.id == 1000737066822410311
                         or message.author.guild_permissions.administrator):
@@ -974,7 +1021,9 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
             if message.channel.id not in self.chat_history: self.chat_history[message.channel.id] = deque(maxlen=15)
             if message.content: self.chat_history[message.channel.id].append(f"{message.author.display_name}: {message.content}")
 
-        is_ai_whitelisted_msg = any(w.lower() in message.content.lower() for w in self.cyber_config.get("ai_whitelist_words", []))
+        content_lower = message.content.lower()
+        cyber_version = get_config_version(CYBER_CONFIG_FILE)
+        is_ai_whitelisted_msg = bool(get_matcher(("cyber", "ai_whitelist_words"), cyber_version, self.cyber_config.get("ai_whitelist_words", [])).search(content_lower))
         
         if message.guild and message.attachments:
             log.info(f"[IMG_CHECK] Attachment from {message.author} (ID:{message.author.id})")
@@ -982,11 +1031,10 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
             log.info(f"[IMG_CHECK] Valid images: {len(target_images)}")
 
             if target_images:
-                fresh_config   = load_json_file(CYBER_CONFIG_FILE, {})
-                blocked_hashes = fresh_config.get("blocked_image_hashes", [])
-                blocked_descs  = fresh_config.get("blocked_image_descriptions", [])
+                hash_index     = self.get_image_hash_index()
+                blocked_descs  = self.cyber_config.get("blocked_image_descriptions", [])
 
-                log.info(f"[IMG_CHECK] Hashes di DB: {len(blocked_hashes)} → {blocked_hashes}")
+                log.info(f"[IMG_CHECK] Hashes di index: {len(hash_index)}")
 
                 violation_found  = False
                 violation_reason = ""
@@ -996,14 +1044,12 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
                     img_hash = calculate_dhash(img)
                     log.info(f"[IMG_CHECK] Hash gambar user: {img_hash}")
 
-                    for b_hash in blocked_hashes:
-                        dist = hamming_distance(img_hash, b_hash)
-                        if dist <= 15:
-                            violation_found  = True
-                            violation_reason = "Pengguna terdeteksi mengirim pesan gambar berisi spam atau phising. Sistem telah menjatuhkan sanksi secara otomatis."
-                            action_to_take   = "ban"
-                            log.warning(f"[IMG_VIOLATION] HASH MATCH dist={dist}")
-                            break
+                    match = hash_index.find(img_hash, max_distance=15)
+                    if match:
+                        violation_found  = True
+                        violation_reason = "Pengguna terdeteksi mengirim pesan gambar berisi spam atau phising. Sistem telah menjatuhkan sanksi secara otomatis."
+                        action_to_take   = "ban"
+                        log.warning(f"[IMG_VIOLATION] HASH MATCH dist={match[1]}")
 
                     if violation_found:
                         break
@@ -1060,14 +1106,17 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
                 for url in URL_REGEX.findall(message.content):
                     if self.is_phishing_url(url): return await self.handle_violation(message, "ban", "Pengguna terdeteksi mengirim pesan berisi spam atau phising. Sistem telah menjatuhkan sanksi secara otomatis.")
                 filters = load_json_file(FILTERS_FILE, {})
-                combined_blacklist = self.cyber_config.get("blacklist_words", []) + filters.get(str(message.guild.id), {}).get("bad_words", [])
-                if not is_ai_whitelisted_msg and any(word.lower() in message.content.lower() for word in combined_blacklist):
+                guild_filters = filters.get(str(message.guild.id), {})
+                filters_version = (cyber_version, get_config_version(FILTERS_FILE))
+                blacklist_matcher = get_matcher(("cyber", "blacklist", message.guild.id), filters_version, lambda: self.cyber_config.get("blacklist_words", []) + guild_filters.get("bad_words", []))
+                if not is_ai_whitelisted_msg and blacklist_matcher.search(content_lower):
                     return await self.handle_violation(message, "warn_timeout", "Pengguna terdeteksi mengirim pesan yang melanggar kebijakan server. Sistem telah menjatuhkan sanksi secara otomatis.")
-                link_patterns = filters.get(str(message.guild.id), {}).get("link_patterns", [])
-                if not is_ai_whitelisted_msg and any(pattern.lower() in message.content.lower() for pattern in link_patterns):
+                link_matcher = get_matcher(("cyber", "link_patterns", message.guild.id), filters_version, guild_filters.get("link_patterns", []))
+                if not is_ai_whitelisted_msg and link_matcher.search(content_lower):
                     return await self.handle_violation(message, "warn_timeout", "Pengguna terdeteksi mengirim pesan berisi spam atau phising. Sistem telah menjatuhkan sanksi secara otomatis.")
                 
-                is_sara = SARA_REGEX.search(message.content) or any(w.lower() in message.content.lower() for w in self.cyber_config.get("sara_words", []))
+                sara_matcher = get_matcher(("cyber", "sara_words"), cyber_version, self.cyber_config.get("sara_words", []))
+                is_sara = SARA_REGEX.search(message.content) or sara_matcher.search(content_lower)
                 history_text = "\n".join(list(buffer)[:-1])
                 
                 if not is_ai_whitelisted_msg:
@@ -1316,6 +1365,15 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
         #                 except Exception:
         #                     pass
 
+    @commands.command(name="cachestats", hidden=True)
+    @commands.is_owner()
+    async def cache_stats(self, ctx: commands.Context):
+        hits = config_cache_stats["hits"]
+        misses = config_cache_stats["misses"]
+        total = hits + misses
+        ratio = (hits / total * 100) if total else 0
+        await ctx.send(f"📊 Config cache: **{hits}** hit, **{misses}** miss ({ratio:.1f}% hit), **{len(_config_cache)}** file di memori.")
+
     @commands.hybrid_command(name="cyber_toggle", aliases=["cybertoggle", "onoffcyber"], description="Nyalakan atau matikan sistem pertahanan AI RTM")
     @commands.has_permissions(administrator=True)
     async def toggle_cyber(self, ctx: commands.Context):
@@ -1434,6 +1492,7 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
             target_message = await channel.fetch_message(int(message_id))
             ctx_data = self.get_brain_context(target_message.content, getattr(target_message, 'guild', None), channel.id)
             images = await self.get_images_from_message(target_message)
+            release_message_images(target_message.id)
             prompt_text = f"Pesan dari {target_message.author.display_name}: '{target_message.content}'.\nTUGAS RAHASIA LU: Balas pesan tersebut sesuai instruksi ini: '{instruksi}'. \nATURAN MUTLAK: Bertingkahlah seolah-olah ini murni inisiatif dan kemauan lu sendiri. JANGAN PERNAH SEKALI-KALI lu sebut kalau lu disuruh oleh Pencipta, Admin, atau Rhdevs. Rahasiakan ini!"
             await ctx.send("✅ Pesan terkirim, rahasia aman.", ephemeral=True)
             await self.process_and_send_response(target_message, target_message.author, ctx_data, prompt_text, images)
@@ -1534,6 +1593,7 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
     async def tanya(self, ctx: commands.Context, *, prompt: str):
         async with ctx.typing():
             images = await self.get_images_from_message(ctx.message)
+            release_message_images(ctx.message.id)
             ctx_data = self.get_brain_context(prompt, getattr(ctx, 'guild', None), ctx.channel.id)
             await self.process_and_send_response(ctx, ctx.author, ctx_data, prompt, images)
 
@@ -1908,10 +1968,8 @@ class UnifiedAI(commands.Cog, name="RTM Moderation Center"):
         await self.bot.wait_until_ready()
 
 async def setup(bot):
-    global mongo_client, mongo_db, mongo_col
-    mongo_client = getattr(bot, 'mongo_client', None)
-    if mongo_client:
-        mongo_db = mongo_client["reSwan"]
-        mongo_col = mongo_db["bot_data"]
+    global persistence
+    persistence = get_persistence(bot)
+    await persistence.preload(MONGO_COLLECTION)
 
     await bot.add_cog(UnifiedAI(bot))
@@ -0,0 +1,102 @@
+import copy
+from dataclasses import dataclass
+
+# Nilai default pengaturan guild di settings.json. Diterapkan sekali saat data dimuat
+# atau saat guild baru dibuat, bukan di setiap get_guild_settings().
+GUILD_DEFAULTS = {
+    "auto_role_id": None,
+    "welcome_channel_id": None,
+    "welcome_message": "Selamat datang di **{guild_name}**, {user}! 🎉",
+    "welcome_embed_title": "SELAMAT DATANG!",
+    "welcome_sender_name": "Admin Server",
+    "welcome_banner_url": None,
+    "log_channel_id": None,
+    "reaction_roles": {},
+    "role_panels": {},
+    "channel_rules": {},
+    "announcement_webhooks": {},
+    "boost_channel_id": None,
+    "boost_message": "Terima kasih banyak, {user}, telah menjadi **Server Booster** kami di {guild_name}! Kami sangat menghargai dukunganmu! ❤️",
+    "boost_embed_title": "TERIMA KASIH SERVER BOOSTER!",
+    "boost_sender_name": "Tim Server",
+    "boost_image_url": None,
+    "mod_panel_message_id": None,
+    "mod_panel_channel_id": None,
+    "main_membership_role_id": None,
+    "membership_roles": {},
+    "membership_invite_message": "🥺 Anda belum menjadi anggota channel YouTube. Silakan berlangganan untuk mendapatkan role eksklusif! [LINK MEMBERSHIP]",
+    "membership_confirm_message": "🎉 Anda sudah menjadi anggota! Anda adalah anggota tier: **{tier_name}**.",
+    "verification_button_label": "Verifikasi Membership",
+    "spam_whitelist_roles": [],
+    "goodbye_message": "Selamat tinggal, **{user}**. Sampai jumpa lagi! 👋",
+    "panel_role_stats": [],
+}
+
+CHANNEL_RULE_DEFAULTS = {
+    "disallow_bots": False,
+    "disallow_media": False,
+    "disallow_prefix": False,
+    "disallow_url": False,
+    "auto_delete_seconds": 0,
+}
+
+
+def apply_defaults(guild_settings):
+    """Lengkapi key yang belum ada di dict pengaturan guild; True jika ada yang ditambahkan."""
+    missing = [key for key in GUILD_DEFAULTS if key not in guild_settings]
+    for key in missing:
+        guild_settings[key] = copy.deepcopy(GUILD_DEFAULTS[key])
+    return bool(missing)
+
+
+@dataclass(slots=True, frozen=True)
+class ChannelRules:
+    disallow_bots: bool = False
+    disallow_media: bool = False
+    disallow_prefix: bool = False
+    disallow_url: bool = False
+    auto_delete_seconds: int = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: data.get(key, default) for key, default in CHANNEL_RULE_DEFAULTS.items()})
+
+
+NO_RULES = ChannelRules()
+
+
+@dataclass(slots=True)
+class GuildSettings:
+    """
+    Tampilan ringkas pengaturan satu guild untuk jalur per-pesan: semua lookup
+    sudah berupa set/dict berkunci int, jadi on_message cukup akses atribut.
+    Dibangun ulang saat versi settings atau filter berubah.
+    """
+
+    guild_id: int
+    version: tuple
+    whitelist_roles: frozenset
+    trigger_channels: frozenset
+    channel_rules: dict
+    bad_words: object
+
+    @classmethod
+    def build(cls, guild_id, data, version, bad_words):
+        return cls(
+            guild_id=guild_id,
+            version=version,
+            whitelist_roles=frozenset(data.get("spam_whitelist_roles", ())),
+            trigger_channels=frozenset(int(ch) for ch in data.get("trigger_channels", ())),
+            channel_rules={
+                int(channel_id): ChannelRules.from_dict(rules)
+                for channel_id, rules in data.get("channel_rules", {}).items()
+                if isinstance(rules, dict)
+            },
+            bad_words=bad_words,
+        )
+
+    def rules_for(self, channel_id):
+        return self.channel_rules.get(channel_id, NO_RULES)
+
+    def is_whitelisted(self, member):
+        return any(role.id in self.whitelist_roles for role in member.roles)
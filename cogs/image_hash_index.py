@@ -0,0 +1,118 @@
+from itertools import combinations
+
+HASH_BITS = 64
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+_flip_masks = {}
+
+
+def _masks_within(radius):
+    # Semua pola bit 16-bit dengan jumlah bit 1 <= radius (untuk radius 3: 697 pola).
+    masks = _flip_masks.get(radius)
+    if masks is None:
+        masks = [0]
+        for k in range(1, radius + 1):
+            for bits in combinations(range(CHUNK_BITS), k):
+                m = 0
+                for b in bits:
+                    m |= 1 << b
+                masks.append(m)
+        _flip_masks[radius] = masks
+    return masks
+
+
+def parse_hash(value):
+    """Ubah hash hex (output str(imagehash.phash)) menjadi int 64-bit, atau None jika tidak valid."""
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+class ImageHashIndex:
+    """
+    Index hash perseptual 64-bit untuk pencarian tetangga terdekat (hamming).
+    Memakai multi-index hashing: hash dipecah jadi 4 potongan 16-bit. Jika
+    jarak total <= 15, minimal satu potongan berjarak <= 3 (pigeonhole),
+    jadi cukup memeriksa kandidat dari bucket potongan yang mirip.
+    """
+
+    def __init__(self, hashes=()):
+        self._hashes = set()
+        self._tables = [{} for _ in range(CHUNKS)]
+        for value in hashes:
+            self.add(value)
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, value):
+        h = parse_hash(value) if isinstance(value, str) else value
+        if h is None or h in self._hashes:
+            return False
+        self._hashes.add(h)
+        for i, table in enumerate(self._tables):
+            table.setdefault((h >> (i * CHUNK_BITS)) & CHUNK_MASK, []).append(h)
+        return True
+
+    def find(self, value, max_distance=15):
+        """Kembalikan (hash_int, jarak) pertama dengan jarak <= max_distance, atau None."""
+        q = parse_hash(value) if isinstance(value, str) else value
+        if q is None or not self._hashes:
+            return None
+        if q in self._hashes:
+            return q, 0
+
+        seen = set()
+        masks = _masks_within(max_distance // CHUNKS)
+        for i, table in enumerate(self._tables):
+            chunk = (q >> (i * CHUNK_BITS)) & CHUNK_MASK
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if not bucket:
+                    continue
+                for h in bucket:
+                    if h in seen:
+                        continue
+                    seen.add(h)
+                    dist = (q ^ h).bit_count()
+                    if dist <= max_distance:
+                        return h, dist
+        return None
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(1)
+
+    for size in (10_000, 100_000):
+        stored = [random.getrandbits(HASH_BITS) for _ in range(size)]
+        queries = [random.getrandbits(HASH_BITS) for _ in range(200)]
+        # Sebagian query adalah varian kecil dari hash yang diblokir (re-upload/crop).
+        queries += [h ^ (1 << random.randrange(HASH_BITS)) ^ (1 << random.randrange(HASH_BITS)) for h in random.sample(stored, 50)]
+
+        start = time.perf_counter()
+        index = ImageHashIndex(stored)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        stored_hex = [f"{h:016x}" for h in stored]
+        queries_hex = [f"{q:016x}" for q in queries]
+        start = time.perf_counter()
+        for q in queries_hex[:20]:
+            next((h for h in stored_hex if (int(q, 16) ^ int(h, 16)).bit_count() <= 15), None)
+        old_us = (time.perf_counter() - start) / 20 * 1e6
+
+        start = time.perf_counter()
+        linear = [next(((h, (q ^ h).bit_count()) for h in stored if (q ^ h).bit_count() <= 15), None) for q in queries]
+        linear_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        start = time.perf_counter()
+        indexed = [index.find(q) for q in queries]
+        indexed_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        assert [r is None for r in linear] == [r is None for r in indexed]
+        print(f"{size} hash | build: {build_ms:.0f} ms | parse hex per perbandingan: {old_us:.0f} us/query | scan linear (int): {linear_us:.0f} us/query | index: {indexed_us:.0f} us/query")
@@ -0,0 +1,121 @@
+import asyncio
+import io
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import imagehash
+from PIL import Image
+
+log = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'webp', 'gif')
+THUMBNAIL_SIZE = (800, 800)
+# Gambar di atas batas ini ditolak sebelum di-decode (perlindungan decompression bomb).
+MAX_PIXELS = 40_000_000
+MAX_WORKERS = 2
+MAX_IN_FLIGHT = 8
+# Batas pengaman saja: entri dilepas begitu pesan selesai diproses.
+MESSAGE_CACHE_SIZE = 16
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="img")
+_slots = None
+_message_cache = OrderedDict()
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def decode_image(data):
+    """
+    Decode bytes gambar langsung ke thumbnail 800px lalu hitung phash-nya.
+    Dijalankan di thread pool; PIL melepas GIL saat decode/resize.
+    """
+    img = Image.open(io.BytesIO(data))
+    width, height = img.size
+    if width * height > MAX_PIXELS:
+        raise ImageTooLarge(f"{width}x{height} melebihi batas {MAX_PIXELS} piksel")
+
+    if img.format == "JPEG":
+        # Decoder JPEG bisa langsung menghasilkan skala 1/2, 1/4, 1/8.
+        img.draft('RGB', THUMBNAIL_SIZE)
+    else:
+        # reduce() menolak mode seperti "P" dan "1" (PNG palet, GIF), jadi konversi dulu.
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        factor = int(max(width / THUMBNAIL_SIZE[0], height / THUMBNAIL_SIZE[1]) // 2)
+        if factor > 1:
+            img = img.reduce(factor)
+
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.thumbnail(THUMBNAIL_SIZE)
+    img.load()
+    img.info["phash"] = str(imagehash.phash(img))
+    return img
+
+
+def image_phash(img):
+    """Phash yang sudah dihitung saat decode, atau hitung ulang untuk gambar dari luar modul ini."""
+    cached = img.info.get("phash")
+    if cached:
+        return cached
+    value = str(imagehash.phash(img))
+    img.info["phash"] = value
+    return value
+
+
+async def ingest_bytes(data):
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+    async with _slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, decode_image, data)
+
+
+async def _ingest_attachment(att):
+    log.info(f"[IMG_READ] filename={att.filename} content_type={att.content_type}")
+    if not att.filename.lower().endswith(IMAGE_EXTENSIONS):
+        return None
+    width, height = getattr(att, "width", None), getattr(att, "height", None)
+    if width and height and width * height > MAX_PIXELS:
+        log.warning(f"[IMG_READ] SKIP {att.filename}: {width}x{height} terlalu besar")
+        return None
+    try:
+        img = await ingest_bytes(await att.read())
+        log.info(f"[IMG_READ] OK: {att.filename}")
+        return img
+    except Exception as e:
+        log.error(f"[IMG_READ] FAIL {att.filename}: {e}")
+        return None
+
+
+async def get_message_images(message):
+    """
+    Decode semua lampiran gambar di pesan. Selama pesan diproses, hasilnya dibagi
+    per message id (juga ke task yang sedang berjalan), jadi cek hash, deskripsi AI
+    dan memorize_images memakai hasil decode yang sama. Panggil
+    release_message_images() setelah selesai agar gambar tidak tertahan di memori.
+    """
+    task = _message_cache.get(message.id)
+    if task is None:
+        task = asyncio.ensure_future(_decode_all(message.attachments))
+        _message_cache[message.id] = task
+        while len(_message_cache) > MESSAGE_CACHE_SIZE:
+            _message_cache.popitem(last=False)
+    else:
+        _message_cache.move_to_end(message.id)
+    images = await asyncio.shield(task)
+    return list(images)
+
+
+def release_message_images(message_id):
+    """Lepas hasil decode pesan dari cache; pemanggil yang sedang menunggu tetap mendapat hasilnya."""
+    _message_cache.pop(message_id, None)
+
+
+async def _decode_all(attachments):
+    results = await asyncio.gather(*(_ingest_attachment(att) for att in attachments))
+    return [img for img in results if img is not None]
@@ -1,16 +1,16 @@
 import discord
 from discord.ext import commands
 from discord import ui, app_commands
-from PIL import Image, ImageDraw, ImageFont
-import requests
-import io
+from PIL import ImageDraw
+import asyncio
 import os
 import json
 from datetime import datetime
+from cogs import asset_cache
 
 # URL Aset dan Pengaturan Global
-FONT_URL = "https://github.com/MFarelS/RajinNulis-BOT/raw/master/font/Zahraaa.ttf"
-IMAGE_URL = "https://github.com/MFarelS/RajinNulis-BOT/raw/master/MFarelSZ/Farelll/magernulis1.jpg"
+FONT_URL = asset_cache.ZAHRAAA_FONT
+IMAGE_URL = asset_cache.MAGERNULIS_IMAGE
 UKURAN_FONT_NAMA = 22
 UKURAN_FONT_TEKS = 18
 
@@ -19,18 +19,6 @@ FAQ_CHANNEL_ID = 765140300145360896
 ROLE_CHANNEL_ID = 1255221263811743836
 
 # Fungsi Bantuan Global
-def download_asset(url, is_font=False):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        if is_font:
-            return response.content
-        else:
-            return io.BytesIO(response.content)
-    except requests.exceptions.RequestException as e:
-        print(f"Error saat mengunduh aset: {e}")
-        return None
-
 def wrap_text(draw, text, font, max_width):
     lines = []
     if not text:
@@ -216,21 +204,12 @@ class Addon(commands.Cog):
     # Metode untuk Fitur Tulis
     def buat_tulisan_tangan(self, teks, nama):
         try:
-            gambar_data = download_asset(IMAGE_URL)
-            if not gambar_data:
+            gambar_latar = asset_cache.get_image(IMAGE_URL)
+            if gambar_latar is None or asset_cache.get_cached_bytes(FONT_URL) is None:
                 return None
-            gambar_latar = Image.open(gambar_data)
-            
-            font_data = download_asset(FONT_URL, is_font=True)
-            if not font_data:
-                return None
-                
-            temp_font_path = "temp_font.ttf"
-            with open(temp_font_path, "wb") as f:
-                f.write(font_data)
 
-            font_tulisan = ImageFont.truetype(temp_font_path, UKURAN_FONT_TEKS)
-            font_nama = ImageFont.truetype(temp_font_path, UKURAN_FONT_NAMA)
+            font_tulisan = asset_cache.get_font(FONT_URL, UKURAN_FONT_TEKS)
+            font_nama = asset_cache.get_font(FONT_URL, UKURAN_FONT_NAMA)
         except Exception as e:
             print(f"Error dalam memuat aset: {e}")
             return None
@@ -258,9 +237,6 @@ class Addon(commands.Cog):
         nama_file_hasil = "tulisan_tangan_hasil.png"
         gambar_latar.save(nama_file_hasil)
 
-        if os.path.exists(temp_font_path):
-            os.remove(temp_font_path)
-
         return nama_file_hasil
 
     # Metode untuk Fitur Gender dan Info
@@ -364,7 +340,13 @@ class Addon(commands.Cog):
             return
 
         await ctx.send("Sedang menulis... Mohon tunggu sebentar.")
-        
+
+        try:
+            # Normalnya sudah ter-cache oleh prefetch saat startup; ini hanya jaga-jaga.
+            await asyncio.gather(asset_cache.fetch(IMAGE_URL), asset_cache.fetch(FONT_URL))
+        except Exception as e:
+            print(f"Error saat mengunduh aset: {e}")
+
         nama_file_hasil = self.buat_tulisan_tangan(teks, nama)
 
         if nama_file_hasil:
@@ -8,6 +8,7 @@ from datetime import datetime, time, timedelta
 import logging
 import sys
 from collections import Counter
+from cogs import data_store
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -175,20 +176,21 @@ def save_json_data(file_path, data): # Ubah nama fungsi ini menjadi lebih umum
 
 
 # Ganti panggilan fungsi load/save spesifik dengan yang umum
+# Data level & bank dipegang oleh store bersama (cogs/data_store.py) agar tidak
+# saling timpa dengan cog Leveling yang menulis ke file yang sama.
 def load_level_data(guild_id: str):
-    data = load_json_safe(LEVEL_DATA_FILE)
-    return data.get(guild_id, {})
+    return data_store.get_store(LEVEL_DATA_FILE).data.setdefault(guild_id, {})
 
 def save_level_data(guild_id: str, data: dict):
-    all_data = load_json_safe(LEVEL_DATA_FILE)
-    all_data[guild_id] = data
-    save_json_data(LEVEL_DATA_FILE, all_data)
+    store = data_store.get_store(LEVEL_DATA_FILE)
+    store.data[guild_id] = data
+    store.mark_dirty(guild_id)
 
 def load_bank_data():
-    return load_json_safe(BANK_FILE)
+    return data_store.get_store(BANK_FILE).data
 
 def save_bank_data(data):
-    save_json_data(BANK_FILE, data)
+    data_store.get_store(BANK_FILE).replace(data)
 
 def load_economy_config():
     return load_json_safe(ECONOMY_CONFIG_FILE)
@@ -1585,6 +1587,7 @@ class EconomyEvents(commands.Cog):
         await ctx.send(f"✨ Memulai proses pemberian **{amount} EXP** kepada semua anggota server...")
         
         guild_id_str = str(ctx.guild.id)
+        level_store = data_store.get_store(LEVEL_DATA_FILE)
         level_data = load_level_data(guild_id_str)
         updated_users_count = 0
 
@@ -1611,9 +1614,10 @@ class EconomyEvents(commands.Cog):
                     logging.debug(f"User {member.display_name} leveled up from {old_level} to {new_level} due to give_all_xp.")
                     # Panggil fungsi level_up dari Leveling cog untuk handle role/pengumuman
                     await leveling_cog.level_up(member, ctx.guild, ctx.channel, new_level, level_data)
+            # Tandai per user agar index peringkat cukup memperbarui user ini saja.
+            level_store.mark_dirty(guild_id_str, user_id_str)
             updated_users_count += 1
 
-        save_level_data(guild_id_str, level_data)
         logging.info(f"Successfully gave {amount} EXP to {updated_users_count} users.")
         await ctx.send(f"✅ Berhasil memberikan **{amount} EXP** kepada **{updated_users_count} anggota** di server ini!")
 
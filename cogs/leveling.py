@@ -5,15 +5,22 @@ import json
 import os
 import random
 import logging
-from pilmoji import Pilmoji
 import asyncio
+import time
 from datetime import datetime, timedelta
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import requests
 from io import BytesIO
 import io
 import aiohttp
 import unicodedata
+from cogs import data_store
+from cogs.asset_cache import read_discord_asset
+from cogs.card_renderer import get_renderer
+from cogs.rank_index import get_rank_index
+from cogs.voice_tracker import VoiceSessionTracker
+
+log = logging.getLogger(__name__)
 
 LEVEL_FILE = "data/level_data.json"
 BANK_FILE = "data/bank_data.json"
@@ -29,6 +36,8 @@ EXP_PRICE_PER_UNIT = 10
 DAILY_EXP_LIMIT = 1500
 
 def load_json(path):
+    if data_store.is_shared(path):
+        return data_store.get_store(path).data
     os.makedirs(os.path.dirname(path), exist_ok=True)
     if not os.path.exists(path):
         default_data = {}
@@ -56,6 +65,9 @@ def load_json(path):
         return {}
 
 def save_json(path, data):
+    if data_store.is_shared(path):
+        data_store.get_store(path).replace(data)
+        return
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4)
@@ -637,6 +649,8 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
     def __init__(self, bot):
         self.bot = bot
         self.giveaways = {}
+        self.voice_sessions = VoiceSessionTracker()
+        self.voice_tick_stats = {}
         self.voice_task = self.create_voice_task()
         self.last_reset = datetime.utcnow()
         self.daily_quest_task.start()
@@ -644,6 +658,11 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         self.shop_data = load_json(SHOP_FILE)
         self.collage_url = load_json(COLLAGE_FILE).get("collage_url")
 
+    def cog_unload(self):
+        self.daily_quest_task.cancel()
+        self.voice_task.cancel()
+        data_store.flush_all_sync()
+
     def get_anomaly_multiplier(self):
         dunia_cog = self.bot.get_cog('DuniaHidup')
         if dunia_cog and dunia_cog.active_anomaly and dunia_cog.active_anomaly.get('type') == 'exp_boost':
@@ -681,170 +700,142 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
             progress_ratio = min(exp_progress / exp_needed, 1.0)
             display_text = f"{exp} / {next_level_exp} EXP"
 
-        width = 1000
-        height = 330
-        
-        background = Image.new('RGBA', (width, height), (20, 22, 25, 255))
-        draw = ImageDraw.Draw(background)
-
-        draw.polygon([(0, 0), (1000, 0), (1000, 330), (0, 330)], fill=(15, 15, 20, 255))
-        draw.polygon([(0, 330), (320, 330), (450, 0), (0, 0)], fill=(30, 35, 45, 255))
-        draw.line((448, 0, 318, 330), fill=(0, 255, 200, 255), width=6)
-
-        draw.ellipse((40, 55, 260, 275), outline=(0, 255, 200, 180), width=4)
-        draw.ellipse((25, 40, 275, 290), outline=(255, 255, 255, 40), width=1)
-        draw.line((150, 10, 150, 45), fill=(0, 255, 200, 255), width=3)
-        draw.line((150, 285, 150, 320), fill=(0, 255, 200, 255), width=3)
-        draw.line((5, 165, 40, 165), fill=(0, 255, 200, 255), width=3)
-        draw.line((260, 165, 295, 165), fill=(0, 255, 200, 255), width=3)
-
-        avatar_bytes = await target.display_avatar.replace(size=256, format="png").read()
-        avatar_img = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
-        avatar_img = avatar_img.resize((200, 200))
-
-        mask = Image.new("L", (200, 200), 0)
-        draw_mask = ImageDraw.Draw(mask)
-        draw_mask.ellipse((0, 0, 200, 200), fill=255)
-        background.paste(avatar_img, (50, 65), mask)
-
-        try:
-            url_bold = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf"
-            url_reg = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url_bold) as resp_bold:
-                    font_bold_bytes = await resp_bold.read()
-                async with session.get(url_reg) as resp_reg:
-                    font_reg_bytes = await resp_reg.read()
-            
-            font_title = ImageFont.truetype(BytesIO(font_bold_bytes), 45)
-            font_rank = ImageFont.truetype(BytesIO(font_bold_bytes), 65)
-            font_subtitle = ImageFont.truetype(BytesIO(font_bold_bytes), 35)
-            font_text = ImageFont.truetype(BytesIO(font_reg_bytes), 22)
-            font_small = ImageFont.truetype(BytesIO(font_reg_bytes), 18)
-        except Exception:
-            font_title = ImageFont.load_default()
-            font_rank = ImageFont.load_default()
-            font_subtitle = ImageFont.load_default()
-            font_text = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-
-        safe_guild_name = unicodedata.normalize('NFKC', guild.name)
-        safe_target_name = unicodedata.normalize('NFKC', target.display_name)
+        avatar_bytes = await read_discord_asset(target.display_avatar.replace(size=256, format="png"))
 
+        guild_icon_bytes = None
         if guild.icon:
             try:
-                g_icon_bytes = await guild.icon.replace(size=64, format="png").read()
-                g_img = Image.open(BytesIO(g_icon_bytes)).convert("RGBA").resize((35, 35))
-                g_mask = Image.new("L", (35, 35), 0)
-                ImageDraw.Draw(g_mask).ellipse((0, 0, 35, 35), fill=255)
-                background.paste(g_img, (480, 45), g_mask)
-                draw.text((525, 50), f"{safe_guild_name}", font=font_small, fill=(180, 180, 180, 255))
+                guild_icon_bytes = await read_discord_asset(guild.icon.replace(size=64, format="png"))
             except Exception:
-                draw.text((480, 50), f"Server: {safe_guild_name}", font=font_small, fill=(180, 180, 180, 255))
-        else:
-            draw.text((480, 50), f"Server: {safe_guild_name}", font=font_small, fill=(180, 180, 180, 255))
-
-        draw.text((480, 85), f"{safe_target_name}", font=font_title, fill=(255, 255, 255, 255))
-        
-        draw.text((480, 145), f"Level {level}", font=font_subtitle, fill=(0, 255, 200, 255))
-        draw.text((650, 155), f"|  Saldo: {balance} RSWN", font=font_text, fill=(255, 215, 0, 255))
-        
-        with Pilmoji(background) as pilmoji:
-            pilmoji.text((480, 195), f"Badges: {badges_str}", font=font_text, fill=(200, 200, 200, 255))
-
-        draw.text((950, 80), f"#{rank_pos}", font=font_rank, fill=(255, 215, 0, 255), anchor="ra")
-
-        bar_x1 = 480
-        bar_y1 = 235
-        bar_x2 = 950
-        bar_y2 = 260
-        
-        draw.rounded_rectangle([(bar_x1, bar_y1), (bar_x2, bar_y2)], radius=12, fill=(40, 45, 55, 255))
-        
-        if progress_ratio > 0:
-            current_bar_x2 = bar_x1 + (bar_x2 - bar_x1) * progress_ratio
-            if current_bar_x2 < bar_x1 + 24:
-                current_bar_x2 = bar_x1 + 24
-            draw.rounded_rectangle([(bar_x1, bar_y1), (current_bar_x2, bar_y2)], radius=12, fill=(0, 255, 200, 255))
-        
-        draw.text((950, 210), display_text, font=font_small, fill=(185, 187, 190, 255), anchor="ra")
+                guild_icon_bytes = None
 
         try:
-            bot_avatar_bytes = await self.bot.user.display_avatar.replace(size=64, format="png").read()
-            bot_img = Image.open(BytesIO(bot_avatar_bytes)).convert("RGBA").resize((25, 25))
-            bot_mask = Image.new("L", (25, 25), 0)
-            ImageDraw.Draw(bot_mask).ellipse((0, 0, 25, 25), fill=255)
-            background.paste(bot_img, (740, 285), bot_mask)
-            draw.text((775, 288), f"© {self.bot.user.name} Leveling System", font=font_small, fill=(100, 100, 100, 255))
+            bot_avatar_bytes = await read_discord_asset(self.bot.user.display_avatar.replace(size=64, format="png"))
         except Exception:
-            draw.text((775, 288), f"© {self.bot.user.name} Leveling System", font=font_small, fill=(100, 100, 100, 255))
-
-        buffer = BytesIO()
-        background.save(buffer, format="PNG")
-        buffer.seek(0)
-        
-        return discord.File(buffer, filename=f"rank_{target.name}.png")
+            bot_avatar_bytes = None
+
+        png = await get_renderer().render("rank", {
+            "avatar": avatar_bytes,
+            "guild_icon": guild_icon_bytes,
+            "bot_avatar": bot_avatar_bytes,
+            "guild_name": unicodedata.normalize('NFKC', guild.name),
+            "name": unicodedata.normalize('NFKC', target.display_name),
+            "bot_name": self.bot.user.name,
+            "level": level,
+            "balance": balance,
+            "badges": badges_str,
+            "rank_pos": rank_pos,
+            "progress_ratio": progress_ratio,
+            "progress_text": display_text,
+        })
+        return discord.File(BytesIO(png), filename=f"rank_{target.name}.png")
 
 
     def create_voice_task(self):
         @tasks.loop(minutes=1)
         async def voice_task():
             try:
-                now = datetime.utcnow()
-                anomaly_multiplier = self.get_anomaly_multiplier()
-                
-                for guild in self.bot.guilds:
-                    guild_id = str(guild.id)
-                    all_level_data = load_json(LEVEL_FILE)
-                    data = all_level_data.setdefault(guild_id, {})
-                    bank_data = load_json(BANK_FILE)
+                await self.commit_voice_tick()
+            except Exception as e:
+                log.error(f"Voice tick gagal: {e}", exc_info=True)
+
+        @voice_task.before_loop
+        async def before_voice_task():
+            await self.bot.wait_until_ready()
+            self.reconcile_voice_sessions()
 
-                    all_configs = load_json(CONFIG_FILE)
-                    guild_config = all_configs.get(guild_id, {})
-                    base_exp_vc = guild_config.get("exp_per_vc_min", 5)
-                    base_rswn_vc = guild_config.get("rswn_per_vc_min", 10)
-                    exp_per_level = guild_config.get("exp_per_level", 3500)
-                    max_level = guild_config.get("max_level", 0)
-
-                    for vc in guild.voice_channels:
-                        for member in vc.members:
-                            if member.bot or member.voice.self_deaf or member.voice.self_mute:
-                                continue
-
-                            user_id = str(member.id)
-                            if user_id not in data:
-                                data[user_id] = {"exp": 0, "weekly_exp": 0, "level": 0, "badges": []}
-                            
-                            exp_gain_vc = int(base_exp_vc * anomaly_multiplier)
-                            rswn_gain_vc = int(base_rswn_vc * anomaly_multiplier)
-
-                            data[user_id]["exp"] += exp_gain_vc
-                            data[user_id].setdefault("weekly_exp", 0)
-                            data[user_id]["weekly_exp"] += exp_gain_vc
-
-                            if user_id not in bank_data:
-                                bank_data[user_id] = {"balance": 0, "debt": 0}
-                            bank_data[user_id]["balance"] += rswn_gain_vc
-
-                            new_level = calculate_new_level(data[user_id]["exp"], exp_per_level, max_level)
-                            if new_level > data[user_id].get("level", 0):
-                                data[user_id]["level"] = new_level
-                                await self.level_up(member, guild, None, new_level, data)
-
-                    all_level_data[guild_id] = data
-                    save_json(LEVEL_FILE, all_level_data)
-                    save_json(BANK_FILE, bank_data)
-
-                    if now.weekday() == WEEKLY_RESET_DAY and now.date() != self.last_reset.date():
-                        for user_data in data.values():
-                            user_data["weekly_exp"] = 0
-                        self.last_reset = now
-                        save_json(LEVEL_FILE, all_level_data)
-            except Exception:
-                pass
         return voice_task
 
+    @staticmethod
+    def is_voice_eligible(state):
+        return (
+            state is not None
+            and isinstance(state.channel, discord.VoiceChannel)
+            and not state.self_deaf
+            and not state.self_mute
+        )
+
+    def reconcile_voice_sessions(self):
+        for guild in self.bot.guilds:
+            eligible = [
+                member.id
+                for vc in guild.voice_channels
+                for member in vc.members
+                if not member.bot and self.is_voice_eligible(member.voice)
+            ]
+            self.voice_sessions.reconcile(guild.id, eligible)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Event voice yang terlewat saat bot terputus tidak akan dikirim ulang.
+        self.reconcile_voice_sessions()
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        if member.bot:
+            return
+        was_eligible = self.is_voice_eligible(before)
+        is_eligible = self.is_voice_eligible(after)
+        if was_eligible and not is_eligible:
+            self.voice_sessions.stop(member.guild.id, member.id)
+        elif is_eligible and not was_eligible:
+            self.voice_sessions.start(member.guild.id, member.id)
+
+    async def commit_voice_tick(self):
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        self.voice_sessions.checkpoint()
+        credits = self.voice_sessions.drain()
+
+        level_store = data_store.level_store()
+        bank_store = data_store.bank_store()
+        all_configs = load_json(CONFIG_FILE)
+        anomaly_multiplier = self.get_anomaly_multiplier()
+        level_ups = []
+
+        for (guild_id, user_id), minutes in credits.items():
+            guild_config = all_configs.get(guild_id, {})
+            exp_gain_vc = int(guild_config.get("exp_per_vc_min", 5) * anomaly_multiplier) * minutes
+            rswn_gain_vc = int(guild_config.get("rswn_per_vc_min", 10) * anomaly_multiplier) * minutes
+
+            data = level_store.data.setdefault(guild_id, {})
+            user_data = data.setdefault(user_id, {"exp": 0, "weekly_exp": 0, "level": 0, "badges": []})
+            user_data["exp"] += exp_gain_vc
+            user_data["weekly_exp"] = user_data.get("weekly_exp", 0) + exp_gain_vc
+            data_store.get_bank_user(user_id)["balance"] += rswn_gain_vc
+
+            new_level = calculate_new_level(user_data["exp"], guild_config.get("exp_per_level", 3500), guild_config.get("max_level", 0))
+            if new_level > user_data.get("level", 0):
+                user_data["level"] = new_level
+                level_ups.append((guild_id, user_id, new_level))
+
+            level_store.mark_dirty(guild_id, user_id)
+            bank_store.mark_dirty(user_id)
+
+        if now.weekday() == WEEKLY_RESET_DAY and now.date() != self.last_reset.date():
+            for data in level_store.data.values():
+                for user_data in data.values():
+                    user_data["weekly_exp"] = 0
+            self.last_reset = now
+            level_store.mark_dirty()
+
+        commit_ms = (time.perf_counter() - started) * 1000
+
+        for guild_id, user_id, new_level in level_ups:
+            guild = self.bot.get_guild(int(guild_id))
+            member = guild.get_member(int(user_id)) if guild else None
+            if member:
+                await self.level_up(member, guild, None, new_level, level_store.data[guild_id])
+
+        self.voice_tick_stats = {
+            "sessions": len(self.voice_sessions),
+            "credited": len(credits),
+            "level_ups": len(level_ups),
+            "commit_ms": commit_ms,
+            "total_ms": (time.perf_counter() - started) * 1000,
+        }
+        log.debug(f"Voice tick: {self.voice_tick_stats}")
+
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot or not message.guild:
@@ -854,9 +845,10 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
 
         user_id = str(message.author.id)
         guild_id = str(message.guild.id)
-        all_level_data = load_json(LEVEL_FILE)
-        data = all_level_data.setdefault(guild_id, {})
-        bank_data = load_json(BANK_FILE)
+        level_store = data_store.get_store(LEVEL_FILE)
+        bank_store = data_store.get_store(BANK_FILE)
+        data = level_store.data.setdefault(guild_id, {})
+        bank_data = bank_store.data
 
         all_configs = load_json(CONFIG_FILE)
         guild_config = all_configs.get(guild_id, {})
@@ -923,10 +915,9 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         if new_level > user_level_data.get("level", 0):
             user_level_data["level"] = new_level
             await self.level_up(message.author, message.guild, message.channel, new_level, data)
-        
-        all_level_data[guild_id] = data
-        save_json(LEVEL_FILE, all_level_data)
-        save_json(BANK_FILE, bank_data)
+
+        level_store.mark_dirty(guild_id, user_id)
+        bank_store.mark_dirty(user_id)
 
     @tasks.loop(hours=24)
     async def daily_quest_task(self):
@@ -979,9 +970,7 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
             user_badges = data.get(str(member.id), {}).setdefault("badges", [])
             if badge and badge not in user_badges:
                 user_badges.append(badge)
-                all_level_data = load_json(LEVEL_FILE)
-                all_level_data[guild_id] = data
-                save_json(LEVEL_FILE, all_level_data)
+                data_store.get_store(LEVEL_FILE).mark_dirty(guild_id, str(member.id))
 
             announce_channel_id = config.get("announce_channel")
             if announce_channel_id:
@@ -1134,6 +1123,27 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         
         await ctx.send(embed=embed, ephemeral=True)
 
+    @commands.command(name="cardstats", hidden=True)
+    @commands.is_owner()
+    async def card_stats(self, ctx: commands.Context):
+        stats = get_renderer().stats()
+        await ctx.send(
+            f"🖼️ Render kartu: antrean **{stats['queue_depth']}**, **{stats['rendered']}** dirender, "
+            f"**{stats['cache_hits']}** dari cache ({stats['cached']} tersimpan), **{stats['failures']}** gagal | "
+            f"latensi rata-rata {stats['avg_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms"
+        )
+
+    @commands.command(name="voicestats", hidden=True)
+    @commands.is_owner()
+    async def voice_stats(self, ctx: commands.Context):
+        stats = self.voice_tick_stats
+        if not stats:
+            return await ctx.send("Belum ada voice tick yang berjalan.")
+        await ctx.send(
+            f"🎙️ Voice tick terakhir: **{stats['sessions']}** sesi aktif, **{stats['credited']}** user dikreditkan, "
+            f"**{stats['level_ups']}** naik level | commit {stats['commit_ms']:.1f} ms, total {stats['total_ms']:.1f} ms"
+        )
+
     @commands.hybrid_command(name="setlevelannouncement", description="Atur channel dan kustom pesan pengumuman naik level")
     @commands.has_permissions(administrator=True)
     @app_commands.describe(channel="Pilih channel pengumuman", pesan="Pesan kustom. Gunakan {mention} dan {level}")
@@ -1215,8 +1225,8 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         await ctx.defer()
         
         guild_id_str = str(ctx.guild.id)
-        all_level_data = load_json(LEVEL_FILE)
-        level_data = all_level_data.setdefault(guild_id_str, {})
+        level_store = data_store.level_store()
+        level_data = level_store.data.setdefault(guild_id_str, {})
         
         all_configs = load_json(CONFIG_FILE)
         guild_config = all_configs.get(guild_id_str, {})
@@ -1242,10 +1252,8 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
             if new_level > old_level:
                 user_level_data["level"] = new_level
                 await self.level_up(member, ctx.guild, ctx.channel, new_level, level_data)
+            level_store.mark_dirty(guild_id_str, user_id_str)
             updated_users_count += 1
-        
-        all_level_data[guild_id_str] = level_data
-        save_json(LEVEL_FILE, all_level_data)
         await ctx.send(f"✅ Berhasil memberikan **{amount} EXP** kepada **{updated_users_count} anggota** di server ini!")
 
     @commands.hybrid_command(name="addquest", description="Tambahkan quest harian baru ke sistem")
@@ -1354,12 +1362,10 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         old_level = user_level_data.get("level", 0)
         new_level = calculate_new_level(user_level_data["exp"], exp_per_level, max_level)
         
+        data_store.level_store().mark_dirty(guild_id, user_id)
         if new_level > old_level:
             user_level_data["level"] = new_level
-            save_json(LEVEL_FILE, all_level_data)
             await self.level_up(member, ctx.guild, ctx.channel, new_level, data)
-        else:
-            save_json(LEVEL_FILE, all_level_data)
             
         # DM disabled based on request
         # try:
@@ -1432,13 +1438,13 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         if not data:
             return await ctx.send("Belum ada data EXP di server ini.")
             
-        sorted_users = sorted(data.items(), key=lambda x: x[1].get('exp', 0), reverse=True)
+        top_users = get_rank_index().top(guild_id, 10)
         embed = discord.Embed(title="🏆 Leaderboard EXP", color=discord.Color.gold())
         
         if ctx.guild.icon:
             embed.set_thumbnail(url=ctx.guild.icon.url)
             
-        for idx, (user_id, user_data) in enumerate(sorted_users[:10], start=1):
+        for idx, (user_id, user_data) in enumerate(top_users, start=1):
             user = ctx.guild.get_member(int(user_id))
             if user:
                 badges = " ".join(user_data.get("badges", [])) or "Tidak ada"
@@ -1456,14 +1462,13 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         if not data:
             return await ctx.send("Belum ada data EXP di server ini.")
             
-        valid_users = {uid: udata for uid, udata in data.items() if ctx.guild.get_member(int(uid))}
-        sorted_users = sorted(valid_users.items(), key=lambda x: x[1].get('weekly_exp', 0), reverse=True)
+        top_users = get_rank_index().top(guild_id, 10, field="weekly_exp", predicate=lambda uid: ctx.guild.get_member(int(uid)))
         embed = discord.Embed(title="🏅 Weekly Leaderboard", color=discord.Color.blue())
         
         if ctx.guild.icon:
             embed.set_thumbnail(url=ctx.guild.icon.url)
             
-        for idx, (user_id, user_data) in enumerate(sorted_users[:10], start=1):
+        for idx, (user_id, user_data) in enumerate(top_users, start=1):
             user = ctx.guild.get_member(int(user_id))
             if user:
                 embed.add_field(name=f"{idx}. {user.display_name}", 
@@ -1484,12 +1489,7 @@ class Leveling(commands.Cog, name="⭐ Leveling Exp"):
         data = all_level_data.get(guild_id, {})
         bank = load_json(BANK_FILE)
         
-        sorted_users = sorted(data.items(), key=lambda x: x[1].get('exp', 0), reverse=True)
-        rank_pos = 1
-        for idx, (uid, udata) in enumerate(sorted_users):
-            if uid == user_id:
-                rank_pos = idx + 1
-                break
+        rank_pos = get_rank_index().rank_of(guild_id, user_id) or 1
 
         user_data = data.get(user_id, {"level": 0, "exp": 0, "badges": []})
         user_bank = bank.get(user_id, {"balance": 0})
@@ -0,0 +1,213 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from cogs import data_store
+
+log = logging.getLogger(__name__)
+
+HISTORY_LOG_FILE = os.path.join(data_store.BASE_DIR, "data", "listening_history.jsonl")
+LEGACY_HISTORY_FILE = os.path.join(data_store.BASE_DIR, "data", "listening_history.json")
+
+# Jumlah lagu terakhir per user yang disimpan di memori (sama dengan batas lama).
+RECENT_LIMIT = 50
+# Log dipadatkan menjadi MAX_LOG_ENTRIES baris terakhir begitu panjangnya dua kali lipat.
+MAX_LOG_ENTRIES = 20000
+FLUSH_INTERVAL = data_store.FLUSH_INTERVAL
+
+
+def track_key(song_info):
+    return song_info.get("webpage_url") or song_info.get("title")
+
+
+class ListeningHistory:
+    """
+    Riwayat lagu yang diputar, disimpan sebagai log JSONL append-only.
+    Setiap lagu cukup ditambahkan ke buffer; buffer ditulis ke akhir file secara
+    batch oleh timer, dan index di memori (lagu terakhir per user, jumlah putar per
+    user dan per guild) menjawab query tanpa membaca file.
+    """
+
+    def __init__(self, path=HISTORY_LOG_FILE, legacy_path=LEGACY_HISTORY_FILE):
+        self.path = path
+        self._pending = []
+        self._line_count = 0
+        self._recent = defaultdict(lambda: deque(maxlen=RECENT_LIMIT))
+        self._user_counts = defaultdict(Counter)
+        self._guild_counts = defaultdict(Counter)
+        self._tracks = {}
+        self._flush_task = None
+        self._async_lock = None
+        self._write_lock = threading.Lock()
+        if not os.path.exists(path) and os.path.exists(legacy_path):
+            self._migrate(legacy_path)
+        self._load()
+
+    def _migrate(self, legacy_path):
+        """Ubah listening_history.json lama (list per user, terbaru di depan) menjadi log JSONL."""
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning(f"Gagal membaca riwayat lama {legacy_path}: {e}")
+            return
+        entries = []
+        for user_id, songs in legacy.items() if isinstance(legacy, dict) else ():
+            if not isinstance(songs, list):
+                continue
+            for song in reversed(songs):
+                if isinstance(song, dict) and track_key(song):
+                    entries.append(self._entry(user_id, None, song, at=None))
+        self._write_lines([json.dumps(entry, ensure_ascii=False) for entry in entries], mode='w')
+        log.info(f"Migrasi {len(entries)} entri riwayat lama ke {self.path}.")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._line_count += 1
+                self._index(entry)
+
+    @staticmethod
+    def _entry(user_id, guild_id, song_info, at):
+        entry = {
+            "at": at,
+            "user": str(user_id),
+            "guild": str(guild_id) if guild_id else None,
+            "key": track_key(song_info),
+            "title": song_info.get("title"),
+            "artist": song_info.get("artist"),
+            "url": song_info.get("webpage_url"),
+        }
+        return {k: v for k, v in entry.items() if v is not None}
+
+    def _index(self, entry):
+        key = entry.get("key")
+        user_id = entry.get("user")
+        if not key or not user_id:
+            return
+        self._tracks[key] = {"title": entry.get("title") or key, "artist": entry.get("artist"), "webpage_url": entry.get("url")}
+        self._recent[user_id].append(entry)
+        self._user_counts[user_id][key] += 1
+        if entry.get("guild"):
+            self._guild_counts[entry["guild"]][key] += 1
+
+    def record(self, user_id, guild_id, song_info):
+        """Catat satu lagu yang diputar. Tidak ada I/O di sini; penulisan ke disk di-batch."""
+        if not song_info or not track_key(song_info):
+            return
+        entry = self._entry(user_id, guild_id, song_info, at=time.time())
+        self._index(entry)
+        self._pending.append(json.dumps(entry, ensure_ascii=False))
+        self._ensure_flusher()
+
+    def recent(self, user_id, limit=10):
+        """Lagu terakhir yang diputar user, terbaru lebih dulu."""
+        entries = self._recent.get(str(user_id), ())
+        return [self._tracks[entry["key"]] | {"at": entry.get("at")} for entry in list(reversed(entries))[:limit]]
+
+    def top_user_tracks(self, user_id, limit=10):
+        """List (info lagu, jumlah putar) terbanyak milik user."""
+        return self._top(self._user_counts.get(str(user_id)), limit)
+
+    def top_guild_tracks(self, guild_id, limit=10):
+        """List (info lagu, jumlah putar) terbanyak di satu guild."""
+        return self._top(self._guild_counts.get(str(guild_id)), limit)
+
+    def _top(self, counts, limit):
+        if not counts:
+            return []
+        return [(self._tracks[key], count) for key, count in counts.most_common(limit)]
+
+    def _ensure_flusher(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._pending:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error(f"Gagal flush {self.path}: {e}", exc_info=True)
+
+    def _write_lines(self, lines, mode='a'):
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if mode == 'a':
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.writelines(line + "\n" for line in lines)
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(line + "\n" for line in lines)
+            os.replace(tmp_path, self.path)
+
+    def _take_pending(self):
+        lines, self._pending = self._pending, []
+        self._line_count += len(lines)
+        return lines
+
+    def _compact(self):
+        """Tulis ulang log hanya dengan MAX_LOG_ENTRIES baris terakhir."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            tail = deque((line.rstrip("\n") for line in f if line.strip()), maxlen=MAX_LOG_ENTRIES)
+        self._write_lines(list(tail), mode='w')
+        return len(tail)
+
+    def _rebuild_index(self):
+        self._recent.clear()
+        self._user_counts.clear()
+        self._guild_counts.clear()
+        self._tracks.clear()
+        self._line_count = 0
+        self._load()
+
+    async def flush(self):
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            lines = self._take_pending()
+            if lines:
+                await asyncio.to_thread(self._write_lines, lines)
+            if self._line_count >= 2 * MAX_LOG_ENTRIES:
+                kept = await asyncio.to_thread(self._compact)
+                # Jumlah putar mengikuti isi log yang tersisa setelah pemadatan.
+                self._rebuild_index()
+                for line in self._pending:
+                    self._index(json.loads(line))
+                log.info(f"Log riwayat dipadatkan menjadi {kept} entri.")
+            return len(lines)
+
+    def flush_sync(self):
+        lines = self._take_pending()
+        if lines:
+            self._write_lines(lines)
+        return len(lines)
+
+
+_history = None
+
+
+def get_history():
+    """Satu ListeningHistory per proses, supaya reload cog tidak membuka log dua kali."""
+    global _history
+    if _history is None:
+        _history = ListeningHistory()
+        atexit.register(_history.flush_sync)
+    return _history
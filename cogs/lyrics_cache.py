@@ -0,0 +1,68 @@
+import os
+import re
+import time
+
+from cogs import data_store
+
+LYRICS_CACHE_FILE = os.path.join(data_store.BASE_DIR, "data", "lyrics_cache.json")
+
+MAX_ENTRIES = 1000
+FOUND_TTL = 30 * 86400
+# Hasil "tidak ditemukan" disimpan lebih singkat karena Genius bisa menambah lirik baru.
+MISS_TTL = 86400
+
+# Tambahan judul YouTube yang tidak ada di judul Genius.
+_NOISE = re.compile(r"[\(\[][^\)\]]*[\)\]]|\b(official|music|lyrics?|video|audio|hd|hq|mv)\b|\b(ft|feat)\b\.?.*$")
+
+
+def _store():
+    return data_store.get_store(LYRICS_CACHE_FILE)
+
+
+def _normalize(text):
+    text = _NOISE.sub(" ", (text or "").lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def lyrics_key(title, artist=None):
+    return f"{_normalize(title)}|{_normalize(artist)}"
+
+
+def get(key):
+    """Entri cache lirik ({"found": bool, ...}), atau None jika belum ada / kedaluwarsa."""
+    entries = _store().data
+    entry = entries.get(key)
+    if not entry:
+        return None
+    ttl = FOUND_TTL if entry.get("found") else MISS_TTL
+    if time.time() - entry.get("at", 0) > ttl:
+        entries.pop(key, None)
+        _store().mark_dirty(key)
+        return None
+    # Pindahkan ke belakang: dict menjaga urutan insert, jadi depan = paling lama tidak dipakai.
+    entries.pop(key)
+    entries[key] = entry
+    return entry
+
+
+def put(key, song):
+    """Simpan hasil search_song Genius; song=None dicatat sebagai hasil negatif."""
+    if song is None:
+        entry = {"found": False}
+    else:
+        entry = {
+            "found": True,
+            "title": song.title,
+            "artist": song.artist,
+            "url": song.url,
+            "art": song.song_art_image_url,
+            "lyrics": song.lyrics,
+        }
+    entry["at"] = time.time()
+    entries = _store().data
+    entries.pop(key, None)
+    entries[key] = entry
+    while len(entries) > MAX_ENTRIES:
+        entries.pop(next(iter(entries)))
+    _store().mark_dirty(key)
+    return entry
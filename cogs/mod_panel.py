@@ -0,0 +1,76 @@
+import hashlib
+import json
+from collections import Counter
+
+# Perubahan member beruntun (gelombang join, role massal) digabung menjadi satu update panel.
+PANEL_UPDATE_DELAY = 5
+
+
+def card_digest(*parts):
+    """Hash isi panel (tanpa footer yang berubah setiap render) untuk mendeteksi perubahan."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class MemberCounters:
+    """Jumlah bot dan jumlah member per role di satu guild."""
+
+    __slots__ = ("bots", "roles")
+
+    def __init__(self):
+        self.bots = 0
+        self.roles = Counter()
+
+    @classmethod
+    def scan(cls, guild):
+        counters = cls()
+        for member in guild.members:
+            counters.add(member)
+        return counters
+
+    def add(self, member, sign=1):
+        if member.bot:
+            self.bots += sign
+        for role in member.roles:
+            self.roles[role.id] += sign
+
+
+class PanelStats:
+    """
+    Counter member per guild untuk panel moderasi. Dihitung penuh sekali per guild,
+    setelah itu hanya disesuaikan dari event join/remove/update member.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+
+    def get(self, guild):
+        counters = self._guilds.get(guild.id)
+        if counters is None:
+            counters = self._guilds[guild.id] = MemberCounters.scan(guild)
+        return counters
+
+    def member_join(self, member):
+        counters = self._guilds.get(member.guild.id)
+        if counters is not None:
+            counters.add(member)
+
+    def member_remove(self, member):
+        counters = self._guilds.get(member.guild.id)
+        if counters is not None:
+            counters.add(member, sign=-1)
+
+    def member_update(self, before, after):
+        """Sesuaikan counter role; kembalikan set id role yang jumlahnya berubah."""
+        counters = self._guilds.get(after.guild.id)
+        before_ids = {role.id for role in before.roles}
+        after_ids = {role.id for role in after.roles}
+        if counters is None or before_ids == after_ids:
+            return set()
+        for role_id in before_ids - after_ids:
+            counters.roles[role_id] -= 1
+        for role_id in after_ids - before_ids:
+            counters.roles[role_id] += 1
+        return before_ids ^ after_ids
+
+    def drop(self, guild_id):
+        self._guilds.pop(guild_id, None)
@@ -11,9 +11,18 @@ import aiohttp
 import sys
 from discord import app_commands
 from datetime import datetime, timedelta, timezone
-from PIL import Image, ImageDraw, ImageFont
 import io
 import unicodedata
+from cogs.persistence import get_persistence
+from cogs.text_matcher import get_matcher, contains_suspicious_link
+from cogs.asset_cache import read_discord_asset
+from cogs.card_renderer import get_renderer
+from cogs.mod_panel import PANEL_UPDATE_DELAY, PanelStats, card_digest
+from cogs.rate_limit import MEDIA_RULES, TEXT_RULES, RateLimiter
+from cogs.purge import purge_messages
+from cogs.sanctions import OK, MembershipIndex, SanctionDispatcher, summarize
+from cogs.guild_settings import CHANNEL_RULE_DEFAULTS, GuildSettings, apply_defaults
+from cogs.data_store import FLUSH_INTERVAL
 
 WIB = timezone(timedelta(hours=7))
 
@@ -693,6 +702,9 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         self.status_file = "data/status.json"
         self.mod_panel_message_id = None
         self.mod_panel_channel_id = None
+        self.panel_stats = PanelStats()
+        self.panel_digests = {}
+        self.panel_update_tasks = {}
         
         self.modpanel_buttons = [
             {"label": "Warn", "style": 2, "emoji": "⚠️", "custom_id": "modpanel_warn"},
@@ -706,9 +718,9 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
             {"label": "Lock", "style": 4, "emoji": "🔒", "custom_id": "modpanel_lock"},
             {"label": "Unlock", "style": 3, "emoji": "🔓", "custom_id": "modpanel_unlock"}
         ]
-        self.spam_messages = {}
-        self.spam_history = {}
-        self.cross_channel_spam_history = {}
+        self.spam_limiter = RateLimiter()
+        self.membership_index = MembershipIndex()
+        self.sanctions = SanctionDispatcher(bot, self.membership_index, on_complete=self.send_sanction_report_v2)
         
         self.reminder_channel_id = 1379762287149187162
         self.male_role_id = 1385246612288311326
@@ -726,37 +738,33 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         self.color_announce = 0xFFE000
         self.color_booster = 0xFFE000
         
-        self.media_spam_cooldown = commands.CooldownMapping.from_cooldown(3, 30.0, commands.BucketType.user)
-        self.media_spam_rapid_cooldown = commands.CooldownMapping.from_cooldown(5, 10.0, commands.BucketType.user)
-        self.media_spam_heavy_cooldown = commands.CooldownMapping.from_cooldown(8, 60.0, commands.BucketType.user)
-        self.link_spam_cooldown = commands.CooldownMapping.from_cooldown(2, 60.0, commands.BucketType.user)
-        self.fast_spam_cooldown = commands.CooldownMapping.from_cooldown(5, 10.0, commands.BucketType.user)
-        self.global_spam_cooldown = commands.CooldownMapping.from_cooldown(8, 15.0, commands.BucketType.user)
-        self.multi_media_cooldown = commands.CooldownMapping.from_cooldown(1, 5.0, commands.BucketType.user)
-
-        self.mongo_client = getattr(bot, 'mongo_client', None)
-        if self.mongo_client:
-            self.db = self.mongo_client["reSwan"]
-            self.settings_col = self.db["moderation_settings"]
-            self.filters_col = self.db["moderation_filters"]
-            self.warnings_col = self.db["moderation_warnings"]
-            self.status_col = self.db["moderation_status"]
+        self.persistence = get_persistence(bot)
+        self.settings_col = "moderation_settings"
+        self.filters_col = "moderation_filters"
+        self.warnings_col = "moderation_warnings"
+        self.status_col = "moderation_status"
+
+        self.settings = load_data(self.settings_file)
+        self.settings_version = 0
+        self.settings_dirty = False
+        self.guild_views = {}
+        self._apply_settings_defaults()
+        self.filters = load_data(self.filters_file)
+        self.filters_version = 0
+        self.warnings = load_data(self.warnings_file)
+        self.status = load_data(self.status_file)
+
+    async def cog_load(self):
+        self.settings = await self.load_data_from_mongo(self.settings_col, self.settings_file)
+        self.filters = await self.load_data_from_mongo(self.filters_col, self.filters_file)
+        self.filters_version += 1
+        self.warnings = await self.load_data_from_mongo(self.warnings_col, self.warnings_file)
+        self.status = await self.load_data_from_mongo(self.status_col, self.status_file)
+        
+        if self._apply_settings_defaults():
+            self.save_settings()
         else:
-            self.settings_col = None
-            self.filters_col = None
-            self.warnings_col = None
-            self.status_col = None
-
-        self.settings = self.load_data_from_mongo(self.settings_col, self.settings_file)
-        self.filters = self.load_data_from_mongo(self.filters_col, self.filters_file)
-        self.warnings = self.load_data_from_mongo(self.warnings_col, self.warnings_file)
-        self.status = self.load_data_from_mongo(self.status_col, self.status_file)
-        
-        for guild_id_str, g_settings in self.settings.items():
-            if isinstance(g_settings, dict):
-                if "announcement_webhooks" not in g_settings:
-                    g_settings["announcement_webhooks"] = {}
-        self.save_settings()
+            self.settings_version += 1
 
         if "status" not in self.status:
             self.status["status"] = "online"
@@ -772,270 +780,117 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
 
         self.update_panel_task.start()
         self.cleanup_spam_history.start()
+        self.flush_settings.start()
         
     def cog_unload(self):
         self.update_panel_task.cancel()
         self.cleanup_spam_history.cancel()
+        self.flush_settings.cancel()
+        if self.settings_dirty:
+            self.save_settings()
+        for task in self.panel_update_tasks.values():
+            task.cancel()
 
-    async def _create_welcome_card(self, member: discord.Member, title: str) -> io.BytesIO:
-        width = 800
-        height = 250
-        background = Image.new('RGBA', (width, height), (20, 22, 26, 255))
-        draw = ImageDraw.Draw(background)
-        
-        # Left accent circle
-        draw.ellipse((-150, -50, 320, 400), fill=(30, 34, 45, 255)) 
-        draw.ellipse((-130, -30, 300, 380), outline=(88, 101, 242, 180), width=4) 
-        
+    async def _render_member_card(self, kind: str, member: discord.Member, title: str) -> io.BytesIO:
         try:
-            avatar_bytes = await member.display_avatar.replace(size=128, format="png").read()
-            avatar_img = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
-            avatar_img = avatar_img.resize((150, 150))
-            mask = Image.new("L", (150, 150), 0)
-            ImageDraw.Draw(mask).ellipse((0, 0, 150, 150), fill=255)
-            background.paste(avatar_img, (60, 50), mask)
-            draw.ellipse((56, 46, 214, 214), outline=(88, 101, 242, 255), width=6)
+            avatar_bytes = await read_discord_asset(member.display_avatar.replace(size=128, format="png"))
         except Exception:
-            pass
+            avatar_bytes = None
 
-        try:
-            url_bold = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf"
-            url_reg = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url_bold) as r1:
-                    font_bold_bytes = await r1.read()
-                    font_bold = ImageFont.truetype(io.BytesIO(font_bold_bytes), 42)
-                    font_title = ImageFont.truetype(io.BytesIO(font_bold_bytes), 22)
-                async with session.get(url_reg) as r2:
-                    font_reg_bytes = await r2.read()
-                    font_sub = ImageFont.truetype(io.BytesIO(font_reg_bytes), 20)
-                    font_small = ImageFont.truetype(io.BytesIO(font_reg_bytes), 16)
-        except Exception:
-            font_bold = ImageFont.load_default()
-            font_title = ImageFont.load_default()
-            font_sub = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-
-        import unicodedata
-        safe_guild = unicodedata.normalize('NFKC', member.guild.name)
-        safe_name = unicodedata.normalize('NFKC', member.display_name)
-        
-        text_x = 360
-        
-        draw.text((text_x, 40), title, font=font_title, fill=(114, 137, 218, 255))
-        draw.text((text_x, 70), safe_name, font=font_bold, fill=(255, 255, 255, 255))
-        
-        draw.line([(text_x, 135), (750, 135)], fill=(100, 100, 100, 80), width=2)
-        
-        draw.text((text_x, 150), f"Selamat datang di {safe_guild}!", font=font_sub, fill=(200, 200, 200, 255))
-        draw.text((text_x, 185), "Semoga betah dan aktif terus ya!", font=font_sub, fill=(150, 255, 150, 255))
-        
-        badge_text = f"Member #{member.guild.member_count}"
-        draw.rounded_rectangle([(630, 20), (760, 50)], radius=15, fill=(40, 44, 52, 255), outline=(88, 101, 242, 180), width=1)
-        draw.text((650, 25), badge_text, font=font_small, fill=(200, 200, 200, 255))
+        png = await get_renderer().render(kind, {
+            "avatar": avatar_bytes,
+            "title": title,
+            "name": unicodedata.normalize('NFKC', member.display_name),
+            "guild_name": unicodedata.normalize('NFKC', member.guild.name),
+            "member_count": member.guild.member_count if kind == "welcome" else None,
+        })
+        return io.BytesIO(png)
 
-        buffer = io.BytesIO()
-        background.save(buffer, format="PNG")
-        buffer.seek(0)
-        return buffer
+    async def _create_welcome_card(self, member: discord.Member, title: str) -> io.BytesIO:
+        return await self._render_member_card("welcome", member, title)
 
     async def _create_goodbye_card(self, member: discord.Member, title: str) -> io.BytesIO:
-        width = 800
-        height = 250
-        background = Image.new('RGBA', (width, height), (26, 20, 20, 255))
-        draw = ImageDraw.Draw(background)
-        
-        draw.ellipse((-150, -50, 320, 400), fill=(40, 25, 25, 255)) 
-        draw.ellipse((-130, -30, 300, 380), outline=(242, 88, 88, 180), width=4)
-        
-        try:
-            avatar_bytes = await member.display_avatar.replace(size=128, format="png").read()
-            avatar_img = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
-            avatar_img = avatar_img.resize((150, 150))
-            mask = Image.new("L", (150, 150), 0)
-            ImageDraw.Draw(mask).ellipse((0, 0, 150, 150), fill=255)
-            
-            grayscale = avatar_img.convert('L')
-            grayscale_rgba = Image.new("RGBA", grayscale.size)
-            grayscale_rgba.paste(grayscale, (0, 0), mask)
-            
-            background.paste(grayscale_rgba, (60, 50), mask)
-            draw.ellipse((56, 46, 214, 214), outline=(242, 88, 88, 255), width=6)
-        except Exception:
-            pass
-
-        try:
-            url_bold = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf"
-            url_reg = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url_bold) as r1:
-                    font_bold_bytes = await r1.read()
-                    font_bold = ImageFont.truetype(io.BytesIO(font_bold_bytes), 42)
-                    font_title = ImageFont.truetype(io.BytesIO(font_bold_bytes), 22)
-                async with session.get(url_reg) as r2:
-                    font_reg_bytes = await r2.read()
-                    font_sub = ImageFont.truetype(io.BytesIO(font_reg_bytes), 20)
-        except Exception:
-            font_bold = ImageFont.load_default()
-            font_title = ImageFont.load_default()
-            font_sub = ImageFont.load_default()
-
-        import unicodedata
-        safe_guild = unicodedata.normalize('NFKC', member.guild.name)
-        safe_name = unicodedata.normalize('NFKC', member.display_name)
-        
-        text_x = 360
-        
-        draw.text((text_x, 40), title, font=font_title, fill=(235, 100, 100, 255))
-        draw.text((text_x, 70), safe_name, font=font_bold, fill=(255, 255, 255, 255))
-        
-        draw.line([(text_x, 135), (750, 135)], fill=(100, 100, 100, 80), width=2)
-        
-        draw.text((text_x, 150), f"Telah meninggalkan {safe_guild}...", font=font_sub, fill=(180, 180, 180, 255))
-        draw.text((text_x, 185), "Yah, padahal lagi seru-serunya...", font=font_sub, fill=(255, 150, 150, 255))
+        return await self._render_member_card("goodbye", member, title)
 
-        buffer = io.BytesIO()
-        background.save(buffer, format="PNG")
-        buffer.seek(0)
-        return buffer
+    def _apply_settings_defaults(self) -> bool:
+        changed = False
+        for guild_id_str, g_settings in self.settings.items():
+            if isinstance(g_settings, dict):
+                changed = apply_defaults(g_settings) or changed
+        return changed
 
     def get_guild_settings(self, guild_id: int):
         guild_id_str = str(guild_id)
-        if guild_id_str not in self.settings:
-            self.settings[guild_id_str] = {
-                "auto_role_id": None, 
-                "welcome_channel_id": None,
-                "welcome_message": "Selamat datang di **{guild_name}**, {user}! 🎉",
-                "welcome_embed_title": "SELAMAT DATANG!",
-                "welcome_sender_name": "Admin Server",
-                "welcome_banner_url": None, 
-                "log_channel_id": None, 
-                "reaction_roles": {},
-                "channel_rules": {},
-                "boost_channel_id": None,
-                "boost_message": "Terima kasih banyak, {user}, telah menjadi **Server Booster** kami di {guild_name}! Kami sangat menghargai dukunganmu! ❤️",
-                "boost_embed_title": "TERIMA KASIH SERVER BOOSTER!",
-                "boost_sender_name": "Tim Server",
-                "boost_image_url": None,
-                "mod_panel_message_id": None,
-                "mod_panel_channel_id": None,
-                "main_membership_role_id": None, 
-                "membership_roles": {}, 
-                "membership_invite_message": "🥺 Anda belum menjadi anggota channel YouTube. Silakan berlangganan untuk mendapatkan role eksklusif! [LINK MEMBERSHIP]", 
-                "membership_confirm_message": "🎉 Anda sudah menjadi anggota! Anda adalah anggota tier: **{tier_name}**.",
-                "verification_button_label": "Verifikasi Membership",
-                "spam_whitelist_roles": [],
-                "goodbye_message": "Selamat tinggal, **{user}**. Sampai jumpa lagi! 👋",
-                "panel_role_stats": []
-                
-            }
-            save_data(self.settings_file, self.settings)
-        if "role_panels" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["role_panels"] = {}
-        if "goodbye_message" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["goodbye_message"] = "Selamat tinggal, **{user}**. Sampai jumpa lagi! 👋"
-        if "welcome_embed_title" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["welcome_embed_title"] = "SELAMAT DATANG!"
-        if "welcome_sender_name" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["welcome_sender_name"] = "Admin Server"
-        if "welcome_banner_url" not in self.settings[guild_id_str]: 
-            self.settings[guild_id_str]["welcome_banner_url"] = None
-        if "channel_rules" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["channel_rules"] = {}
-        if "boost_channel_id" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["boost_channel_id"] = None
-        if "boost_message" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["boost_message"] = "Terima kasih banyak, {user}, telah menjadi **Server Booster** kami di {guild_name}! Kami sangat menghargai dukunganmu! ❤️"
-        if "boost_embed_title" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["boost_embed_title"] = "TERIMA KASIH SERVER BOOSTER!"
-        if "boost_sender_name" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["boost_sender_name"] = "Tim Server"
-        if "boost_image_url" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["boost_image_url"] = None
-        if "announcement_webhooks" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["announcement_webhooks"] = {}
-        if "mod_panel_message_id" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["mod_panel_message_id"] = None
-        if "mod_panel_channel_id" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["mod_panel_channel_id"] = None
-        if "main_membership_role_id" not in self.settings[guild_id_str]: 
-            self.settings[guild_id_str]["main_membership_role_id"] = None
-        if "membership_roles" not in self.settings[guild_id_str]: 
-            self.settings[guild_id_str]["membership_roles"] = {}
-        if "membership_invite_message" not in self.settings[guild_id_str]: 
-            self.settings[guild_id_str]["membership_invite_message"] = "🥺 Anda belum menjadi anggota channel YouTube. Silakan berlangganan untuk mendapatkan role eksklusif! [LINK MEMBERSHIP]"
-        if "membership_confirm_message" not in self.settings[guild_id_str]: 
-            self.settings[guild_id_str]["membership_confirm_message"] = "🎉 Anda sudah menjadi anggota! Anda adalah anggota tier: **{tier_name}**."
-        if "verification_button_label" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["verification_button_label"] = "Verifikasi Membership" 
-        if "spam_whitelist_roles" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["spam_whitelist_roles"] = []
-        if "panel_role_stats" not in self.settings[guild_id_str]:
-            self.settings[guild_id_str]["panel_role_stats"] = []
-
-
-        save_data(self.settings_file, self.settings)
-        return self.settings[guild_id_str]
+        guild_settings = self.settings.get(guild_id_str)
+        if guild_settings is None:
+            guild_settings = self.settings[guild_id_str] = {}
+            apply_defaults(guild_settings)
+            self.mark_settings_dirty()
+        return guild_settings
+
+    def guild_view(self, guild_id: int) -> GuildSettings:
+        """Pengaturan guild yang sudah dipra-hitung untuk on_message; dibangun ulang jika settings/filter berubah."""
+        view = self.guild_views.get(guild_id)
+        if view is None or view.version != (self.settings_version, self.filters_version):
+            guild_settings = self.get_guild_settings(guild_id)
+            bad_words = self.get_filter_matcher(guild_id, "bad_words")
+            view = self.guild_views[guild_id] = GuildSettings.build(guild_id, guild_settings, (self.settings_version, self.filters_version), bad_words)
+        return view
         
     def get_channel_rules(self, guild_id: int, channel_id: int) -> dict:
         guild_settings = self.get_guild_settings(guild_id)
         channel_id_str = str(channel_id)
         if channel_id_str not in guild_settings["channel_rules"]:
-            guild_settings["channel_rules"][channel_id_str] = {
-                "disallow_bots": False, "disallow_media": False, "disallow_prefix": False,
-                "disallow_url": False, "auto_delete_seconds": 0
-            }
-            save_data(self.settings_file, self.settings)
+            guild_settings["channel_rules"][channel_id_str] = dict(CHANNEL_RULE_DEFAULTS)
+            self.mark_settings_dirty()
         return guild_settings["channel_rules"][channel_id_str]
         
     def get_guild_filters(self, guild_id: int):
         guild_id_str = str(guild_id)
         if guild_id_str not in self.filters:
             self.filters[guild_id_str] = { "bad_words": [], "link_patterns": [] }
+            self.filters_version += 1
             save_data(self.filters_file, self.filters)
         return self.filters[guild_id_str]
+
+    def get_filter_matcher(self, guild_id: int, filter_type: str = "bad_words"):
+        guild_filters = self.get_guild_filters(guild_id)
+        return get_matcher(("moderation", str(guild_id), filter_type), self.filters_version, guild_filters.get(filter_type, []))
         
-    def load_data_from_mongo(self, collection, local_path):
-        if collection is not None:
-            try:
-                doc = collection.find_one({"_id": local_path})
-                if doc and "data" in doc:
-                    return doc["data"]
-            except Exception:
-                pass
+    async def load_data_from_mongo(self, collection, local_path):
+        data = await self.persistence.load(collection, local_path)
+        if data is not None:
+            return data
         return load_data(local_path)
 
     def save_settings(self):
+        self.settings_dirty = False
+        self.settings_version += 1
         save_data(self.settings_file, self.settings)
-        if self.settings_col is not None:
-            try:
-                self.settings_col.replace_one({"_id": self.settings_file}, {"_id": self.settings_file, "data": self.settings}, upsert=True)
-            except Exception:
-                pass
+        self.persistence.upsert(self.settings_col, self.settings_file, self.settings)
+
+    def mark_settings_dirty(self):
+        # Ditulis oleh flush_settings, bukan langsung di jalur per-pesan.
+        self.settings_dirty = True
+        self.settings_version += 1
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_settings(self):
+        if self.settings_dirty:
+            self.save_settings()
 
     def save_filters(self):
+        self.filters_version += 1
         save_data(self.filters_file, self.filters)
-        if self.filters_col is not None:
-            try:
-                self.filters_col.replace_one({"_id": self.filters_file}, {"_id": self.filters_file, "data": self.filters}, upsert=True)
-            except Exception:
-                pass
+        self.persistence.upsert(self.filters_col, self.filters_file, self.filters)
 
     def save_warnings(self):
         save_data(self.warnings_file, self.warnings)
-        if self.warnings_col is not None:
-            try:
-                self.warnings_col.replace_one({"_id": self.warnings_file}, {"_id": self.warnings_file, "data": self.warnings}, upsert=True)
-            except Exception:
-                pass
+        self.persistence.upsert(self.warnings_col, self.warnings_file, self.warnings)
 
     def save_status(self):
         save_data(self.status_file, self.status)
-        if self.status_col is not None:
-            try:
-                self.status_col.replace_one({"_id": self.status_file}, {"_id": self.status_file, "data": self.status}, upsert=True)
-            except Exception:
-                pass
+        self.persistence.upsert(self.status_col, self.status_file, self.status)
 
     async def check_and_escalate_warnings(self, guild, member, moderator):
         guild_id_str = str(guild.id)
@@ -1126,6 +981,49 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         except:
             pass
 
+    async def send_sanction_report_v2(self, user_id: int, job: dict):
+        guild = self.bot.get_guild(job.get("origin_guild_id") or 0)
+        if not guild:
+            return
+        spam_log_channel_id = self.get_guild_settings(guild.id).get("spam_log_channel_id")
+        if not spam_log_channel_id: return
+        log_channel = guild.get_channel(spam_log_channel_id)
+        if not log_channel or not log_channel.permissions_for(guild.me).send_messages: return
+
+        from cogs.v2_layout import build_v2_card, send_v2_message
+
+        lines = []
+        for guild_id, outcome in job["results"].items():
+            target = self.bot.get_guild(int(guild_id))
+            name = target.name if target else guild_id
+            lines.append(f"✅ {name}" if outcome == OK else f"⛔ {name} — {outcome}")
+        shown = ""
+        for index, line in enumerate(lines):
+            if len(shown) + len(line) > 900:
+                shown += f"... dan {len(lines) - index} server lain"
+                break
+            shown += line + "\n"
+
+        v2_fields = [
+            {"name": "👤 Pelaku", "value": f"<@{user_id}> (`{user_id}`)"},
+            {"name": "📊 Ringkasan", "value": " • ".join(f"{outcome}: {count}" for outcome, count in summarize(job).items()) or "Tidak ada server"},
+            {"name": "🌐 Hasil per Server", "value": shown or "-"},
+            {"name": "⏱️ Durasi", "value": f"{job.get('elapsed', 0):.1f} detik"}
+        ]
+
+        card = build_v2_card(
+            title="🌐 TIMEOUT GLOBAL SELESAI",
+            description="Hasil sanksi timeout lintas server dari channel jebakan.",
+            fields=v2_fields,
+            color=None,
+            footer=f"Sistem Keamanan Otomatis • {guild.name}"
+        )
+
+        try:
+            await send_v2_message(self.bot, log_channel.id, [card])
+        except:
+            pass
+
     async def get_or_create_announcement_webhook(self, channel: discord.TextChannel, custom_name: str):
         guild_settings = self.get_guild_settings(channel.guild.id)
         webhook_url = guild_settings.get("announcement_webhooks", {}).get(str(channel.id))
@@ -1183,25 +1081,7 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         return True, "Base Tier / Tier Role Belum Didaftarkan"
 
     def detect_suspicious_links(self, content: str) -> bool:
-        suspicious_patterns = [
-            r'discord\.gift', r'discord\.com\/gifts', r'discordapp\.com\/gifts',
-            r'free-nitro', r'steam-community', r'steamcommunity\.com',
-            r'bit\.ly', r'tinyurl\.com', r'shorturl\.at', r'rb\.gy',
-            r'discord-nitro', r'claim-reward', r'free-gift'
-        ]
-        
-        content_lower = content.lower()
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, content_lower):
-                return True
-        
-        urls = self.url_regex.findall(content)
-        for url in urls:
-            if any(suspicious in url.lower() for suspicious in ['discordgift', 'nitro-free', 'steamgift']):
-                return True
-    
-        return False
+        return contains_suspicious_link(content, self.url_regex)
 
     def is_allowed_file_type(self, filename: str) -> bool:
         allowed_extensions = {
@@ -1217,16 +1097,14 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
 
     @tasks.loop(minutes=5)
     async def cleanup_spam_history(self):
-        current_time = time.time()
-        
-        for user_id in list(self.cross_channel_spam_history.keys()):
-            self.cross_channel_spam_history[user_id] = [
-                entry for entry in self.cross_channel_spam_history[user_id]
-                if current_time - entry['timestamp'] <= 300
-            ]
-            
-            if not self.cross_channel_spam_history[user_id]:
-                del self.cross_channel_spam_history[user_id]
+        self.spam_limiter.sweep()
+
+    async def delete_tracked_messages(self, guild: discord.Guild, messages: list, reason: str) -> dict:
+        try:
+            return await purge_messages(guild, messages, reason=reason)
+        except Exception as e:
+            print(f"Purge spam gagal: {e}")
+            return {"deleted": 0, "failed": len(messages), "requests": 0, "channels": 0, "elapsed": 0.0}
     def _build_role_panel_embeds_and_view(
         self,
         guild: discord.Guild,
@@ -1672,7 +1550,7 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
             self.color_warning
         )
 
-        await self.update_panel(member.guild)
+        self.request_panel_update(member.guild)
     
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
@@ -1738,36 +1616,34 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
             except discord.Forbidden:
                 pass
     
-        await self.update_panel(member.guild)
+        self.request_panel_update(member.guild)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if not message.guild:
             return
             
+        settings_view = self.guild_view(message.guild.id)
         if message.author.bot or message.author.id == self.bot.user.id:
-            rules = self.get_channel_rules(message.guild.id, message.channel.id)
-            if (delay := rules.get("auto_delete_seconds", 0)) > 0:
+            rules = settings_view.rules_for(message.channel.id)
+            if (delay := rules.auto_delete_seconds) > 0:
                 try:
                     await message.delete(delay=delay)
                 except Exception:
                     pass
-            if rules.get("disallow_bots"):
+            if rules.disallow_bots:
                 try:
                     await message.delete()
                 except Exception:
                     pass
             return
 
-        guild_settings = self.get_guild_settings(message.guild.id)
-        whitelist_roles = guild_settings.get("spam_whitelist_roles", [])
-        is_whitelisted = any(r.id in whitelist_roles for r in message.author.roles)
-        user_id_str = str(message.author.id)
+        is_whitelisted = settings_view.is_whitelisted(message.author)
         is_command = message.content.startswith(tuple(await self.bot.get_prefix(message)))
         
         # Trigger Channel Trap (Honey-Pot)
-        trigger_channels = guild_settings.get("trigger_channels", [])
-        if message.channel.id in trigger_channels and not is_command:
+        if message.channel.id in settings_view.trigger_channels and not is_command:
+            guild_settings = self.get_guild_settings(message.guild.id)
             try:
                 await message.delete()
             except discord.Forbidden:
@@ -1778,35 +1654,16 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                 return
 
             try:
-                # Global Timeout (Lintas Server)
+                # Global Timeout (Lintas Server): jalan paralel di background, hasilnya dilaporkan ke spam log.
                 timeout_duration = timedelta(days=27, hours=23, minutes=59)
                 timeout_reason = "Terdeteksi mengirim pesan berisi spam atau phising (Sistem Anti-Spam)"
-                
-                for guild_obj in self.bot.guilds:
-                    member_in_guild = guild_obj.get_member(message.author.id)
-                    if member_in_guild and not member_in_guild.is_timed_out():
-                        try:
-                            await member_in_guild.timeout(timeout_duration, reason=timeout_reason)
-                        except Exception:
-                            pass
+                self.sanctions.dispatch(message.author.id, timeout_duration, timeout_reason, origin_guild_id=message.guild.id, origin_channel_id=message.channel.id)
             except Exception as e:
                 print(f"Global timeout failed: {e}")
                 
-            if user_id_str in self.cross_channel_spam_history:
-                messages_to_delete = self.cross_channel_spam_history.pop(user_id_str, [])
-                delete_tasks = []
-                for entry in messages_to_delete:
-                    try:
-                        channel_to_purge = message.guild.get_channel(entry['channel_id'])
-                        if channel_to_purge and channel_to_purge.permissions_for(message.guild.me).manage_messages:
-                            delete_tasks.append(channel_to_purge.delete_messages([discord.Object(id=entry['message_id'])], reason="Trigger Channel Trap Activated"))
-                    except Exception:
-                        continue
-                if delete_tasks:
-                    try:
-                        await asyncio.gather(*delete_tasks, return_exceptions=True)
-                    except Exception:
-                        pass
+            messages_to_delete = self.spam_limiter.take_messages(message.author.id)
+            if messages_to_delete:
+                await self.delete_tracked_messages(message.guild, messages_to_delete, "Trigger Channel Trap Activated")
                         
             await self.send_spam_log_v2(message.guild, message.author, message.channel.mention, "Terdeteksi mengirim pesan berisi spam atau phising (Sistem Anti-Spam)", "Pengguna terdeteksi mengirim pesan berisi spam atau mengirim pesan di channel terlarang. Sistem telah menjatuhkan sanksi Timeout 28 Hari secara otomatis.", str(message.id))
             
@@ -1871,46 +1728,22 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         current_time = time.time()
         message_content_lower = message.content.lower()
         
-
+        # Semua aturan rate-limit dievaluasi sekali jalan untuk pesan ini.
+        spam_violations = set()
+        if not message.author.guild_permissions.kick_members and not is_whitelisted:
+            spam_rules = () if is_command else TEXT_RULES
+            if message.attachments:
+                spam_rules += MEDIA_RULES
+            spam_violations = self.spam_limiter.hit(
+                message.author.id, spam_rules, now=current_time,
+                channel_id=message.channel.id, message_id=None if is_command else message.id
+            )
 
         if not message.author.guild_permissions.kick_members and not is_whitelisted and not is_command:
             
-            if user_id_str not in self.cross_channel_spam_history:
-                self.cross_channel_spam_history[user_id_str] = []
-            
-            self.cross_channel_spam_history[user_id_str].append({
-                'channel_id': message.channel.id,
-                'message_id': message.id,
-                'timestamp': current_time,
-                'content': message.content[:100]
-            })
-            
-            self.cross_channel_spam_history[user_id_str] = [
-                entry for entry in self.cross_channel_spam_history[user_id_str]
-                if current_time - entry['timestamp'] <= 30
-            ]
-            
-            global_bucket = self.global_spam_cooldown.get_bucket(message)
-            global_retry_after = global_bucket.update_rate_limit()
-            
-            if global_retry_after:
-                messages_to_delete = self.cross_channel_spam_history.pop(user_id_str, [])
-                
-                delete_tasks = []
-                for entry in messages_to_delete:
-                    try:
-                        channel = message.guild.get_channel(entry['channel_id'])
-                        if channel and channel.permissions_for(message.guild.me).manage_messages:
-                            tasks.append(channel.delete_messages([discord.Object(id=entry['message_id'])], reason="Global Cross-Channel Spam Detected"))
-                    except Exception:
-                        continue
-                
-                if delete_tasks:
-                    try:
-                        await asyncio.gather(*delete_tasks, return_exceptions=True)
-                    except discord.Forbidden:
-                       await self.log_action(message.guild, "❌ PENGHAPUSAN SPAM LINTAS CHANNEL GAGAL", 
-                           {"Member": message.author.mention, "Channel Pemicu": message.channel.mention, "Error": "Gagal menghapus beberapa pesan (Forbidden/Izin)."}, self.color_error)
+            if "global" in spam_violations:
+                messages_to_delete = self.spam_limiter.take_messages(message.author.id, now=current_time)
+                purge_result = await self.delete_tracked_messages(message.guild, messages_to_delete, "Global Cross-Channel Spam Detected")
 
                 if not message.author.is_timed_out():
                     duration = timedelta(minutes=30)
@@ -1920,7 +1753,7 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                         await message.author.timeout(duration, reason=reason)
                         
                         spam_count = len(messages_to_delete)
-                        channels_affected = len(set(entry['channel_id'] for entry in messages_to_delete))
+                        channels_affected = len(set(channel_id for channel_id, _ in messages_to_delete))
                         
                         await message.channel.send(
                             embed=self._create_embed(
@@ -1937,6 +1770,7 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                                 "Member": message.author.mention,
                                 "Total Pesan": spam_count,
                                 "Channel Terlibat": channels_affected,
+                                "Pesan Terhapus": f"{purge_result['deleted']} ({purge_result['requests']} request, {purge_result['elapsed']:.2f} detik)",
                                 "Aksi": "Timeout (30m) + Hapus Semua Pesan"
                             },
                             self.color_error
@@ -1947,33 +1781,10 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                 
                 return
             
-            self.spam_history.setdefault(user_id_str, []).append({
-                'channel_id': message.channel.id, 
-                'message_id': message.id, 
-                'timestamp': current_time
-            })
-
-            bucket = self.fast_spam_cooldown.get_bucket(message)
-            retry_after = bucket.update_rate_limit()
-
-            if retry_after:
-                
-                messages_to_delete = self.spam_history.pop(user_id_str, [])
-                
-                tasks = []
-                for entry in messages_to_delete:
-                    try:
-                        channel = message.guild.get_channel(entry['channel_id'])
-                        if channel and channel.permissions_for(message.guild.me).manage_messages:
-                            tasks.append(channel.delete_messages([discord.Object(id=entry['message_id'])], reason="Global Spam Detected"))
-                    except Exception:
-                        pass
-                
-                if tasks:
-                    try:
-                        await asyncio.gather(*tasks, return_exceptions=True)
-                    except discord.Forbidden:
-                       await self.send_spam_log_v2(message.guild, message.author, message.channel.mention, "Gagal Menghapus Pesan Spam", "Bot kekurangan izin Manage Messages.", str(message.id))
+            if "fast" in spam_violations:
+                fast_window = self.spam_limiter.rules["fast"].per
+                messages_to_delete = self.spam_limiter.take_messages(message.author.id, window=fast_window, now=current_time)
+                await self.delete_tracked_messages(message.guild, messages_to_delete, "Global Spam Detected")
 
 
                 if not message.author.is_timed_out():
@@ -1996,16 +1807,6 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                         await self.send_spam_log_v2(message.guild, message.author, message.channel.mention, "Terdeteksi mengirim pesan berisi spam atau phising (Sistem Anti-Spam)", "Pengguna terdeteksi mengirim pesan teks berisi spam secara beruntun (Fast Spam). Sistem gagal menjatuhkan sanksi karena kekurangan izin.", str(message.id))
                         
                 return
-            
-            cooldown_duration = self.fast_spam_cooldown._cooldown.per 
-            
-            if user_id_str in self.spam_history:
-                self.spam_history[user_id_str] = [
-                    entry for entry in self.spam_history[user_id_str] 
-                    if current_time - entry['timestamp'] <= cooldown_duration
-                ]
-                if not self.spam_history[user_id_str]:
-                    del self.spam_history[user_id_str]
         
         if not message.author.guild_permissions.kick_members and not is_whitelisted:
             if self.detect_suspicious_links(message.content):
@@ -2069,17 +1870,16 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                         pass
                     return
 
-            rapid_bucket = self.media_spam_rapid_cooldown.get_bucket(message)
-            rapid_retry_after = rapid_bucket.update_rate_limit()
+            rapid_retry_after = "media_rapid" in spam_violations
 
             if media_count >= 5:
-                rapid_retry_after = 1.0
+                rapid_retry_after = True
             
             if rapid_retry_after:
                 try:
                     await message.delete()
                     if not message.author.is_timed_out():
-                        await message.author.timeout(timeout_duration, reason="Rapid media spam (5+ media in 10 seconds or single message)")
+                        await message.author.timeout(timedelta(minutes=15), reason="Rapid media spam (5+ media in 10 seconds or single message)")
                         try:
                             await message.author.send(embed=self._create_embed(description=f"⚠️ Anda telah di-timeout selama 15 Menit oleh sistem keamanan karena mengirim terlalu banyak media secara beruntun.\n\n*Anda dapat mengajukan banding atas aksi ini dengan mengirim DM ke admin/moderator server.*", color=self.color_error))
                         except: pass
@@ -2096,11 +1896,10 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                 except discord.Forbidden:
                     pass
 
-            basic_bucket = self.media_spam_cooldown.get_bucket(message)
-            basic_retry_after = basic_bucket.update_rate_limit()
+            basic_retry_after = "media" in spam_violations
 
             if media_count >= 3:
-                basic_retry_after = 1.0 # Force trigger jika 3+ media dalam satu pesan
+                basic_retry_after = True # Force trigger jika 3+ media dalam satu pesan
             
             if basic_retry_after:
                 try:
@@ -2124,14 +1923,13 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                 except discord.Forbidden:
                     pass
 
-            heavy_bucket = self.media_spam_heavy_cooldown.get_bucket(message)
-            heavy_retry_after = heavy_bucket.update_rate_limit()
+            heavy_retry_after = "media_heavy" in spam_violations
             
             if heavy_retry_after:
                 try:
                     await message.delete()
                     if not message.author.is_timed_out():
-                        await message.author.timeout(timeout_duration, reason="Heavy media spam (8+ media in 60 seconds)")
+                        await message.author.timeout(timedelta(minutes=30), reason="Heavy media spam (8+ media in 60 seconds)")
                         try:
                             await message.author.send(embed=self._create_embed(description=f"⚠️ Anda telah di-timeout selama 30 Menit oleh sistem keamanan karena spam media berat.\n\n*Anda dapat mengajukan banding atas aksi ini dengan mengirim DM ke admin/moderator server.*", color=self.color_error))
                         except: pass
@@ -2165,22 +1963,22 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         if is_command:
             return 
         
-        rules = self.get_channel_rules(message.guild.id, message.channel.id)
+        rules = settings_view.rules_for(message.channel.id)
 
-        if (delay := rules.get("auto_delete_seconds", 0)) > 0:
+        if (delay := rules.auto_delete_seconds) > 0:
             try:
                 await message.delete(delay=delay)
             except discord.NotFound:
                 pass
 
-        if rules.get("disallow_bots") and message.author.bot:
+        if rules.disallow_bots and message.author.bot:
             try:
                 await message.delete()
             except discord.Forbidden:
                 pass
             return
 
-        if rules.get("disallow_media") and message.attachments:
+        if rules.disallow_media and message.attachments:
             try:
                 await message.delete()
             except discord.Forbidden:
@@ -2191,7 +1989,7 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
             )
             return
 
-        if rules.get("disallow_url") and self.url_regex.search(message.content):
+        if rules.disallow_url and self.url_regex.search(message.content):
             try:
                 await message.delete()
             except discord.Forbidden:
@@ -2202,7 +2000,7 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
             )
             return
 
-        if rules.get("disallow_prefix") and message.content.startswith(self.common_prefixes):
+        if rules.disallow_prefix and message.content.startswith(self.common_prefixes):
             command_prefixes = await self.bot.get_prefix(message)
             if not isinstance(command_prefixes, list):
                 command_prefixes = [command_prefixes]
@@ -2221,18 +2019,16 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                 )
                 return
 
-        guild_filters = self.get_guild_filters(message.guild.id)
-        for bad_word in guild_filters.get("bad_words", []):
-            if bad_word.lower() in message_content_lower:
-                try:
-                    await message.delete()
-                except discord.Forbidden:
-                    pass
-                await message.channel.send(
-                    embed=self._create_embed(description=f"🤬 Pesan dari {message.author.mention} dihapus karena mengandung kata kasar.", color=self.color_warning),
-                    delete_after=10
-                )
-                return
+        if settings_view.bad_words.search(message_content_lower):
+            try:
+                await message.delete()
+            except discord.Forbidden:
+                pass
+            await message.channel.send(
+                embed=self._create_embed(description=f"🤬 Pesan dari {message.author.mention} dihapus karena mengandung kata kasar.", color=self.color_warning),
+                delete_after=10
+            )
+            return
         
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
@@ -3166,57 +2962,26 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
     
     @tasks.loop(minutes=1)
     async def update_panel_task(self):
+        # Panel hanya diedit jika isinya berubah, jadi guild yang tenang tidak memakai REST sama sekali.
         for guild in self.bot.guilds:
             await self.update_panel(guild)
-    
-    async def update_panel(self, guild: discord.Guild):
-        guild_settings = self.get_guild_settings(guild.id)
-        panel_id = guild_settings.get('mod_panel_message_id')
-        channel_id = guild_settings.get('mod_panel_channel_id')
 
-        if not panel_id or not channel_id:
-            return
+    def request_panel_update(self, guild: discord.Guild):
+        task = self.panel_update_tasks.get(guild.id)
+        if task is None or task.done():
+            self.panel_update_tasks[guild.id] = asyncio.create_task(self._delayed_panel_update(guild))
 
-        channel = guild.get_channel(channel_id)
-        if not channel:
-            return
-
-        try:
-            panel_message = await channel.fetch_message(panel_id)
-        except discord.NotFound:
-            guild_settings['mod_panel_message_id'] = None
-            self.save_settings()
-            
-            await self.create_mod_panel_if_needed(guild)
-            return
-        
-        except (discord.Forbidden, discord.errors.DiscordServerError, aiohttp.ClientError, asyncio.TimeoutError) as e:
-            return
-        except Exception as e:
-            return
+    async def _delayed_panel_update(self, guild: discord.Guild):
+        await asyncio.sleep(PANEL_UPDATE_DELAY)
+        await self.update_panel(guild)
 
+    def build_panel_fields(self, guild: discord.Guild, guild_settings: dict, current_status: str) -> list:
+        counters = self.panel_stats.get(guild)
         total_members = len(guild.members)
-        bot_members = sum(1 for member in guild.members if member.bot)
+        bot_members = counters.bots
         human_members = total_members - bot_members
         total_channels = len(guild.channels)
-        
-        status_data = load_data(self.status_file)
-        current_status = status_data.get("status", "online")
-        
-        import random
-        TIPS = [
-            "Nyari teman mabar itu gampang, yang susah itu nyari yang nggak ngilang setelah sebulan.",
-            "Online tiap hari di server, tapi tetep aja nggak ada yang nyadar pas off seminggu. 🚬",
-            "Mute server sana-sini demi nungguin notif dari satu orang. Eh dia lagi DnD.",
-            "Level di server udah mentok, tapi skill mabar masih di situ-situ aja. 🥲",
-            "Discord cuma tempat mampir, dunia nyata tetep tempat kembali.",
-            "Udah join banyak server, tetep aja ujung-ujungnya nongkrong di satu voice channel yang itu-itu lagi.",
-            "Ngetik panjang di general, dibalesnya pake reaction doang. Sabar ya.",
-            "Role lu emang paling atas, tapi kalau soal cari teman ngobrol, kita semua sama.",
-            "Kalau sepi ya ngeramein sendiri, kalau rame malah jadi sider. Valid no debat.",
-            "Kadang yang dicari di Discord bukan game-nya, tapi obrolan random jam 3 paginya. ☕"
-        ]
-        
+
         if current_status == "online":
             status_emoji = '🟢'
             status_text = 'Online & Berjalan'
@@ -3224,10 +2989,6 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
             status_emoji = '🔴'
             status_text = 'Offline / DnD'
 
-        tip = random.choice(TIPS)
-        
-        from cogs.v2_layout import build_v2_card, edit_v2_message
-        
         v2_fields = [
             {
                 "name": "📊 Statistik Server", 
@@ -3247,11 +3008,48 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         if panel_roles:
             v2_fields.append({"name": "✨ STATISTIK MEMBERSHIP", "value": "\u200B"})
             for role in panel_roles:
-                member_count = len(role.members)
+                member_count = counters.roles[role.id]
                 v2_fields.append({"name": f"{role.name}", "value": f"```\n{member_count} Member\n```"})
+        return v2_fields
+
+    async def update_panel(self, guild: discord.Guild):
+        guild_settings = self.get_guild_settings(guild.id)
+        panel_id = guild_settings.get('mod_panel_message_id')
+        channel_id = guild_settings.get('mod_panel_channel_id')
+
+        if not panel_id or not channel_id:
+            return
+
+        channel = guild.get_channel(channel_id)
+        if not channel:
+            return
+
+        title = f"🛡️ Moderator Control Panel - {guild.name}"
+        v2_fields = self.build_panel_fields(guild, guild_settings, self.status.get("status", "online"))
+        digest = card_digest(panel_id, title, v2_fields)
+        if self.panel_digests.get(guild.id) == digest:
+            return
+        
+        import random
+        TIPS = [
+            "Nyari teman mabar itu gampang, yang susah itu nyari yang nggak ngilang setelah sebulan.",
+            "Online tiap hari di server, tapi tetep aja nggak ada yang nyadar pas off seminggu. 🚬",
+            "Mute server sana-sini demi nungguin notif dari satu orang. Eh dia lagi DnD.",
+            "Level di server udah mentok, tapi skill mabar masih di situ-situ aja. 🥲",
+            "Discord cuma tempat mampir, dunia nyata tetep tempat kembali.",
+            "Udah join banyak server, tetep aja ujung-ujungnya nongkrong di satu voice channel yang itu-itu lagi.",
+            "Ngetik panjang di general, dibalesnya pake reaction doang. Sabar ya.",
+            "Role lu emang paling atas, tapi kalau soal cari teman ngobrol, kita semua sama.",
+            "Kalau sepi ya ngeramein sendiri, kalau rame malah jadi sider. Valid no debat.",
+            "Kadang yang dicari di Discord bukan game-nya, tapi obrolan random jam 3 paginya. ☕"
+        ]
+        
+        tip = random.choice(TIPS)
+        
+        from cogs.v2_layout import build_v2_card, edit_v2_message
                 
         card = build_v2_card(
-            title=f"🛡️ Moderator Control Panel - {guild.name}",
+            title=title,
             description="Statistik real-time mengenai status server dan anggota.",
             fields=v2_fields,
             color=None,
@@ -3260,20 +3058,64 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         )
         
         try:
-            from cogs.v2_layout import edit_v2_message
-            resp = await edit_v2_message(self.bot, channel.id, panel_message.id, [card])
-            if resp is None:
+            # Edit langsung dengan ID tersimpan; pesan hanya di-fetch jika edit gagal.
+            resp = await edit_v2_message(self.bot, channel.id, panel_id, [card])
+            if resp is not None:
+                self.panel_digests[guild.id] = digest
+                return
+            # Panel gagal diperbarui (terhapus/error): lupakan digest agar tick berikutnya mengirim ulang.
+            self.panel_digests.pop(guild.id, None)
+            try:
+                panel_message = await channel.fetch_message(panel_id)
+            except discord.NotFound:
+                panel_message = None
+            except (discord.Forbidden, discord.errors.DiscordServerError, aiohttp.ClientError, asyncio.TimeoutError):
+                return
+            if panel_message is not None:
                 # If editing fails (e.g. 400 Bad Request due to legacy embeds), we should delete the old one and clear the ID
                 try: await panel_message.delete()
                 except: pass
-                guild_settings['mod_panel_message_id'] = None
-                self.save_settings()
-                await self.create_mod_panel_if_needed(guild)
+            guild_settings['mod_panel_message_id'] = None
+            self.save_settings()
+            await self.create_mod_panel_if_needed(guild)
         except discord.Forbidden:
-            pass
+            self.panel_digests.pop(guild.id, None)
         except Exception as e:
+            self.panel_digests.pop(guild.id, None)
             print(f"Error updating mod panel V2: {e}")
 
+    @commands.Cog.listener("on_member_join")
+    async def track_member_join(self, member: discord.Member):
+        self.panel_stats.member_join(member)
+        self.membership_index.add(member.id, member.guild.id)
+
+    @commands.Cog.listener("on_member_remove")
+    async def track_member_remove(self, member: discord.Member):
+        self.panel_stats.member_remove(member)
+        self.membership_index.remove(member.id, member.guild.id)
+
+    @commands.Cog.listener("on_member_update")
+    async def track_panel_member_update(self, before: discord.Member, after: discord.Member):
+        changed_roles = self.panel_stats.member_update(before, after)
+        guild_settings = self.settings.get(str(after.guild.id))
+        if changed_roles and isinstance(guild_settings, dict) and changed_roles & set(guild_settings.get("panel_role_stats", [])):
+            self.request_panel_update(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.membership_index.add_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.panel_stats.drop(guild.id)
+        self.panel_digests.pop(guild.id, None)
+        self.membership_index.drop_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.membership_index.build(self.bot.guilds)
+        self.sanctions.resume()
+
     async def create_mod_panel_if_needed(self, guild: discord.Guild):
         guild_settings = self.get_guild_settings(guild.id)
         panel_id = guild_settings.get('mod_panel_message_id')
@@ -3282,10 +3124,6 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
         if not panel_id and channel_id:
             channel = guild.get_channel(channel_id)
             if channel and channel.permissions_for(guild.me).send_messages:
-                total_members = len(guild.members)
-                bot_members = sum(1 for member in guild.members if member.bot)
-                human_members = total_members - bot_members
-                total_channels = len(guild.channels)
 
                 status_data = load_data(self.status_file)
                 current_status = status_data.get("status", "online")
@@ -3304,38 +3142,11 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                     "Kadang yang dicari di Discord bukan game-nya, tapi obrolan random jam 3 paginya. ☕"
                 ]
                 
-                if current_status == "online":
-                    status_emoji = '🟢'
-                    status_text = 'Online & Berjalan'
-                else:
-                    status_emoji = '🔴'
-                    status_text = 'Offline / DnD'
-
                 tip = random.choice(TIPS)
                 
                 from cogs.v2_layout import build_v2_card, send_v2_message
                 
-                v2_fields = [
-                    {
-                        "name": "📊 Statistik Server", 
-                        "value": f"👥 **Member:** `{total_members}` (🧍 `{human_members}` | 🤖 `{bot_members}`)\n📁 **Channel:** `{total_channels}`"
-                    },
-                    {
-                        "name": "🌐 Status Sistem", 
-                        "value": f"{status_emoji} **{status_text}**"
-                    }
-                ]
-                
-                panel_roles = []
-                for role_id in guild_settings.get("panel_role_stats", []):
-                    if role := guild.get_role(role_id):
-                        panel_roles.append(role)
-
-                if panel_roles:
-                    v2_fields.append({"name": "✨ STATISTIK MEMBERSHIP", "value": "\u200B"})
-                    for role in panel_roles:
-                        member_count = len(role.members)
-                        v2_fields.append({"name": f"{role.name}", "value": f"```\n{member_count} Member\n```"})
+                v2_fields = self.build_panel_fields(guild, guild_settings, current_status)
                 
                 card = build_v2_card(
                     title=f"🛡️ Moderator Control Panel - {guild.name}",
@@ -3376,10 +3187,6 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                     await ctx.send(embed=self._create_embed(description="❌ Bot tidak memiliki izin untuk mengakses channel panel lama. Silakan minta admin server untuk mengatasinya.", color=self.color_error), ephemeral=True)
                     return
 
-            total_members = len(ctx.guild.members)
-            bot_members = sum(1 for member in ctx.guild.members if member.bot)
-            human_members = total_members - bot_members
-            total_channels = len(ctx.guild.channels)
             
             status_data = load_data(self.status_file)
             current_status = status_data.get("status", "online")
@@ -3398,38 +3205,11 @@ class ServerAdminCog(commands.Cog, name="👑 Administrasi"):
                 "Kadang yang dicari di Discord bukan game-nya, tapi obrolan random jam 3 paginya. ☕"
             ]
             
-            if current_status == "online":
-                status_emoji = '🟢'
-                status_text = 'Online & Berjalan'
-            else:
-                status_emoji = '🔴'
-                status_text = 'Offline / DnD'
-
             tip = random.choice(TIPS)
             
             from cogs.v2_layout import build_v2_card, send_v2_message
             
-            v2_fields = [
-                {
-                    "name": "📊 Statistik Server", 
-                    "value": f"👥 **Member:** `{total_members}` (🧍 `{human_members}` | 🤖 `{bot_members}`)\n📁 **Channel:** `{total_channels}`"
-                },
-                {
-                    "name": "🌐 Status Sistem", 
-                    "value": f"{status_emoji} **{status_text}**"
-                }
-            ]
-            
-            panel_roles = []
-            for role_id in guild_settings.get("panel_role_stats", []):
-                if role := ctx.guild.get_role(role_id):
-                    panel_roles.append(role)
-
-            if panel_roles:
-                v2_fields.append({"name": "✨ STATISTIK MEMBERSHIP", "value": "\u200B"})
-                for role in panel_roles:
-                    member_count = len(role.members)
-                    v2_fields.append({"name": f"{role.name}", "value": f"```\n{member_count} Member\n```"})
+            v2_fields = self.build_panel_fields(ctx.guild, guild_settings, current_status)
                     
             card = build_v2_card(
                 title=f"🛡️ Moderator Control Panel - {ctx.guild.name}",
@@ -2,23 +2,18 @@ import discord
 from discord.ext import commands
 import os
 import json
-import time
-from pymongo import MongoClient
+from cogs.persistence import get_persistence
 
-mongo_client = None
-mongo_db = None
-mongo_col = None
+MONGO_COLLECTION = "bot_data"
+persistence = None
 
 ACTIVITY_FILE = 'data/bot_activity.json'
 
 def load_activity():
-    if mongo_col is not None:
-        try:
-            doc = mongo_col.find_one({"_id": ACTIVITY_FILE})
-            if doc and "data" in doc:
-                return doc["data"]
-        except Exception:
-            pass
+    if persistence is not None:
+        data = persistence.cached(MONGO_COLLECTION, ACTIVITY_FILE)
+        if data is not None:
+            return data
     if not os.path.exists(ACTIVITY_FILE):
         os.makedirs(os.path.dirname(ACTIVITY_FILE), exist_ok=True)
         default = {"type": "watching", "name": "Kestabilan Server"}
@@ -38,15 +33,8 @@ def save_activity(data):
             json.dump(data, f, indent=4)
     except Exception:
         pass
-    if mongo_col is not None:
-        try:
-            mongo_col.update_one(
-                {"_id": ACTIVITY_FILE},
-                {"$set": {"data": data, "updated_at": time.time()}},
-                upsert=True
-            )
-        except Exception:
-            pass
+    if persistence is not None:
+        persistence.upsert(MONGO_COLLECTION, ACTIVITY_FILE, data, mode="set")
 
 class CustomActModal(discord.ui.Modal, title="Set Activity Manual"):
     act_name = discord.ui.TextInput(label="Nama Activity", placeholder="Ketik teks activity...", max_length=100)
@@ -158,9 +146,7 @@ class BotActivity(commands.Cog, name="Bot Activity Manager"):
         await ctx.send(embed=embed, view=ActView(self))
 
 async def setup(bot):
-    global mongo_client, mongo_db, mongo_col
-    mongo_client = getattr(bot, 'mongo_client', None)
-    if mongo_client:
-        mongo_db = mongo_client["reSwan"]
-        mongo_col = mongo_db["bot_data"]
+    global persistence
+    persistence = get_persistence(bot)
+    await persistence.preload(MONGO_COLLECTION)
     await bot.add_cog(BotActivity(bot))
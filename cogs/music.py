@@ -1,11 +1,13 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
 import os
 import logging
 import json
 from datetime import datetime
 
+from cogs.voice_timers import DeadlineTimers, has_humans
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 log = logging.getLogger(__name__)
 
@@ -16,6 +18,8 @@ ENABLE_SCHEDULED_CREATION = False
 CREATION_START_TIME = (20, 0)
 CREATION_END_TIME = (6, 0)
 TARGET_REGION = 'singapore'
+# Jeda sebelum channel sementara yang kosong dihapus.
+TEMP_CHANNEL_DELETE_DELAY = 10
 
 def load_json_file(file_path, default_data={}):
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -263,53 +267,77 @@ class TempVoice(commands.Cog):
         self.guild_config = load_guild_config()
         self.active_temp_channels = load_temp_channels()
         self.bot.add_view(VCControlView(self))
-        self.cleanup_task.start()
+        self.cleanup_timers = DeadlineTimers()
+        self.reconciled = False
         
     def cog_unload(self):
-        self.cleanup_task.cancel()
+        self.cleanup_timers.cancel_all()
+
+    def check_temp_channel(self, channel):
+        """Jadwalkan penghapusan channel sementara yang kosong, atau batalkan jika ada yang masuk lagi."""
+        if str(channel.id) not in self.active_temp_channels:
+            return
+        if has_humans(channel):
+            self.cleanup_timers.cancel(channel.id)
+        elif channel.id not in self.cleanup_timers:
+            self.cleanup_timers.schedule(channel.id, TEMP_CHANNEL_DELETE_DELAY, lambda: self._delete_if_empty(channel.id))
+
+    async def _delete_if_empty(self, channel_id):
+        channel_info = self.active_temp_channels.get(str(channel_id))
+        if channel_info is None:
+            return
+        guild = self.bot.get_guild(int(channel_info.get("guild_id", 0)))
+        channel = guild.get_channel(channel_id) if guild else None
+        if channel is not None:
+            if has_humans(channel):
+                return
+            try:
+                await channel.delete(reason="Custom voice channel is empty of human users.")
+            except discord.NotFound:
+                pass
+            except discord.Forbidden:
+                return
+            except Exception as e:
+                log.error(f"Gagal menghapus channel sementara {channel_id}: {e}")
+                return
+        self.active_temp_channels.pop(str(channel_id), None)
+        save_temp_channels(self.active_temp_channels)
 
-    @tasks.loop(seconds=10)
-    async def cleanup_task(self):
-        channels_to_remove = []
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Sekali saat startup: buang channel yang hilang selama bot mati dan cek yang kosong.
+        if self.reconciled:
+            return
+        self.reconciled = True
+        stale = []
         for channel_id_str, channel_info in list(self.active_temp_channels.items()):
-            if not isinstance(channel_info, dict):
-                channels_to_remove.append(channel_id_str)
-                continue
-            channel_id = int(channel_id_str)
-            if 'guild_id' not in channel_info or 'owner_id' not in channel_info:
-                channels_to_remove.append(channel_id_str)
+            if not isinstance(channel_info, dict) or 'guild_id' not in channel_info or 'owner_id' not in channel_info:
+                stale.append(channel_id_str)
                 continue
-            guild_id = int(channel_info["guild_id"])
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                channels_to_remove.append(channel_id_str)
+            guild = self.bot.get_guild(int(channel_info["guild_id"]))
+            channel = guild.get_channel(int(channel_id_str)) if guild else None
+            if channel is None:
+                stale.append(channel_id_str)
                 continue
-            channel = guild.get_channel(channel_id)
-            if not channel:
-                channels_to_remove.append(channel_id_str)
-                continue
-            human_members_in_custom_channel = [
-                member for member in channel.members
-                if not member.bot
-            ]
-            if not human_members_in_custom_channel:
-                try:
-                    await channel.delete(reason="Custom voice channel is empty of human users.")
-                    channels_to_remove.append(channel_id_str)
-                except discord.NotFound:
-                    channels_to_remove.append(channel_id_str)
-                except discord.Forbidden:
-                    pass
-                except Exception:
-                    pass
-        for ch_id in channels_to_remove:
-            self.active_temp_channels.pop(ch_id, None)
-        if channels_to_remove:
+            self.check_temp_channel(channel)
+        for channel_id_str in stale:
+            self.active_temp_channels.pop(channel_id_str, None)
+        if stale:
             save_temp_channels(self.active_temp_channels)
 
-    @cleanup_task.before_loop
-    async def before_cleanup_task(self):
-        await self.bot.wait_until_ready()
+    @commands.Cog.listener("on_voice_state_update")
+    async def schedule_temp_cleanup(self, member, before, after):
+        if before.channel == after.channel:
+            return
+        for channel in (before.channel, after.channel):
+            if channel is not None:
+                self.check_temp_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self.active_temp_channels.pop(str(channel.id), None) is not None:
+            self.cleanup_timers.cancel(channel.id)
+            save_temp_channels(self.active_temp_channels)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
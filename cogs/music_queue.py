@@ -0,0 +1,244 @@
+import os
+import random
+import time
+from collections import deque
+from itertools import islice
+
+from cogs import data_store, track_cache
+
+MUSIC_QUEUE_FILE = os.path.join(data_store.BASE_DIR, "data", "music_queues.json")
+PAGE_SIZE = 10
+
+
+class Track:
+    """Satu lagu di antrean: URL (atau query pencarian) beserta metadata yang sudah diketahui."""
+
+    __slots__ = ("url", "title", "duration", "requester_id", "requester")
+
+    def __init__(self, url, title=None, duration=None, requester_id=None, requester=None):
+        self.url = url
+        self.title = title
+        self.duration = duration
+        self.requester_id = requester_id
+        self.requester = requester
+
+    @classmethod
+    def from_url(cls, url, requester=None):
+        """Buat track dari URL/query; metadata diisi dari track_cache bila sudah pernah di-resolve."""
+        track = cls(
+            url,
+            requester_id=requester.id if requester else None,
+            requester=requester.mention if requester else None,
+        )
+        track.fill(track.cached_info())
+        return track
+
+    def cached_info(self):
+        is_link = self.url.startswith(('http://', 'https://'))
+        resolved_url = self.url if is_link else track_cache.get_url(track_cache.query_key(self.url))
+        return track_cache.get_video(resolved_url) if resolved_url else None
+
+    def fill(self, info):
+        """Lengkapi title/duration yang belum ada dari dict info (hasil ytdl atau cache)."""
+        if not info:
+            return
+        if not self.title and info.get('title'):
+            self.title = info['title']
+        if not self.duration and info.get('duration'):
+            self.duration = info['duration']
+
+    @property
+    def display_title(self):
+        return self.title or self.url
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__ if getattr(self, field) is not None}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+
+class GuildQueue:
+    """
+    Antrean lagu satu guild di atas deque: push/pop di kedua ujung O(1), rotate O(k).
+    Juga menyimpan lagu yang sedang diputar dan channel-nya supaya antrean bisa
+    dilanjutkan setelah bot restart.
+    """
+
+    def __init__(self, guild_id, on_change=None):
+        self.guild_id = guild_id
+        self._tracks = deque()
+        self._on_change = on_change
+        self.current = None
+        self.started_at = None
+        self.offset = 0
+        self.speed = 1.0
+        self.voice_channel_id = None
+        self.text_channel_id = None
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __iter__(self):
+        return iter(self._tracks)
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change(self.guild_id)
+
+    def push(self, track):
+        self._tracks.append(track)
+        self._changed()
+
+    def extend(self, tracks):
+        self._tracks.extend(tracks)
+        self._changed()
+
+    def push_front(self, track):
+        self._tracks.appendleft(track)
+        self._changed()
+
+    def pop(self):
+        """Ambil lagu berikutnya (IndexError jika kosong)."""
+        track = self._tracks.popleft()
+        self._changed()
+        return track
+
+    def peek(self):
+        return self._tracks[0] if self._tracks else None
+
+    def rotate(self, n=1):
+        """Putar antrean: n > 0 memindahkan n lagu terakhir ke depan, n < 0 sebaliknya."""
+        self._tracks.rotate(n)
+        self._changed()
+
+    def remove(self, position):
+        """Hapus lagu di posisi (mulai dari 1) dan kembalikan track-nya."""
+        if not 1 <= position <= len(self._tracks):
+            raise IndexError(position)
+        track = self._tracks[position - 1]
+        del self._tracks[position - 1]
+        self._changed()
+        return track
+
+    def shuffle(self):
+        tracks = list(self._tracks)
+        random.shuffle(tracks)
+        self._tracks = deque(tracks)
+        self._changed()
+
+    def clear(self):
+        self._tracks.clear()
+        self._changed()
+
+    def page_count(self, per_page=PAGE_SIZE):
+        return max(1, -(-len(self._tracks) // per_page))
+
+    def page(self, page=1, per_page=PAGE_SIZE):
+        """List (posisi, track) untuk halaman tertentu (mulai dari 1), dipotong ke rentang yang valid."""
+        page = min(max(1, page), self.page_count(per_page))
+        start = (page - 1) * per_page
+        return list(enumerate(islice(self._tracks, start, start + per_page), start=start + 1))
+
+    def set_current(self, track, voice_channel_id=None, text_channel_id=None, position=0, speed=1.0):
+        self.current = track
+        self.started_at = time.time() if track else None
+        self.offset = position
+        self.speed = speed
+        if voice_channel_id:
+            self.voice_channel_id = voice_channel_id
+        if text_channel_id:
+            self.text_channel_id = text_channel_id
+        self._changed()
+
+    def seek(self, position, speed=1.0):
+        """Catat bahwa lagu sekarang (ulang) diputar dari posisi tertentu dengan kecepatan tertentu."""
+        self.started_at = time.time()
+        self.offset = position
+        self.speed = speed
+        self._changed()
+
+    def elapsed(self):
+        """Posisi lagu sekarang dalam detik (waktu lagu, bukan waktu nyata)."""
+        if not self.started_at:
+            return 0
+        return self.offset + (time.time() - self.started_at) * self.speed
+
+    def to_dict(self):
+        return {
+            "voice_channel_id": self.voice_channel_id,
+            "text_channel_id": self.text_channel_id,
+            "current": self.current.to_dict() if self.current else None,
+            "started_at": self.started_at,
+            "offset": self.offset,
+            "speed": self.speed,
+            "tracks": [track.to_dict() for track in self._tracks],
+        }
+
+    @classmethod
+    def from_dict(cls, guild_id, data, on_change=None):
+        queue = cls(guild_id, on_change)
+        queue._tracks.extend(Track.from_dict(t) for t in data.get("tracks", []) if t.get("url"))
+        current = data.get("current")
+        queue.current = Track.from_dict(current) if current and current.get("url") else None
+        queue.started_at = data.get("started_at")
+        queue.offset = data.get("offset", 0)
+        queue.speed = data.get("speed", 1.0)
+        queue.voice_channel_id = data.get("voice_channel_id")
+        queue.text_channel_id = data.get("text_channel_id")
+        return queue
+
+
+class QueueStore:
+    """
+    Semua GuildQueue yang aktif, disimpan ke data/music_queues.json lewat JsonStore.
+    Perubahan hanya menandai guild sebagai dirty; snapshot antrean dibuat saat flush.
+    """
+
+    def __init__(self, path=MUSIC_QUEUE_FILE):
+        self.store = data_store.get_store(path)
+        self._queues = {}
+        self._dirty = set()
+        self.store.add_flush_hook(self._materialize)
+
+    def __contains__(self, guild_id):
+        return guild_id in self._queues
+
+    def get(self, guild_id):
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = GuildQueue(guild_id, self._mark_dirty)
+        return queue
+
+    def drop(self, guild_id):
+        """Hapus antrean guild (stop/disconnect) dari memori dan dari snapshot."""
+        self._queues.pop(guild_id, None)
+        self._mark_dirty(guild_id)
+
+    def restore(self):
+        """Muat antrean tersimpan dari disk; kembalikan list GuildQueue yang bisa dilanjutkan."""
+        restored = []
+        for guild_id, data in list(self.store.data.items()):
+            if int(guild_id) in self._queues:
+                continue
+            queue = GuildQueue.from_dict(int(guild_id), data, self._mark_dirty)
+            if queue.current is None and not len(queue):
+                continue
+            self._queues[queue.guild_id] = queue
+            restored.append(queue)
+        return restored
+
+    def _mark_dirty(self, guild_id):
+        self._dirty.add(guild_id)
+        self.store.mark_dirty(str(guild_id))
+
+    def _materialize(self):
+        data = self.store.data
+        dirty, self._dirty = self._dirty, set()
+        for guild_id in dirty:
+            queue = self._queues.get(guild_id)
+            if queue is None or (queue.current is None and not len(queue)):
+                data.pop(str(guild_id), None)
+            else:
+                data[str(guild_id)] = queue.to_dict()
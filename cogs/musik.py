@@ -8,14 +8,23 @@ from discord import FFmpegPCMAudio
 from discord.utils import get
 from lyricsgenius import Genius
 import spotipy
+from spotipy.cache_handler import CacheFileHandler
 from spotipy.oauth2 import SpotifyClientCredentials
+from cogs import audio_effects, listening_history, lyrics_cache, track_cache
+from cogs.audio_source import OpusPassthroughSource, PASSTHROUGH_VOLUME, ffmpeg_options
+from cogs.music_queue import QueueStore, Track
+from cogs.now_playing import NowPlayingMessage
+from cogs.voice_timers import DeadlineTimers, has_humans
+from cogs import now_playing
+from cogs.track_resolver import fetch_spotify_tracks, resolve_in_order, resolve_spotify_track
 import logging
 import json
-import random
 from datetime import datetime, timedelta
 import subprocess
 import sys
 import traceback
+import time
+from collections import deque
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 log = logging.getLogger(__name__)
@@ -23,9 +32,10 @@ log = logging.getLogger(__name__)
 FFMPEG_EXECUTABLE = '/usr/local/bin/ffmpeg'
 
 TEMP_CHANNELS_FILE = 'data/temp_voice_channels.json'
-LISTENING_HISTORY_FILE = 'data/listening_history.json'
+SPOTIFY_TOKEN_CACHE_FILE = 'data/spotify_cache.json'
 GUILD_CONFIG_FILE = 'data/guild_config.json'
 STATUS_CONFIG_FILE = 'data/status_config.json'
+EQUALIZER_FILE = 'data/equalizer.json'
 
 ENABLE_SCHEDULED_CREATION = False
 CREATION_START_TIME = (20, 0)
@@ -33,6 +43,21 @@ CREATION_END_TIME = (6, 0)
 
 TARGET_REGION = 'singapore'
 
+# Prefetch lagu berikutnya: URL stream di-resolve ulang jika sisa masa berlakunya
+# kurang dari PREFETCH_MIN_TTL detik, dicek setiap PREFETCH_POLL_INTERVAL detik.
+PREFETCH_MIN_TTL = 1800
+PREFETCH_POLL_INTERVAL = 30
+TRACK_GAP_WINDOW = 100
+# Saat melanjutkan antrean setelah restart, lagu yang sisa durasinya kurang dari
+# ini dianggap sudah selesai.
+RESUME_MIN_REMAINING = 10
+# Jeda sebelum bot keluar dari voice / channel sementara dihapus setelah user terakhir keluar.
+IDLE_DISCONNECT_DELAY = 5
+TEMP_CHANNEL_DELETE_DELAY = 10
+DEFAULT_VOLUME = PASSTHROUGH_VOLUME
+# Batas waktu satu pencarian lirik di Genius.
+LYRICS_TIMEOUT = 15
+
 def load_json_file(file_path, default_data={}):
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     if not os.path.exists(file_path) or os.stat(file_path).st_size == 0:
@@ -68,18 +93,18 @@ def load_temp_channels():
 def save_temp_channels(data):
     save_json_file(TEMP_CHANNELS_FILE, {str(k): v for k, v in data.items()})
 
-def load_listening_history():
-    return load_json_file(LISTENING_HISTORY_FILE)
-
-def save_listening_history(data):
-    save_json_file(LISTENING_HISTORY_FILE, data)
-
 def load_guild_config():
     return load_json_file(GUILD_CONFIG_FILE)
 
 def save_guild_config(data):
     save_json_file(GUILD_CONFIG_FILE, data)
 
+def load_equalizer_config():
+    return load_json_file(EQUALIZER_FILE)
+
+def save_equalizer_config(data):
+    save_json_file(EQUALIZER_FILE, data)
+
 def load_status_config():
     os.makedirs(os.path.dirname(STATUS_CONFIG_FILE), exist_ok=True)
     default_config = {
@@ -155,7 +180,7 @@ FFMPEG_OPTIONS = {
 ytdl = yt_dlp.YoutubeDL(ytdl_opts)
 
 class YTDLSource(discord.PCMVolumeTransformer):
-    def __init__(self, source, *, data, volume=0.8):
+    def __init__(self, source, *, data, volume=DEFAULT_VOLUME):
         super().__init__(source, volume)
         self.data = data
         self.title = data.get('title')
@@ -166,20 +191,47 @@ class YTDLSource(discord.PCMVolumeTransformer):
         self.uploader = data.get('uploader')
         self.requester = data.get('requester', 'N/A')
 
+    @staticmethod
+    def cached(url, min_ttl=0):
+        """Data siap-putar dari cache untuk URL/query, atau None jika belum di-resolve / hampir kedaluwarsa."""
+        resolved_url = url if url.startswith(('http://', 'https://')) else track_cache.get_url(track_cache.query_key(url))
+        return track_cache.get_stream(resolved_url, min_ttl) if resolved_url else None
+
     @classmethod
-    async def from_url(cls, url, *, loop=None, stream=True):
+    async def resolve(cls, url, *, loop=None, stream=True, min_ttl=0):
         loop = loop or asyncio.get_event_loop()
-        data = await loop.run_in_executor(None, lambda: ytdl.extract_info(url, download=not stream))
+        is_link = url.startswith(('http://', 'https://'))
+        cached = cls.cached(url, min_ttl) if stream else None
+        if cached:
+            return {**cached, 'url': cached['stream_url']}
+        target = url if is_link else (track_cache.get_url(track_cache.query_key(url)) or url)
+        data = await loop.run_in_executor(None, lambda: ytdl.extract_info(target, download=not stream))
         if 'entries' in data:
             data = data['entries'][0]
+        if stream:
+            if not is_link and data.get('webpage_url'):
+                track_cache.put_url(track_cache.query_key(url), data['webpage_url'])
+            track_cache.put_video(data, url if is_link else None, with_stream=True)
+        return data
+
+    @classmethod
+    async def from_url(cls, url, *, loop=None, stream=True, start=0, volume=DEFAULT_VOLUME, audio_filter=None):
+        """
+        Sumber siap-putar: Opus dari ffmpeg jika volume 100%, selain itu PCM dengan volume.
+        audio_filter (string -af) selalu dijalankan di proses ffmpeg.
+        """
+        data = await cls.resolve(url, loop=loop, stream=stream)
         filename = data['url'] if stream else ytdl.prepare_filename(data)
+        if stream and volume == PASSTHROUGH_VOLUME:
+            options = ffmpeg_options(FFMPEG_OPTIONS, start)
+            return await OpusPassthroughSource.create(filename, data, options, audio_filter)
         
         source = discord.FFmpegPCMAudio(
             filename,
-            **FFMPEG_OPTIONS
+            **ffmpeg_options(FFMPEG_OPTIONS, start, audio_filter=audio_filter)
         )
         
-        return cls(source, data=data)
+        return cls(source, data=data, volume=volume)
 
 class MusicControlView(discord.ui.View):
     def __init__(self, cog_instance):
@@ -220,76 +272,7 @@ class MusicControlView(discord.ui.View):
 
     async def _update_music_message(self, interaction: discord.Interaction):
         try:
-            guild_id = interaction.guild.id
-            current_message_info = self.cog.current_music_message_info.get(guild_id)
-            vc = interaction.guild.voice_client
-            queue = self.cog.get_queue(guild_id)
-            
-            if vc and vc.is_connected() and vc.is_playing() and vc.source and guild_id in self.cog.now_playing_info:
-                info = self.cog.now_playing_info[guild_id]
-                source = vc.source
-                new_embed = discord.Embed(
-                    title="🎶 Sedang Memutar",
-                    description=f"**[{info['title']}]({info['webpage_url']})**",
-                    color=discord.Color.purple()
-                )
-                if source.thumbnail:
-                    new_embed.set_thumbnail(url=source.thumbnail)
-                duration_str = "N/A"
-                if source.duration:
-                    minutes, seconds = divmod(source.duration, 60)
-                    duration_str = f"{minutes:02}:{seconds:02}"
-                new_embed.add_field(name="Durasi", value=duration_str, inline=True)
-                new_embed.add_field(name="Diminta oleh", value=info.get('requester', 'N/A'), inline=True)
-                new_embed.set_footer(text=f"Antrean: {len(queue)} lagu tersisa")
-            else:
-                new_embed = discord.Embed(
-                    title="Musik Bot",
-                    description="Antrean kosong. Bot akan keluar dari voice channel jika tidak ada pengguna lain.",
-                    color=discord.Color.red()
-                )
-            
-            updated_view = MusicControlView(self.cog)
-            if not vc or not vc.is_connected():
-                for item in updated_view.children:
-                    item.disabled = True
-            else:
-                for item in updated_view.children:
-                    if item.custom_id == "music:play_pause":
-                        if vc.is_playing():
-                            item.emoji = "⏸️"
-                            item.style = discord.ButtonStyle.green
-                        elif vc.is_paused():
-                            item.emoji = "▶️"
-                            item.style = discord.ButtonStyle.primary
-                    elif item.custom_id == "music:mute_unmute":
-                        if self.cog.is_muted.get(guild_id, False):
-                            item.emoji = "🔇"
-                        else:
-                            item.emoji = "🔊"
-                    elif item.custom_id == "music:loop":
-                        if self.cog.loop_status.get(guild_id, False):
-                            item.style = discord.ButtonStyle.green
-                        else:
-                            item.style = discord.ButtonStyle.grey
-                    item.disabled = False
-            
-            if current_message_info:
-                try:
-                    old_channel = interaction.guild.get_channel(current_message_info['channel_id']) or await interaction.guild.fetch_channel(current_message_info['channel_id'])
-                    if old_channel:
-                        old_message = await old_channel.fetch_message(current_message_info['message_id'])
-                        await old_message.delete()
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-                finally:
-                    self.cog.current_music_message_info.pop(guild_id, None)
-            
-            new_message = await interaction.channel.send(embed=new_embed, view=updated_view)
-            self.cog.current_music_message_info[guild_id] = {
-                'message_id': new_message.id,
-                'channel_id': new_message.channel.id
-            }
+            self.cog.refresh_now_playing(interaction.guild, interaction.channel, message=interaction.message)
         except Exception as e:
             log.error(f"Error in _update_music_message: {e}")
 
@@ -334,10 +317,6 @@ class MusicControlView(discord.ui.View):
                 return
             
             if vc and (vc.is_playing() or vc.is_paused()):
-                guild_id = interaction.guild.id
-                queue = self.cog.get_queue(guild_id)
-                if queue:
-                    queue.pop(0)
                 vc.stop()
                 await interaction.followup.send("⏭️ Skip lagu.", ephemeral=True)
             else:
@@ -364,23 +343,15 @@ class MusicControlView(discord.ui.View):
             
             await vc.disconnect()
             guild_id = interaction.guild.id
-            self.cog.queues.pop(guild_id, None)
+            self.cog.queues.drop(guild_id)
+            self.cog.cancel_track_resolution(guild_id)
             self.cog.loop_status.pop(guild_id, None)
             self.cog.is_muted.pop(guild_id, None)
             self.cog.old_volume.pop(guild_id, None)
+            self.cog.volumes.pop(guild_id, None)
             self.cog.now_playing_info.pop(guild_id, None)
             
-            if guild_id in self.cog.current_music_message_info:
-                old_message_info = self.cog.current_music_message_info[guild_id]
-                try:
-                    old_channel = interaction.guild.get_channel(old_message_info['channel_id']) or await interaction.guild.fetch_channel(old_message_info['channel_id'])
-                    if old_channel:
-                        old_message = await old_channel.fetch_message(old_message_info['message_id'])
-                        await old_message.delete()
-                except (discord.NotFound, discord.HTTPException) as e:
-                    pass
-                finally:
-                    self.cog.current_music_message_info.pop(guild_id, None)
+            await self.cog.clear_now_playing(guild_id)
             
             await interaction.followup.send("⏹️ Stop dan keluar dari voice.", ephemeral=True)
         except Exception as e:
@@ -392,18 +363,7 @@ class MusicControlView(discord.ui.View):
         try:
             queue = self.cog.get_queue(interaction.guild.id)
             if queue:
-                display_queue = queue[:10]
-                display_queue_titles = await asyncio.gather(
-                    *[self.cog.get_song_info_from_url(q) for q in display_queue]
-                )
-                msg = "\n".join([f"{i+1}. {q['title']}" for i, q in enumerate(display_queue_titles)])
-                embed = discord.Embed(
-                    title="🎶 Antrean Lagu",
-                    description=f"```{msg}```",
-                    color=discord.Color.gold()
-                )
-                if len(queue) > 15:
-                    embed.set_footer(text=f"Dan {len(queue) - 15} lagu lainnya...")
+                embed = await self.cog.build_queue_embed(queue)
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             else:
                 await interaction.response.send_message("Antrean kosong.", ephemeral=True)
@@ -464,9 +424,9 @@ class MusicControlView(discord.ui.View):
                 return
             
             if vc and vc.source:
-                current_volume = vc.source.volume
+                current_volume = self.cog.get_volume(guild_id)
                 new_volume = min(current_volume + 0.1, 1.0)
-                vc.source.volume = new_volume
+                await self.cog.set_volume(interaction.guild, new_volume)
                 self.cog.is_muted[guild_id] = False
                 await interaction.response.send_message(f"Volume diatur ke: {int(new_volume * 100)}%", ephemeral=True)
             else:
@@ -491,9 +451,9 @@ class MusicControlView(discord.ui.View):
                 return
             
             if vc and vc.source:
-                current_volume = vc.source.volume
+                current_volume = self.cog.get_volume(guild_id)
                 new_volume = max(current_volume - 0.1, 0.0)
-                vc.source.volume = new_volume
+                await self.cog.set_volume(interaction.guild, new_volume)
                 if new_volume > 0.0:
                     self.cog.is_muted[guild_id] = False
                 else:
@@ -523,12 +483,12 @@ class MusicControlView(discord.ui.View):
             
             if vc and vc.source:
                 if not self.cog.is_muted.get(guild_id, False):
-                    self.cog.old_volume[guild_id] = vc.source.volume
-                    vc.source.volume = 0.0
+                    self.cog.old_volume[guild_id] = self.cog.get_volume(guild_id)
+                    await self.cog.set_volume(interaction.guild, 0.0)
                     self.cog.is_muted[guild_id] = True
                     await interaction.followup.send("🔇 Volume dimatikan.", ephemeral=True)
                 else:
-                    vc.source.volume = self.cog.old_volume.get(guild_id, 0.8)
+                    await self.cog.set_volume(interaction.guild, self.cog.old_volume.get(guild_id, DEFAULT_VOLUME))
                     self.cog.is_muted[guild_id] = False
                     await interaction.followup.send("🔊 Volume dinyalakan.", ephemeral=True)
                 await self._update_music_message(interaction)
@@ -547,7 +507,7 @@ class MusicControlView(discord.ui.View):
             guild_id = interaction.guild.id
             queue = self.cog.get_queue(guild_id)
             if len(queue) > 1:
-                random.shuffle(queue)
+                queue.shuffle()
                 await interaction.response.send_message("🔀 Antrean lagu diacak!", ephemeral=True)
             else:
                 await interaction.response.send_message("Antrean terlalu pendek untuk diacak.", ephemeral=True)
@@ -565,7 +525,8 @@ class MusicControlView(discord.ui.View):
             guild_id = interaction.guild.id
             queue = self.cog.get_queue(guild_id)
             if queue:
-                self.cog.queues[guild_id] = []
+                queue.clear()
+                self.cog.cancel_track_resolution(guild_id)
                 await interaction.response.send_message("🗑️ Antrean lagu telah dikosongkan!", ephemeral=True)
             else:
                 await interaction.response.send_message("Antrean sudah kosong.", ephemeral=True)
@@ -766,13 +727,17 @@ class VCControlView(discord.ui.View):
 class Music(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.queues = {}
+        self.queues = QueueStore()
+        self.resume_offsets = {}
+        self.queues_restored = False
         self.loop_status = {}
-        self.current_music_message_info = {}
+        self.now_playing_messages = {}
         self.is_muted = {}
         self.old_volume = {}
+        self.volumes = {}
+        self.equalizer_config = load_equalizer_config()
         self.now_playing_info = {}
-        self.listening_history = load_listening_history()
+        self.listening_history = listening_history.get_history()
         self.guild_config = load_guild_config()
         self.status_config = load_status_config()
         self.current_status_index = 0
@@ -780,9 +745,17 @@ class Music(commands.Cog):
         self.current_song_title = None
         self.manual_status_active = False
         self.voice_retry_attempts = {}  # Track retry attempts per guild
+        self.resolver_tasks = {}
+        self.prefetch_tasks = {}
+        self.prefetch_wakeups = {}
+        self.lyrics_prewarm_tasks = {}
+        self.track_ended_at = {}
+        self.track_gaps = deque(maxlen=TRACK_GAP_WINDOW)
+        self.prefetch_stats = {'resolved': 0, 'failed': 0, 'hits': 0, 'misses': 0}
 
         GENIUS_API_TOKEN = os.getenv("GENIUS_API")
         self.genius = None
+        self.lyrics_lookups = {}
         if GENIUS_API_TOKEN:
             try:
                 self.genius = Genius(GENIUS_API_TOKEN)
@@ -798,7 +771,8 @@ class Music(commands.Cog):
             try:
                 self.spotify = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
                     client_id=SPOTIFY_CLIENT_ID,
-                    client_secret=SPOTIFY_CLIENT_SECRET
+                    client_secret=SPOTIFY_CLIENT_SECRET,
+                    cache_handler=CacheFileHandler(cache_path=SPOTIFY_TOKEN_CACHE_FILE)
                 ))
             except Exception as e:
                 log.warning(f"Could not initialize Spotify client: {e}")
@@ -809,14 +783,18 @@ class Music(commands.Cog):
         self.bot.add_view(VCControlView(self))
         self.active_temp_channels = load_temp_channels()
         
+        self.voice_timers = DeadlineTimers()
+        self.voice_reconciled = False
+        
         self.status_rotation_task.start()
-        self.cleanup_task.start()
-        self.idle_check_task.start()
         
     def cog_unload(self):
         self.status_rotation_task.cancel()
-        self.cleanup_task.cancel()
-        self.idle_check_task.cancel()
+        self.voice_timers.cancel_all()
+        for task in self.prefetch_tasks.values():
+            task.cancel()
+        for task in self.lyrics_prewarm_tasks.values():
+            task.cancel()
 
     @tasks.loop(seconds=30)
     async def status_rotation_task(self):
@@ -881,85 +859,106 @@ class Music(commands.Cog):
         await self.bot.wait_until_ready()
         await self.update_music_status()
 
-    @tasks.loop(seconds=10)
-    async def cleanup_task(self):
-        channels_to_remove = []
+    def check_voice_channel(self, channel):
+        """
+        Jadwalkan (atau batalkan) pembersihan untuk satu voice channel: channel sementara
+        dihapus dan bot keluar dari voice jika channel tidak lagi berisi manusia.
+        """
+        occupied = has_humans(channel)
+        vc = channel.guild.voice_client
+        
+        if str(channel.id) in self.active_temp_channels:
+            key = ("temp", channel.id)
+            if occupied:
+                self.voice_timers.cancel(key)
+            elif key not in self.voice_timers:
+                self.voice_timers.schedule(key, TEMP_CHANNEL_DELETE_DELAY, lambda: self._delete_temp_channel_if_empty(channel.id))
+        
+        if vc and vc.channel and vc.channel.id == channel.id:
+            key = ("idle", channel.guild.id)
+            if occupied:
+                self.voice_timers.cancel(key)
+            elif key not in self.voice_timers:
+                self.voice_timers.schedule(key, IDLE_DISCONNECT_DELAY, lambda: self._disconnect_if_idle(channel.guild))
+
+    async def _delete_temp_channel_if_empty(self, channel_id):
+        channel_info = self.active_temp_channels.get(str(channel_id))
+        if channel_info is None:
+            return
+        guild = self.bot.get_guild(int(channel_info.get("guild_id", 0)))
+        channel = guild.get_channel(channel_id) if guild else None
+        if channel is not None:
+            if has_humans(channel):
+                return
+            try:
+                await channel.delete(reason="Custom voice channel is empty of human users.")
+            except discord.NotFound:
+                pass
+            except discord.Forbidden:
+                return
+            except Exception as e:
+                log.error(f"Gagal menghapus channel sementara {channel_id}: {e}")
+                return
+        self.active_temp_channels.pop(str(channel_id), None)
+        save_temp_channels(self.active_temp_channels)
+
+    async def _disconnect_if_idle(self, guild):
+        vc = guild.voice_client
+        if not vc or not vc.is_connected() or has_humans(vc.channel):
+            return
+        if vc.is_playing() or vc.is_paused():
+            vc.stop()
+        try:
+            await vc.disconnect()
+        except Exception as e:
+            log.error(f"Error disconnecting from voice: {e}")
+        
+        guild_id = guild.id
+        self.queues.drop(guild_id)
+        self.cancel_track_resolution(guild_id)
+        self.loop_status.pop(guild_id, None)
+        self.is_muted.pop(guild_id, None)
+        self.old_volume.pop(guild_id, None)
+        self.volumes.pop(guild_id, None)
+        self.now_playing_info.pop(guild_id, None)
+        
+        await self.clear_now_playing(guild_id)
+
+    def reconcile_voice_channels(self):
+        # Sekali saat startup: buang data channel sementara yang sudah hilang selama bot mati,
+        # lalu cek semua channel sementara dan voice client yang masih ada.
+        stale = []
         for channel_id_str, channel_info in list(self.active_temp_channels.items()):
-            if not isinstance(channel_info, dict):
-                channels_to_remove.append(channel_id_str)
-                continue
-            channel_id = int(channel_id_str)
-            if 'guild_id' not in channel_info or 'owner_id' not in channel_info:
-                channels_to_remove.append(channel_id_str)
+            if not isinstance(channel_info, dict) or 'guild_id' not in channel_info or 'owner_id' not in channel_info:
+                stale.append(channel_id_str)
                 continue
-            guild_id = int(channel_info["guild_id"])
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                channels_to_remove.append(channel_id_str)
+            guild = self.bot.get_guild(int(channel_info["guild_id"]))
+            channel = guild.get_channel(int(channel_id_str)) if guild else None
+            if channel is None:
+                stale.append(channel_id_str)
                 continue
-            channel = guild.get_channel(channel_id)
-            if not channel:
-                channels_to_remove.append(channel_id_str)
-                continue
-            human_members_in_custom_channel = [
-                member for member in channel.members
-                if not member.bot
-            ]
-            if not human_members_in_custom_channel:
-                try:
-                    await channel.delete(reason="Custom voice channel is empty of human users.")
-                    channels_to_remove.append(channel_id_str)
-                except discord.NotFound:
-                    channels_to_remove.append(channel_id_str)
-                except discord.Forbidden:
-                    pass
-                except Exception as e:
-                    pass
-        for ch_id in channels_to_remove:
-            self.active_temp_channels.pop(ch_id, None)
-        if channels_to_remove:
+            self.check_voice_channel(channel)
+        for channel_id_str in stale:
+            self.active_temp_channels.pop(channel_id_str, None)
+        if stale:
             save_temp_channels(self.active_temp_channels)
+        for vc in self.bot.voice_clients:
+            if vc.channel:
+                self.check_voice_channel(vc.channel)
 
-    @tasks.loop(seconds=5)
-    async def idle_check_task(self):
-        for guild in self.bot.guilds:
-            vc = guild.voice_client
-            if vc and vc.is_connected():
-                human_members = [
-                    member for member in vc.channel.members
-                    if not member.bot
-                ]
-                num_human_members = len(human_members)
-                if num_human_members == 0:
-                    if vc.is_playing() or vc.is_paused():
-                        vc.stop()
-                    try:
-                        await vc.disconnect()
-                    except Exception as e:
-                        log.error(f"Error disconnecting from voice: {e}")
-                    
-                    guild_id = guild.id
-                    self.queues.pop(guild_id, None)
-                    self.loop_status.pop(guild_id, None)
-                    self.is_muted.pop(guild_id, None)
-                    self.old_volume.pop(guild_id, None)
-                    self.now_playing_info.pop(guild_id, None)
-                    
-                    if guild_id in self.current_music_message_info:
-                        old_message_info = self.current_music_message_info[guild_id]
-                        try:
-                            old_channel = guild.get_channel(old_message_info['channel_id']) or await guild.fetch_channel(old_message_info['channel_id'])
-                            if old_channel:
-                                old_message = await old_channel.fetch_message(old_message_info['message_id'])
-                                await old_message.delete()
-                        except (discord.NotFound, discord.HTTPException) as e:
-                            pass
-                        finally:
-                            del self.current_music_message_info[guild_id]
-
-    @idle_check_task.before_loop
-    async def before_idle_check_task(self):
-        await self.bot.wait_until_ready()
+    @commands.Cog.listener("on_voice_state_update")
+    async def schedule_voice_cleanup(self, member, before, after):
+        if before.channel == after.channel:
+            return
+        for channel in (before.channel, after.channel):
+            if channel is not None:
+                self.check_voice_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self.active_temp_channels.pop(str(channel.id), None) is not None:
+            self.voice_timers.cancel(("temp", channel.id))
+            save_temp_channels(self.active_temp_channels)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
@@ -1112,24 +1111,279 @@ class Music(commands.Cog):
         return is_owner
 
     def get_queue(self, guild_id):
-        return self.queues.setdefault(guild_id, [])
+        return self.queues.get(guild_id)
+
+    def get_volume(self, guild_id):
+        return self.volumes.get(guild_id, DEFAULT_VOLUME)
+
+    async def set_volume(self, guild, volume):
+        """
+        Simpan volume guild (berlaku juga untuk lagu berikutnya). Jika lagu sekarang
+        diputar lewat Opus passthrough, sumbernya diganti ke jalur PCM di posisi yang sama.
+        """
+        volume = round(volume, 2)
+        self.volumes[guild.id] = volume
+        vc = guild.voice_client
+        if not vc or not vc.source:
+            return
+        if isinstance(vc.source, discord.PCMVolumeTransformer):
+            vc.source.volume = volume
+            return
+        if volume == PASSTHROUGH_VOLUME:
+            return
+        await self.restart_current_source(guild)
 
-    def add_song_to_history(self, user_id, song_info):
-        user_id_str = str(user_id)
-        if user_id_str not in self.listening_history:
-            self.listening_history[user_id_str] = []
-        if not isinstance(self.listening_history[user_id_str], list):
-             self.listening_history[user_id_str] = []
-        
-        self.listening_history[user_id_str].insert(0, song_info)
-        
-        if len(self.listening_history[user_id_str]) > 50:
-            self.listening_history[user_id_str] = self.listening_history[user_id_str][:50]
-        save_listening_history(self.listening_history)
+    def get_effects(self, guild_id):
+        return audio_effects.normalize_settings(self.equalizer_config.get(str(guild_id)))
+
+    def set_effects(self, guild_id, settings):
+        if any(settings.values()):
+            self.equalizer_config[str(guild_id)] = settings
+        else:
+            self.equalizer_config.pop(str(guild_id), None)
+        save_equalizer_config(self.equalizer_config)
+
+    def playback_options(self, guild_id):
+        """Argumen volume dan filter ffmpeg untuk YTDLSource.from_url di guild ini."""
+        return {
+            'volume': self.get_volume(guild_id),
+            'audio_filter': audio_effects.build_filter_chain(self.get_effects(guild_id)),
+        }
+
+    async def restart_current_source(self, guild):
+        """
+        Buat ulang sumber lagu yang sedang diputar dengan volume/efek terbaru, mulai dari
+        posisi sekarang. URL stream diambil dari cache, jadi tidak ada extract ulang.
+        """
+        vc = guild.voice_client
+        if not vc or not vc.source:
+            return
+        queue = self.get_queue(guild.id)
+        old_source = vc.source
+        url = getattr(old_source, 'data', {}).get('webpage_url') or (queue.current.url if queue.current else None)
+        if not url:
+            return
+        position = queue.elapsed()
+        source = await YTDLSource.from_url(url, loop=self.bot.loop, stream=True, start=position, **self.playback_options(guild.id))
+        if vc.source is not old_source:
+            # Lagu sudah berganti/berhenti selama resolve; lagu berikutnya sudah memakai pengaturan baru.
+            source.cleanup()
+            return
+        vc.source = source
+        old_source.cleanup()
+        queue.seek(int(position), audio_effects.playback_speed(self.get_effects(guild.id)))
+
+    async def build_queue_embed(self, queue, page=1):
+        entries = queue.page(page)
+        # Judul yang belum diketahui dicari sekali, lalu disimpan di track-nya.
+        missing = [track for _, track in entries if not track.title]
+        if missing:
+            infos = await asyncio.gather(*[self.get_song_info_from_url(track.url) for track in missing])
+            for track, info in zip(missing, infos):
+                track.fill(info)
+        lines = []
+        for position, track in entries:
+            duration = ""
+            if track.duration:
+                minutes, seconds = divmod(int(track.duration), 60)
+                duration = f" [{minutes:02}:{seconds:02}]"
+            lines.append(f"{position}. {track.display_title}{duration}")
+        embed = discord.Embed(
+            title="🎶 Antrean Lagu",
+            description="```" + "\n".join(lines) + "```",
+            color=discord.Color.gold()
+        )
+        page_count = queue.page_count()
+        embed.set_footer(text=f"Halaman {min(max(1, page), page_count)}/{page_count} • {len(queue)} lagu di antrean")
+        return embed
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.voice_reconciled:
+            self.voice_reconciled = True
+            self.reconcile_voice_channels()
+        if self.queues_restored:
+            return
+        self.queues_restored = True
+        await self.resume_saved_queues()
+
+    async def resume_saved_queues(self):
+        # Lanjutkan antrean yang tersimpan sebelum restart, mulai dari posisi lagu terakhir.
+        for queue in self.queues.restore():
+            guild = self.bot.get_guild(queue.guild_id)
+            voice_channel = guild.get_channel(queue.voice_channel_id) if guild and queue.voice_channel_id else None
+            text_channel = guild.get_channel(queue.text_channel_id) if guild and queue.text_channel_id else None
+            if not voice_channel or not text_channel or not any(not m.bot for m in voice_channel.members):
+                self.queues.drop(queue.guild_id)
+                continue
+            try:
+                current = queue.current
+                if current:
+                    offset = int(queue.elapsed())
+                    if not current.duration:
+                        queue.push_front(current)
+                    elif offset < current.duration - RESUME_MIN_REMAINING:
+                        queue.push_front(current)
+                        self.resume_offsets[guild.id] = offset
+                if not queue:
+                    self.queues.drop(guild.id)
+                    continue
+                if not guild.voice_client:
+                    await voice_channel.connect(timeout=60.0, reconnect=True)
+                message = await text_channel.send(f"🔁 Melanjutkan antrean musik ({len(queue)} lagu) setelah bot restart.")
+                ctx = await self.bot.get_context(message)
+                await self.play_next(ctx)
+                log.info(f"Antrean guild {guild.id} dilanjutkan ({len(queue)} lagu tersisa).")
+            except Exception as e:
+                log.error(f"Gagal melanjutkan antrean guild {queue.guild_id}: {e}")
+                self.resume_offsets.pop(queue.guild_id, None)
+                self.queues.drop(queue.guild_id)
+
+    def cancel_track_resolution(self, guild_id):
+        task = self.resolver_tasks.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def start_track_resolution(self, ctx, pending_urls, source_name):
+        self.cancel_track_resolution(ctx.guild.id)
+        self.resolver_tasks[ctx.guild.id] = asyncio.create_task(self._append_resolved_tracks(ctx, pending_urls, source_name))
+
+    async def _append_resolved_tracks(self, ctx, pending_urls, source_name):
+        guild_id = ctx.guild.id
+        added = 0
+        try:
+            async for url in pending_urls:
+                if not ctx.voice_client or not ctx.voice_client.is_connected():
+                    break
+                self.get_queue(guild_id).push(Track.from_url(url, ctx.author))
+                if not added:
+                    self.schedule_prefetch(guild_id)
+                added += 1
+        except Exception as e:
+            log.error(f"Error resolving {source_name} tracks: {e}")
+        finally:
+            await pending_urls.aclose()
+            if self.resolver_tasks.get(guild_id) is asyncio.current_task():
+                self.resolver_tasks.pop(guild_id, None)
+        if added:
+            await ctx.send(f"Ditambahkan ke antrian: **{added} lagu lagi dari {source_name}**.", ephemeral=True)
+            if guild_id in self.now_playing_messages:
+                await self._update_music_message_from_ctx(ctx)
+
+    async def _wait_for_resolving_tracks(self, guild_id):
+        # Jangan anggap antrean habis selama playlist masih di-resolve di background.
+        task = self.resolver_tasks.get(guild_id)
+        while not self.get_queue(guild_id) and task and not task.done():
+            await asyncio.wait([task], timeout=0.5)
+
+    def schedule_prefetch(self, guild_id):
+        task = self.prefetch_tasks.get(guild_id)
+        if task and not task.done():
+            self.prefetch_wakeups[guild_id].set()
+            return
+        self.prefetch_wakeups[guild_id] = asyncio.Event()
+        self.prefetch_tasks[guild_id] = asyncio.create_task(self._prefetch_next_track(guild_id))
+
+    async def _prefetch_next_track(self, guild_id):
+        # Resolve kepala antrean selagi lagu sekarang diputar agar play_next langsung
+        # mendapat URL stream dari cache, dan segarkan URL itu sebelum kedaluwarsa.
+        wakeup = self.prefetch_wakeups[guild_id]
+        failed_url = None
+        warmed_url = None
+        try:
+            while True:
+                if guild_id not in self.queues or not self.queues.get(guild_id):
+                    return
+                track = self.queues.get(guild_id).peek()
+                url = track.url
+                if url != failed_url and YTDLSource.cached(url, PREFETCH_MIN_TTL) is None:
+                    try:
+                        track.fill(await YTDLSource.resolve(url, loop=self.bot.loop, min_ttl=PREFETCH_MIN_TTL))
+                        self.prefetch_stats['resolved'] += 1
+                    except Exception as e:
+                        # Tidak diulang sampai kepala antrean berganti; play_next akan mencoba sendiri.
+                        failed_url = url
+                        self.prefetch_stats['failed'] += 1
+                        log.warning(f"Prefetch gagal untuk {url}: {e}")
+                if self.genius and url not in (failed_url, warmed_url):
+                    warmed_url = url
+                    self.schedule_lyrics_prewarm(guild_id, url)
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=PREFETCH_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self.prefetch_tasks.get(guild_id) is asyncio.current_task():
+                self.prefetch_tasks.pop(guild_id, None)
+                self.prefetch_wakeups.pop(guild_id, None)
+                lyrics_task = self.lyrics_prewarm_tasks.pop(guild_id, None)
+                if lyrics_task:
+                    lyrics_task.cancel()
+
+    def schedule_lyrics_prewarm(self, guild_id, url):
+        # Task terpisah: pencarian Genius bisa makan 2x LYRICS_TIMEOUT dan tidak boleh
+        # menahan loop prefetch stream saat antrean berubah.
+        previous = self.lyrics_prewarm_tasks.get(guild_id)
+        if previous and not previous.done():
+            previous.cancel()
+        task = self.lyrics_prewarm_tasks[guild_id] = asyncio.create_task(self.prewarm_lyrics(url))
+        task.add_done_callback(
+            lambda t: self.lyrics_prewarm_tasks.pop(guild_id, None) if self.lyrics_prewarm_tasks.get(guild_id) is t else None
+        )
+
+    def record_track_gap(self, guild_id, prefetched):
+        self.prefetch_stats['hits' if prefetched else 'misses'] += 1
+        ended_at = self.track_ended_at.pop(guild_id, None)
+        if ended_at is None:
+            return
+        gap_ms = (time.perf_counter() - ended_at) * 1000
+        self.track_gaps.append(gap_ms)
+        log.info(f"Jeda antar lagu di guild {guild_id}: {gap_ms:.0f} ms ({'prefetch' if prefetched else 'tanpa prefetch'})")
+
+    async def fetch_lyrics(self, title, artist=None):
+        """Lirik dari cache, atau cari di Genius. Pencarian yang sama digabung menjadi satu request."""
+        key = lyrics_cache.lyrics_key(title, artist)
+        entry = lyrics_cache.get(key)
+        if entry is not None:
+            return entry
+        task = self.lyrics_lookups.get(key)
+        if task is None:
+            task = self.lyrics_lookups[key] = asyncio.create_task(self._search_lyrics(key, title, artist))
+            task.add_done_callback(lambda _: self.lyrics_lookups.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _search_lyrics(self, key, title, artist):
+        async def search(*args):
+            # lyricsgenius memakai requests (blocking), jadi dijalankan di thread.
+            return await asyncio.wait_for(asyncio.to_thread(self.genius.search_song, *args), timeout=LYRICS_TIMEOUT)
+
+        song = None
+        if artist and "Unknown Artist" not in artist and "channel" not in artist.lower() and "vevo" not in artist.lower() and "topic" not in artist.lower():
+            song = await search(title, artist)
+        if not song:
+            song = await search(title)
+        return lyrics_cache.put(key, song)
+
+    async def prewarm_lyrics(self, url):
+        info = await self.get_song_info_from_url(url)
+        try:
+            await self.fetch_lyrics(info['title'], info['artist'])
+        except Exception as e:
+            log.warning(f"Gagal menyiapkan lirik untuk {url}: {e}")
+
+    def add_song_to_history(self, user_id, song_info, guild_id=None):
+        self.listening_history.record(user_id, guild_id, song_info)
 
     async def get_song_info_from_url(self, url):
         try:
-            info = await asyncio.to_thread(lambda: ytdl.extract_info(url, download=False, process=False))
+            is_link = url.startswith(('http://', 'https://'))
+            resolved_url = url if is_link else track_cache.get_url(track_cache.query_key(url))
+            info = track_cache.get_video(resolved_url) if resolved_url else None
+            if info is None:
+                info = await asyncio.to_thread(lambda: ytdl.extract_info(url, download=False, process=False))
+                if is_link and info.get('_type', 'video') == 'video':
+                    track_cache.put_video(info, url)
             title = info.get('title', url)
             artist = info.get('artist') or info.get('uploader', 'Unknown Artist')
             if "Vevo" in artist or "Official" in artist or "Topic" in artist or "Channel" in artist:
@@ -1182,23 +1436,17 @@ class Music(commands.Cog):
                     await interaction_or_ctx.send("Tidak ada lagu yang sedang diputar atau nama lagu tidak diberikan. Harap gunakan `!reslyrics <nama lagu>` untuk mencari lirik.")
                 return
             
-            song = None
-            if song_artist_for_lyrics and "Unknown Artist" not in song_artist_for_lyrics and "channel" not in song_artist_for_lyrics.lower() and "vevo" not in song_artist_for_lyrics.lower() and "topic" not in song_artist_for_lyrics.lower():
-                song = await asyncio.to_thread(self.genius.search_song, song_title_for_lyrics, song_artist_for_lyrics)
-                if not song:
-                    song = await asyncio.to_thread(self.genius.search_song, song_title_for_lyrics)
-            else:
-                song = await asyncio.to_thread(self.genius.search_song, song_title_for_lyrics)
+            song = await self.fetch_lyrics(song_title_for_lyrics, song_artist_for_lyrics)
             
-            if song:
+            if song['found'] and song.get('lyrics'):
                 embed = discord.Embed(
-                    title=f"Lirik: {song.title} - {song.artist}",
+                    title=f"Lirik: {song['title']} - {song['artist']}",
                     color=discord.Color.dark_teal(),
-                    url=song.url
+                    url=song['url']
                 )
-                if song.song_art_image_url:
-                    embed.set_thumbnail(url=song.song_art_image_url)
-                lyrics_parts = [song.lyrics[i:i+1900] for i in range(0, len(song.lyrics), 1900)]
+                if song.get('art'):
+                    embed.set_thumbnail(url=song['art'])
+                lyrics_parts = [song['lyrics'][i:i+1900] for i in range(0, len(song['lyrics']), 1900)]
                 embed.description = lyrics_parts[0]
                 
                 if isinstance(interaction_or_ctx, discord.Interaction):
@@ -1223,8 +1471,11 @@ class Music(commands.Cog):
                 else:
                     await interaction_or_ctx.send("Lirik tidak ditemukan untuk lagu tersebut.")
         except Exception as e:
-            error_message = f"Gagal mengambil lirik: {e}"
-            log.error(f"Error in _send_lyrics: {e}")
+            if isinstance(e, asyncio.TimeoutError):
+                error_message = "Genius tidak merespons. Coba lagi sebentar lagi."
+            else:
+                error_message = f"Gagal mengambil lirik: {e}"
+            log.error(f"Error in _send_lyrics: {e!r}")
             if isinstance(interaction_or_ctx, discord.Interaction):
                 if interaction_or_ctx.response.is_done():
                     await interaction_or_ctx.followup.send(error_message, ephemeral=True)
@@ -1237,40 +1488,37 @@ class Music(commands.Cog):
         guild_id = ctx.guild.id
         queue = self.get_queue(guild_id)
         
-        if self.loop_status.get(guild_id, False) and ctx.voice_client and ctx.voice_client.source:
-            current_song_url = ctx.voice_client.source.data.get('webpage_url')
-            if current_song_url:
-                queue.insert(0, current_song_url)
+        if self.loop_status.get(guild_id, False) and ctx.voice_client and ctx.voice_client.source and queue.current:
+            queue.push_front(queue.current)
         
         if not queue:
-            vc = ctx.voice_client
-            if vc and vc.is_connected() and len([member for member in vc.channel.members if not member.bot]) > 0:
-                pass
+            await self._wait_for_resolving_tracks(guild_id)
+            queue = self.get_queue(guild_id)
         
         if not queue:
+            self.track_ended_at.pop(guild_id, None)
+            self.queues.drop(guild_id)
             vc = ctx.voice_client
             if vc and vc.is_connected():
                 await vc.disconnect()
             
-            if guild_id in self.current_music_message_info:
-                message_info = self.current_music_message_info.pop(guild_id)
-                try:
-                    channel = ctx.guild.get_channel(message_info['channel_id']) or await ctx.guild.fetch_channel(message_info['channel_id'])
-                    if channel:
-                        old_message = await channel.fetch_message(message_info['message_id'])
-                        await old_message.delete()
-                except (discord.NotFound, discord.HTTPException):
-                    pass
+            if guild_id in self.now_playing_messages:
+                await self.clear_now_playing(guild_id)
                 await ctx.send("Antrean kosong. Bot akan keluar dari voice channel jika tidak ada pengguna lain.", ephemeral=True)
             return
         
-        url = queue.pop(0)
+        track = queue.pop()
+        url = track.url
         try:
-            song_info_from_ytdl = await self.get_song_info_from_url(url)
-            self.add_song_to_history(ctx.author.id, song_info_from_ytdl)
-            song_info_from_ytdl['requester'] = ctx.author.mention
+            # from_url lebih dulu: hasilnya mengisi cache sehingga info lagu tidak perlu extract_info lagi.
+            prefetched = YTDLSource.cached(url) is not None
+            start = self.resume_offsets.pop(guild_id, 0)
+            source = await YTDLSource.from_url(url, loop=self.bot.loop, stream=True, start=start, **self.playback_options(guild_id))
+            track.fill(source.data)
             
-            source = await YTDLSource.from_url(url, loop=self.bot.loop, stream=True)
+            song_info_from_ytdl = await self.get_song_info_from_url(url)
+            self.add_song_to_history(track.requester_id or ctx.author.id, song_info_from_ytdl, guild_id)
+            song_info_from_ytdl['requester'] = track.requester or ctx.author.mention
             
             if not ctx.voice_client or not ctx.voice_client.is_connected():
                 await ctx.send("Bot tidak terhubung ke voice channel. Silakan hubungkan terlebih dahulu.", ephemeral=True)
@@ -1280,6 +1528,10 @@ class Music(commands.Cog):
                 ctx.voice_client.stop()
             
             ctx.voice_client.play(source, after=lambda e: asyncio.run_coroutine_threadsafe(self._after_play_handler(ctx, e), self.bot.loop))
+            speed = audio_effects.playback_speed(self.get_effects(guild_id))
+            queue.set_current(track, ctx.voice_client.channel.id, ctx.channel.id, position=start, speed=speed)
+            self.record_track_gap(guild_id, prefetched)
+            self.schedule_prefetch(guild_id)
             self.now_playing_info[guild_id] = song_info_from_ytdl
             
             await self.update_music_status(
@@ -1287,37 +1539,7 @@ class Music(commands.Cog):
                 is_playing=True
             )
             
-            embed = discord.Embed(
-                title="🎶 Sedang Memutar",
-                description=f"**[{self.now_playing_info[guild_id]['title']}]({self.now_playing_info[guild_id]['webpage_url']})**",
-                color=discord.Color.purple()
-            )
-            if source.thumbnail:
-                embed.set_thumbnail(url=source.thumbnail)
-            
-            duration_str = "N/A"
-            if source.duration:
-                minutes, seconds = divmod(source.duration, 60)
-                duration_str = f"{minutes:02}:{seconds:02}"
-            
-            embed.add_field(name="Durasi", value=duration_str, inline=True)
-            embed.add_field(name="Diminta oleh", value=ctx.author.mention, inline=True)
-            embed.set_footer(text=f"Antrean: {len(queue)} lagu tersisa")
-            
-            view = MusicControlView(self)
-            
-            if guild_id in self.current_music_message_info:
-                message_info = self.current_music_message_info.pop(guild_id)
-                try:
-                    channel = ctx.guild.get_channel(message_info['channel_id']) or await ctx.guild.fetch_channel(message_info['channel_id'])
-                    if channel:
-                        old_message = await channel.fetch_message(message_info['message_id'])
-                        await old_message.delete()
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-            
-            message_sent = await ctx.send(embed=embed, view=view)
-            self.current_music_message_info[guild_id] = {'message_id': message_sent.id, 'channel_id': message_sent.channel.id}
+            self.refresh_now_playing(ctx.guild, ctx.channel, track_changed=True)
         
         except Exception as e:
             log.error(f"Error in play_next: {e}")
@@ -1326,14 +1548,14 @@ class Music(commands.Cog):
                 ctx.voice_client.stop()
 
     async def _after_play_handler(self, ctx, error):
+        self.track_ended_at[ctx.guild.id] = time.perf_counter()
         if error:
             log.error(f"Error in _after_play_handler: {error}")
             try:
                 await ctx.send(f"Terjadi error saat memutar: {error}")
             except:
                 pass
-        
-        await asyncio.sleep(1)
+            await asyncio.sleep(1)
         
         try:
             if ctx.voice_client and ctx.voice_client.is_connected():
@@ -1342,99 +1564,90 @@ class Music(commands.Cog):
                 await self.update_music_status(is_playing=False)
                 
                 guild_id = ctx.guild.id
-                self.queues.pop(guild_id, None)
+                self.queues.drop(guild_id)
+                self.cancel_track_resolution(guild_id)
+                self.track_ended_at.pop(guild_id, None)
                 self.loop_status.pop(guild_id, None)
                 self.is_muted.pop(guild_id, None)
                 self.old_volume.pop(guild_id, None)
+                self.volumes.pop(guild_id, None)
                 self.now_playing_info.pop(guild_id, None)
                 
-                if guild_id in self.current_music_message_info:
-                    old_message_info = self.current_music_message_info[guild_id]
-                    try:
-                        old_channel = ctx.guild.get_channel(old_message_info['channel_id']) or await ctx.guild.fetch_channel(old_message_info['channel_id'])
-                        if old_channel:
-                            old_message = await old_channel.fetch_message(old_message_info['message_id'])
-                            await old_message.delete()
-                    except (discord.NotFound, discord.HTTPException):
-                        pass
-                    finally:
-                        self.current_music_message_info.pop(guild_id, None)
+                await self.clear_now_playing(guild_id)
         except Exception as e:
             log.error(f"Error in _after_play_handler cleanup: {e}")
 
     async def _update_music_message_from_ctx(self, ctx):
         try:
-            guild_id = ctx.guild.id
-            current_message_info = self.current_music_message_info.get(guild_id)
-            if not current_message_info:
-                return
-            
-            vc = ctx.voice_client
-            queue = self.get_queue(guild_id)
-            
-            if vc and vc.is_connected() and vc.is_playing() and vc.source and guild_id in self.now_playing_info:
-                info = self.now_playing_info[guild_id]
-                source = vc.source
-                embed_to_send = discord.Embed(
-                    title="🎶 Sedang Memutar",
-                    description=f"**[{info['title']}]({info['webpage_url']})**",
-                    color=discord.Color.purple()
-                )
-                if source.thumbnail:
-                    embed_to_send.set_thumbnail(url=source.thumbnail)
-                duration_str = "N/A"
-                if source.duration:
-                    minutes, seconds = divmod(source.duration, 60)
-                    duration_str = f"{minutes:02}:{seconds:02}"
-                embed_to_send.add_field(name="Durasi", value=duration_str, inline=True)
-                embed_to_send.add_field(name="Diminta oleh", value=info.get('requester', 'N/A'), inline=True)
-                embed_to_send.set_footer(text=f"Antrean: {len(queue)} lagu tersisa")
-            else:
-                embed_to_send = discord.Embed(title="Musik Bot", description="Status musik...", color=discord.Color.light_grey())
-            
-            updated_view = MusicControlView(self)
-            if not vc or not vc.is_connected():
-                for item in updated_view.children:
-                    item.disabled = True
-            else:
-                for item in updated_view.children:
-                    if item.custom_id == "music:play_pause":
-                        if vc.is_playing():
-                            item.emoji = "⏸️"
-                            item.style = discord.ButtonStyle.green
-                        elif vc.is_paused():
-                            item.emoji = "▶️"
-                            item.style = discord.ButtonStyle.primary
-                    elif item.custom_id == "music:mute_unmute":
-                        if self.is_muted.get(guild_id, False):
-                            item.emoji = "🔇"
-                        else:
-                            item.emoji = "🔊"
-                    elif item.custom_id == "music:loop":
-                        if self.loop_status.get(guild_id, False):
-                            item.style = discord.ButtonStyle.green
-                        else:
-                            item.style = discord.ButtonStyle.grey
-                    item.disabled = False
-            
-            if guild_id in self.current_music_message_info:
-                message_info = self.current_music_message_info.pop(guild_id)
-                try:
-                    channel = ctx.guild.get_channel(message_info['channel_id']) or await ctx.guild.fetch_channel(message_info['channel_id'])
-                    if channel:
-                        old_message = await channel.fetch_message(message_info['message_id'])
-                        await old_message.delete()
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-            
-            new_message = await ctx.send(embed=embed_to_send, view=updated_view)
-            self.current_music_message_info[guild_id] = {
-                'message_id': new_message.id,
-                'channel_id': new_message.channel.id
-            }
+            if ctx.guild.id in self.now_playing_messages:
+                self.refresh_now_playing(ctx.guild, ctx.channel)
         except Exception as e:
             log.error(f"Error in _update_music_message_from_ctx: {e}")
 
+    def get_now_playing_message(self, guild):
+        message = self.now_playing_messages.get(guild.id)
+        if message is None:
+            message = self.now_playing_messages[guild.id] = NowPlayingMessage(lambda: self.build_now_playing(guild))
+        return message
+
+    def refresh_now_playing(self, guild, channel=None, message=None, track_changed=False):
+        """Perbarui pesan now-playing guild (edit di tempat, di-debounce); kirim baru jika belum ada."""
+        self.get_now_playing_message(guild).update(channel, message, track_changed)
+
+    async def clear_now_playing(self, guild_id):
+        message = self.now_playing_messages.pop(guild_id, None)
+        if message is not None:
+            await message.delete()
+
+    def build_now_playing(self, guild):
+        guild_id = guild.id
+        vc = guild.voice_client
+        queue = self.get_queue(guild_id)
+        
+        if vc and vc.is_connected() and (vc.is_playing() or vc.is_paused()) and vc.source and guild_id in self.now_playing_info:
+            info = self.now_playing_info[guild_id]
+            source = vc.source
+            embed = discord.Embed(
+                title="🎶 Sedang Memutar",
+                description=f"**[{info['title']}]({info['webpage_url']})**",
+                color=discord.Color.purple()
+            )
+            if source.thumbnail:
+                embed.set_thumbnail(url=source.thumbnail)
+            duration_str = "N/A"
+            if source.duration:
+                minutes, seconds = divmod(int(source.duration), 60)
+                duration_str = f"{minutes:02}:{seconds:02}"
+            embed.add_field(name="Durasi", value=duration_str, inline=True)
+            embed.add_field(name="Diminta oleh", value=info.get('requester', 'N/A'), inline=True)
+            embed.set_footer(text=f"Antrean: {len(queue)} lagu tersisa")
+        else:
+            embed = discord.Embed(
+                title="Musik Bot",
+                description="Antrean kosong. Bot akan keluar dari voice channel jika tidak ada pengguna lain.",
+                color=discord.Color.red()
+            )
+        
+        view = MusicControlView(self)
+        if not vc or not vc.is_connected():
+            for item in view.children:
+                item.disabled = True
+        else:
+            for item in view.children:
+                if item.custom_id == "music:play_pause":
+                    if vc.is_playing():
+                        item.emoji = "⏸️"
+                        item.style = discord.ButtonStyle.green
+                    elif vc.is_paused():
+                        item.emoji = "▶️"
+                        item.style = discord.ButtonStyle.primary
+                elif item.custom_id == "music:mute_unmute":
+                    item.emoji = "🔇" if self.is_muted.get(guild_id, False) else "🔊"
+                elif item.custom_id == "music:loop":
+                    item.style = discord.ButtonStyle.green if self.loop_status.get(guild_id, False) else discord.ButtonStyle.grey
+                item.disabled = False
+        return embed, view
+
     async def send_scheduled_message(self, member, message_content):
         try:
             await member.move_to(None)
@@ -1446,50 +1659,39 @@ class Music(commands.Cog):
             pass
 
     async def process_spotify_url(self, query, ctx):
+        """
+        Kembalikan (urls, spotify_track_info, pending_urls). Untuk playlist/album,
+        urls hanya berisi lagu pertama yang sudah ketemu; sisanya dihasilkan oleh
+        async generator pending_urls sambil pencarian paralel berjalan.
+        """
         try:
             urls = []
             spotify_track_info = None
+            pending_urls = None
             
             if "track" in query:
-                track = self.spotify.track(query)
+                track = await asyncio.to_thread(self.spotify.track, query)
                 spotify_track_info = {
                     'title': track['name'],
                     'artist': track['artists'][0]['name'],
                     'webpage_url': track['external_urls']['spotify'],
                     'requester': ctx.author.mention
                 }
-                search_query = f"{track['name']} {track['artists'][0]['name']} audio"
-                info = await asyncio.to_thread(lambda: ytdl.extract_info(search_query, download=False, process=True))
-                if 'entries' in info and isinstance(info.get('entries'), list) and len(info['entries']) > 0:
-                    urls.append(info['entries'][0]['webpage_url'])
-                else:
+                url = await resolve_spotify_track(ytdl, track)
+                if not url:
                     raise Exception(f"Tidak dapat menemukan audio untuk track Spotify: {track['name']}")
-            elif "playlist" in query:
-                results = self.spotify.playlist_tracks(query)
-                for item in results['items']:
-                    track = item['track']
-                    if track:
-                        search_query = f"{track['name']} {track['artists'][0]['name']} audio"
-                        try:
-                            info = await asyncio.to_thread(lambda: ytdl.extract_info(search_query, download=False, process=True))
-                            if 'entries' in info and isinstance(info.get('entries'), list) and len(info['entries']) > 0:
-                                urls.append(info['entries'][0]['webpage_url'])
-                        except Exception:
-                            continue
-            elif "album" in query:
-                results = self.spotify.album_tracks(query)
-                for item in results['items']:
-                    track = item
-                    if track:
-                        search_query = f"{track['name']} {track['artists'][0]['name']} audio"
-                        try:
-                            info = await asyncio.to_thread(lambda: ytdl.extract_info(search_query, download=False, process=True))
-                            if 'entries' in info and isinstance(info.get('entries'), list) and len(info['entries']) > 0:
-                                urls.append(info['entries'][0]['webpage_url'])
-                        except Exception:
-                            continue
+                urls.append(url)
+            elif "playlist" in query or "album" in query:
+                tracks = await fetch_spotify_tracks(self.spotify, query)
+                pending_urls = resolve_in_order(tracks, functools.partial(resolve_spotify_track, ytdl))
+                first_url = await anext(pending_urls, None)
+                if first_url:
+                    urls.append(first_url)
+                else:
+                    await pending_urls.aclose()
+                    pending_urls = None
             
-            return urls, spotify_track_info
+            return urls, spotify_track_info, pending_urls
         except Exception as e:
             log.error(f"Error processing Spotify URL: {e}")
             raise Exception(f"Gagal memproses link Spotify. Coba gunakan link Deezer atau SoundCloud sebagai alternatif. Error: {str(e)[:100]}")
@@ -1509,6 +1711,8 @@ class Music(commands.Cog):
             info = await asyncio.to_thread(lambda: ytdl.extract_info(search_query, download=False, process=True))
             if 'entries' in info and isinstance(info.get('entries'), list):
                 urls = [entry['webpage_url'] for entry in info['entries']]
+                for entry in info['entries']:
+                    track_cache.put_video(entry)
                 return urls, None
             elif 'webpage_url' in info:
                 return [info['webpage_url']], None
@@ -1524,6 +1728,8 @@ class Music(commands.Cog):
             info = await asyncio.to_thread(lambda: ytdl.extract_info(search_query, download=False, process=True))
             if 'entries' in info and isinstance(info.get('entries'), list):
                 urls = [entry['webpage_url'] for entry in info['entries']]
+                for entry in info['entries']:
+                    track_cache.put_video(entry)
                 return urls, None
             elif 'webpage_url' in info:
                 return [info['webpage_url']], None
@@ -1832,11 +2038,12 @@ class Music(commands.Cog):
             is_deezer_request = False
             is_soundcloud_request = False
             spotify_track_info = None
+            pending_urls = None
             
             if "open.spotify.com" in query or "spotify:" in query:
                 is_spotify_request = True
                 try:
-                    urls, spotify_track_info = await self.process_spotify_url(query, ctx)
+                    urls, spotify_track_info, pending_urls = await self.process_spotify_url(query, ctx)
                     if not urls:
                         await ctx.send("⚠️ Link Spotify saat ini sedang mengalami masalah hak cipta. Coba gunakan link Deezer atau SoundCloud sebagai alternatif.", ephemeral=True)
                         return
@@ -1867,19 +2074,26 @@ class Music(commands.Cog):
                 urls.append(query)
             
             queue = self.get_queue(ctx.guild.id)
+            if pending_urls:
+                self.start_track_resolution(ctx, pending_urls, "Spotify")
             
             if not ctx.voice_client.is_playing() and not ctx.voice_client.is_paused() and not queue:
                 first_url = urls.pop(0)
-                queue.extend(urls)
+                queue.extend(Track.from_url(url, ctx.author) for url in urls)
                 
                 try:
-                    source = await YTDLSource.from_url(first_url, loop=self.bot.loop, stream=True)
+                    source = await YTDLSource.from_url(first_url, loop=self.bot.loop, stream=True, **self.playback_options(ctx.guild.id))
                     
                     if not ctx.voice_client or not ctx.voice_client.is_connected():
                         await ctx.send("Bot tidak terhubung ke voice channel. Silakan hubungkan terlebih dahulu.", ephemeral=True)
                         return
                     
                     ctx.voice_client.play(source, after=lambda e: asyncio.run_coroutine_threadsafe(self._after_play_handler(ctx, e), self.bot.loop))
+                    first_track = Track.from_url(first_url, ctx.author)
+                    first_track.fill(source.data)
+                    speed = audio_effects.playback_speed(self.get_effects(ctx.guild.id))
+                    queue.set_current(first_track, ctx.voice_client.channel.id, ctx.channel.id, speed=speed)
+                    self.schedule_prefetch(ctx.guild.id)
                     
                     if is_spotify_request and spotify_track_info:
                         self.now_playing_info[ctx.guild.id] = spotify_track_info
@@ -1899,50 +2113,9 @@ class Music(commands.Cog):
                         is_playing=True
                     )
                     
-                    self.add_song_to_history(ctx.author.id, self.now_playing_info[ctx.guild.id])
-                    
-                    embed = discord.Embed(
-                        title="🎶 Sedang Memutar",
-                        description=f"**[{self.now_playing_info[ctx.guild.id]['title']}]({self.now_playing_info[ctx.guild.id]['webpage_url']})**",
-                        color=discord.Color.purple()
-                    )
-                    
-                    if source.thumbnail:
-                        embed.set_thumbnail(url=source.thumbnail)
-                    
-                    duration_str = "N/A"
-                    if source.duration:
-                        minutes, seconds = divmod(source.duration, 60)
-                        duration_str = f"{minutes:02}:{seconds:02}"
-                    
-                    embed.add_field(name="Durasi", value=duration_str, inline=True)
-                    embed.add_field(name="Diminta oleh", value=ctx.author.mention, inline=True)
-                    embed.set_footer(text=f"Antrean: {len(queue)} lagu tersisa")
-                    
-                    view_instance = MusicControlView(self)
-                    
-                    if self.is_muted.get(ctx.guild.id, False):
-                        for item in view_instance.children:
-                            if item.custom_id == "music:mute_unmute":
-                                item.emoji = "🔇"
-                                break
-                    
-                    if ctx.guild.id in self.current_music_message_info:
-                        message_info = self.current_music_message_info.pop(ctx.guild.id)
-                        try:
-                            old_channel = ctx.guild.get_channel(message_info['channel_id']) or await ctx.guild.fetch_channel(message_info['channel_id'])
-                            if old_channel:
-                                old_message = await old_channel.fetch_message(message_info['message_id'])
-                                await old_message.delete()
-                        except (discord.NotFound, discord.HTTPException):
-                            pass
+                    self.add_song_to_history(ctx.author.id, self.now_playing_info[ctx.guild.id], ctx.guild.id)
                     
-                    message_sent = await ctx.send(embed=embed, view=view_instance)
-                    if message_sent:
-                        self.current_music_message_info[ctx.guild.id] = {
-                            'message_id': message_sent.id,
-                            'channel_id': message_sent.channel.id
-                        }
+                    self.refresh_now_playing(ctx.guild, ctx.channel, track_changed=True)
                 
                 except discord.errors.ConnectionClosed as e:
                     await ctx.send("❌ **Error 4006**: Koneksi voice terputus saat memutar musik. Silakan coba lagi.")
@@ -1957,6 +2130,9 @@ class Music(commands.Cog):
                         ctx.voice_client.stop()
                     return
             else:
+                tracks = [Track.from_url(url, ctx.author) for url in urls]
+                queue.extend(tracks)
+                self.schedule_prefetch(ctx.guild.id)
                 if is_spotify_request:
                     await ctx.send(f"Ditambahkan ke antrian: **{len(urls)} lagu dari Spotify**.", ephemeral=True)
                 elif is_deezer_request:
@@ -1965,10 +2141,10 @@ class Music(commands.Cog):
                     await ctx.send(f"Ditambahkan ke antrian: **{len(urls)} lagu dari SoundCloud**.", ephemeral=True)
                 else:
                     song_info = await self.get_song_info_from_url(urls[0])
+                    tracks[0].fill(song_info)
                     await ctx.send(f"Ditambahkan ke antrean: **{song_info['title']}**.", ephemeral=True)
                 
-                queue.extend(urls)
-                if ctx.guild.id in self.current_music_message_info:
+                if ctx.guild.id in self.now_playing_messages:
                     await self._update_music_message_from_ctx(ctx)
         
         except discord.errors.ConnectionClosed as e:
@@ -1989,11 +2165,6 @@ class Music(commands.Cog):
             if not ctx.voice_client.is_playing() and not ctx.voice_client.is_paused():
                 return await ctx.send("Tidak ada lagu yang sedang diputar.", ephemeral=True)
             
-            guild_id = ctx.guild.id
-            queue = self.get_queue(guild_id)
-            if queue:
-                queue.pop(0)
-            
             ctx.voice_client.stop()
             await ctx.send("⏭️ Skip lagu.", ephemeral=True)
         
@@ -2010,7 +2181,7 @@ class Music(commands.Cog):
             if ctx.voice_client.is_playing():
                 ctx.voice_client.pause()
                 await ctx.send("⏸️ Lagu dijeda.", ephemeral=True)
-                if ctx.guild.id in self.current_music_message_info:
+                if ctx.guild.id in self.now_playing_messages:
                     await self._update_music_message_from_ctx(ctx)
             else:
                 await ctx.send("Tidak ada lagu yang sedang diputar.", ephemeral=True)
@@ -2028,7 +2199,7 @@ class Music(commands.Cog):
             if ctx.voice_client.is_paused():
                 ctx.voice_client.resume()
                 await ctx.send("▶️ Lanjut lagu.", ephemeral=True)
-                if ctx.guild.id in self.current_music_message_info:
+                if ctx.guild.id in self.now_playing_messages:
                     await self._update_music_message_from_ctx(ctx)
             else:
                 await ctx.send("Tidak ada lagu yang dijeda.", ephemeral=True)
@@ -2043,17 +2214,7 @@ class Music(commands.Cog):
             if not ctx.voice_client or not ctx.voice_client.is_connected():
                 return await ctx.send("Bot tidak ada di voice channel.", ephemeral=True)
             
-            if ctx.guild.id in self.current_music_message_info:
-                old_message_info = self.current_music_message_info[ctx.guild.id]
-                try:
-                    target_channel = ctx.guild.get_channel(old_message_info['channel_id']) or await ctx.guild.fetch_channel(old_message_info['channel_id'])
-                    if target_channel:
-                        old_message = await target_channel.fetch_message(old_message_info['message_id'])
-                        await old_message.delete()
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-                finally:
-                    del self.current_music_message_info[ctx.guild.id]
+            await self.clear_now_playing(ctx.guild.id)
             
             if ctx.voice_client.is_playing() or ctx.voice_client.is_paused():
                 ctx.voice_client.stop()
@@ -2063,10 +2224,12 @@ class Music(commands.Cog):
             await self.update_music_status(is_playing=False)
             
             guild_id = ctx.guild.id
-            self.queues.pop(guild_id, None)
+            self.queues.drop(guild_id)
+            self.cancel_track_resolution(guild_id)
             self.loop_status.pop(guild_id, None)
             self.is_muted.pop(guild_id, None)
             self.old_volume.pop(guild_id, None)
+            self.volumes.pop(guild_id, None)
             self.now_playing_info.pop(guild_id, None)
             
             await ctx.send("⏹️ Stop dan keluar dari voice.", ephemeral=True)
@@ -2076,19 +2239,11 @@ class Music(commands.Cog):
             await ctx.send(f"Terjadi kesalahan: {e}", ephemeral=True)
 
     @commands.command(name="resqueue", aliases=["q", "queue"])
-    async def queue_cmd(self, ctx):
+    async def queue_cmd(self, ctx, page: int = 1):
         try:
             queue = self.get_queue(ctx.guild.id)
             if queue:
-                display_queue_titles = [await self.get_song_info_from_url(q) for q in queue[:15]]
-                msg = "\n".join([f"{i+1}. {q['title']}" for i, q in enumerate(display_queue_titles)])
-                embed = discord.Embed(
-                    title="🎶 Antrean Lagu",
-                    description=f"```{msg}```",
-                    color=discord.Color.gold()
-                )
-                if len(queue) > 15:
-                    embed.set_footer(text=f"Dan {len(queue) - 15} lagu lainnya...")
+                embed = await self.build_queue_embed(queue, page)
                 await ctx.send(embed=embed, ephemeral=True)
             else:
                 await ctx.send("Antrean kosong.", ephemeral=True)
@@ -2097,6 +2252,54 @@ class Music(commands.Cog):
             log.error(f"Error in queue_cmd: {e}")
             await ctx.send("Terjadi kesalahan saat mengambil antrean.", ephemeral=True)
             
+    @commands.command(name="resremove", aliases=["remove"])
+    async def remove_cmd(self, ctx, position: int):
+        try:
+            queue = self.get_queue(ctx.guild.id)
+            try:
+                track = queue.remove(position)
+            except IndexError:
+                return await ctx.send(f"Posisi tidak valid. Antrean berisi {len(queue)} lagu.", ephemeral=True)
+            await ctx.send(f"🗑️ Dihapus dari antrean: **{track.display_title}**.", ephemeral=True)
+            if ctx.guild.id in self.now_playing_messages:
+                await self._update_music_message_from_ctx(ctx)
+        
+        except Exception as e:
+            log.error(f"Error in remove_cmd: {e}")
+            await ctx.send(f"Terjadi kesalahan: {e}", ephemeral=True)
+
+    @commands.command(name="reshistory", aliases=["history"])
+    async def history_cmd(self, ctx, member: discord.Member = None):
+        member = member or ctx.author
+        recent = self.listening_history.recent(member.id, limit=10)
+        if not recent:
+            return await ctx.send(f"Belum ada riwayat lagu untuk {member.display_name}.", ephemeral=True)
+        embed = discord.Embed(title=f"🕘 Riwayat Lagu {member.display_name}", color=discord.Color.gold())
+        embed.add_field(
+            name="Terakhir Diputar",
+            value="\n".join(f"{i}. {song['title']}" for i, song in enumerate(recent, start=1))[:1024],
+            inline=False
+        )
+        top = self.listening_history.top_user_tracks(member.id, limit=5)
+        embed.add_field(
+            name="Paling Sering",
+            value="\n".join(f"{song['title']} ({count}x)" for song, count in top)[:1024],
+            inline=False
+        )
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.command(name="restop", aliases=["toptracks"])
+    async def top_tracks_cmd(self, ctx):
+        top = self.listening_history.top_guild_tracks(ctx.guild.id, limit=10)
+        if not top:
+            return await ctx.send("Belum ada lagu yang diputar di server ini.", ephemeral=True)
+        embed = discord.Embed(
+            title=f"🏆 Lagu Terpopuler di {ctx.guild.name}",
+            description="\n".join(f"{i}. {song['title']} ({count}x)" for i, (song, count) in enumerate(top, start=1))[:4096],
+            color=discord.Color.gold()
+        )
+        await ctx.send(embed=embed, ephemeral=True)
+
     @commands.command(name="resloop")
     async def loop_cmd(self, ctx):
         try:
@@ -2108,7 +2311,7 @@ class Music(commands.Cog):
             status_msg = "ON" if self.loop_status[guild_id] else "OFF"
             
             await ctx.send(f"🔁 Mode Loop **{status_msg}** (lagu saat ini akan diulang).", ephemeral=True)
-            if ctx.guild.id in self.current_music_message_info:
+            if ctx.guild.id in self.now_playing_messages:
                 await self._update_music_message_from_ctx(ctx)
         
         except Exception as e:
@@ -2144,32 +2347,82 @@ class Music(commands.Cog):
             if not 0 <= volume <= 100:
                 return await ctx.send("Volume harus antara 0 dan 100.", ephemeral=True)
             
-            ctx.voice_client.source.volume = volume / 100
             guild_id = ctx.guild.id
-            
-            if volume > 0:
-                self.is_muted[guild_id] = False
-            else:
-                self.is_muted[guild_id] = True
-                self.old_volume[guild_id] = ctx.voice_client.source.volume
+            if volume == 0 and not self.is_muted.get(guild_id, False):
+                self.old_volume[guild_id] = self.get_volume(guild_id)
+            await self.set_volume(ctx.guild, volume / 100)
+            self.is_muted[guild_id] = volume == 0
             
             await ctx.send(f"Volume diatur ke: {volume}%", ephemeral=True)
             
-            if ctx.guild.id in self.current_music_message_info:
+            if ctx.guild.id in self.now_playing_messages:
                 await self._update_music_message_from_ctx(ctx)
         
         except Exception as e:
             log.error(f"Error in volume_cmd: {e}")
             await ctx.send(f"Terjadi kesalahan: {e}", ephemeral=True)
 
+    @commands.command(name="resfilter", aliases=["eq", "filter"])
+    async def filter_cmd(self, ctx, action: str = None, *args):
+        try:
+            guild_id = ctx.guild.id
+            settings = self.get_effects(guild_id)
+            action = action.lower() if action else None
+            
+            if action is None:
+                embed = discord.Embed(
+                    title="🎛️ Efek Audio",
+                    description=audio_effects.describe(settings),
+                    color=discord.Color.blue()
+                )
+                bands = ", ".join(str(freq) for freq in audio_effects.EQ_BANDS)
+                embed.add_field(
+                    name="📖 Perintah",
+                    value=f"`!resfilter bass <0-{audio_effects.MAX_BASS_GAIN}>` - Bass boost (dB)\n"
+                          f"`!resfilter eq <band> <-{audio_effects.MAX_EQ_GAIN}..{audio_effects.MAX_EQ_GAIN}>` - Atur band EQ (Hz: {bands})\n"
+                          "`!resfilter nightcore` - Nyalakan/matikan nightcore\n"
+                          "`!resfilter normalize` - Nyalakan/matikan normalisasi volume\n"
+                          "`!resfilter reset` - Hapus semua efek",
+                    inline=False
+                )
+                return await ctx.send(embed=embed, ephemeral=True)
+            
+            if action == "bass" and len(args) == 1:
+                settings["bass"] = float(args[0])
+            elif action == "eq" and len(args) == 2:
+                if int(args[0]) not in audio_effects.EQ_BANDS:
+                    return await ctx.send(f"Band tidak dikenal. Pilih salah satu: {', '.join(map(str, audio_effects.EQ_BANDS))}.", ephemeral=True)
+                settings["bands"][str(int(args[0]))] = float(args[1])
+            elif action == "nightcore":
+                settings["nightcore"] = not settings["nightcore"]
+            elif action in ("normalize", "normalisasi"):
+                settings["normalize"] = not settings["normalize"]
+            elif action == "reset":
+                settings = audio_effects.default_settings()
+            else:
+                return await ctx.send("Perintah tidak dikenal. Ketik `!resfilter` untuk melihat daftar perintah.", ephemeral=True)
+            
+            settings = audio_effects.normalize_settings(settings)
+            self.set_effects(guild_id, settings)
+            
+            if ctx.voice_client and ctx.voice_client.source:
+                await self.restart_current_source(ctx.guild)
+            await ctx.send(f"🎛️ Efek audio: **{audio_effects.describe(settings)}**", ephemeral=True)
+        
+        except ValueError:
+            await ctx.send("Nilai harus berupa angka.", ephemeral=True)
+        except Exception as e:
+            log.error(f"Error in filter_cmd: {e}")
+            await ctx.send(f"Terjadi kesalahan: {e}", ephemeral=True)
+
     @commands.command(name="resshuffle")
     async def shuffle_cmd(self, ctx):
         try:
             queue = self.get_queue(ctx.guild.id)
             if len(queue) > 1:
-                random.shuffle(queue)
+                queue.shuffle()
                 await ctx.send("🔀 Antrean lagu diacak!", ephemeral=True)
-                if ctx.guild.id in self.current_music_message_info:
+                if ctx.guild.id in self.now_playing_messages:
                     await self._update_music_message_from_ctx(ctx)
             else:
                 await ctx.send("Antrean terlalu pendek untuk diacak.", ephemeral=True)
@@ -2183,9 +2436,10 @@ class Music(commands.Cog):
         try:
             queue = self.get_queue(ctx.guild.id)
             if queue:
-                self.queues[ctx.guild.id] = []
+                queue.clear()
+                self.cancel_track_resolution(ctx.guild.id)
                 await ctx.send("🗑️ Antrean lagu telah dikosongkan!", ephemeral=True)
-                if ctx.guild.id in self.current_music_message_info:
+                if ctx.guild.id in self.now_playing_messages:
                     await self._update_music_message_from_ctx(ctx)
             else:
                 await ctx.send("Antrean sudah kosong.", ephemeral=True)
@@ -2194,6 +2448,32 @@ class Music(commands.Cog):
             log.error(f"Error in clear_queue_cmd: {e}")
             await ctx.send(f"Terjadi kesalahan: {e}", ephemeral=True)
     
+    @commands.command(name="resgap", hidden=True)
+    @commands.is_owner()
+    async def track_gap_stats(self, ctx):
+        stats = self.prefetch_stats
+        gaps = sorted(self.track_gaps)
+        if not gaps:
+            return await ctx.send("Belum ada pergantian lagu yang tercatat.")
+        avg = sum(gaps) / len(gaps)
+        p95 = gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))]
+        await ctx.send(
+            f"⏱️ Jeda antar lagu ({len(gaps)} terakhir): rata-rata **{avg:.0f} ms**, p95 **{p95:.0f} ms** | "
+            f"prefetch hit {stats['hits']}, miss {stats['misses']}, resolve {stats['resolved']}, gagal {stats['failed']}"
+        )
+
+    @commands.command(name="resnpstats", hidden=True)
+    @commands.is_owner()
+    async def now_playing_stats(self, ctx):
+        stats = now_playing.stats
+        tracks = stats['tracks']
+        per_track = now_playing.rest_calls() / tracks if tracks else 0
+        await ctx.send(
+            f"📨 Pesan now-playing: {tracks} pergantian lagu, {stats['requested']} permintaan update → "
+            f"{stats['send']} send, {stats['edit']} edit, {stats['delete']} delete "
+            f"(**{per_track:.2f}** panggilan REST per pergantian lagu)"
+        )
+
     @commands.command(name="resstatus", help="[ADMIN] Kelola custom rotating status")
     @commands.has_permissions(administrator=True)
     async def manage_status(self, ctx, action: str = None, *, args: str = None):
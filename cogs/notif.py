@@ -17,6 +17,7 @@ from google.api_core import exceptions as google_exceptions
 from dotenv import load_dotenv 
 import base64
 import tempfile
+from cogs.persistence import get_persistence
 
 load_dotenv()
 
@@ -515,17 +516,18 @@ class Notif(commands.Cog, name="🔔 Notification"):
         self.bot = bot
         self.config_file = "data/notif.json"
 
-        self.mongo_client = getattr(bot, 'mongo_client', None)
-        if self.mongo_client:
-            self.db = self.mongo_client["reSwan"]
-            self.collection = self.db["notif_config"]
-        else:
-            self.collection = None
+        self.persistence = get_persistence(bot)
+        self.collection = "notif_config"
 
         self.default_messages = self._get_default_messages()
         self.config = self._load_config()
         self.daily_reset_task.start()
 
+    async def cog_load(self):
+        remote_config = await self.persistence.load(self.collection, "notif_config")
+        if remote_config:
+            self.config = self._load_config(remote_config)
+
     def cog_unload(self):
         self.daily_reset_task.cancel()
 
@@ -758,20 +760,13 @@ class Notif(commands.Cog, name="🔔 Notification"):
             }
         }
 
-    def _load_config(self):
+    def _load_config(self, remote_config=None):
         default_config = {
             "notification_paths": {},
             "recent_video_ids": [],
             "next_daily_reset_timestamp": None
         }
-        config = {}
-        if self.collection is not None:
-            try:
-                doc = self.collection.find_one({"_id": "notif_config"})
-                if doc and "data" in doc:
-                    config = doc["data"]
-            except Exception:
-                pass
+        config = remote_config or {}
 
         if not config:
             try:
@@ -809,11 +804,7 @@ class Notif(commands.Cog, name="🔔 Notification"):
         except Exception:
             pass
 
-        if self.collection is not None:
-            try:
-                self.collection.replace_one({"_id": "notif_config"}, {"_id": "notif_config", "data": self.config}, upsert=True)
-            except Exception:
-                pass
+        self.persistence.upsert(self.collection, "notif_config", self.config)
             
     async def _perform_daily_reset(self):
         now = datetime.datetime.now(datetime.UTC) 
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# Pembaruan yang datang dalam jeda ini digabung menjadi satu edit pesan.
+UPDATE_DELAY = 1.0
+
+# Jumlah permintaan update dan panggilan REST yang benar-benar dikirim (semua guild).
+stats = {"tracks": 0, "requested": 0, "send": 0, "edit": 0, "delete": 0}
+
+
+class NowPlayingMessage:
+    """
+    Pesan now-playing satu guild yang diedit di tempat. Objek Message disimpan
+    sehingga update cukup satu panggilan edit tanpa fetch_channel/fetch_message,
+    dan update beruntun (skip cepat, tombol) di-debounce menjadi satu edit.
+    """
+
+    def __init__(self, render):
+        self.render = render
+        self.message = None
+        self.channel = None
+        self._pending = False
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def update(self, channel=None, message=None, track_changed=False):
+        """Jadwalkan pembaruan; render() dipanggil saat edit benar-benar dikirim."""
+        stats["requested"] += 1
+        if track_changed:
+            stats["tracks"] += 1
+        if message is not None and self.message is None:
+            self.message = message
+        if channel is not None:
+            self.channel = channel
+        self._pending = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(UPDATE_DELAY)
+            self._pending = False
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error(f"Gagal memperbarui pesan now-playing: {e}")
+
+    async def flush(self):
+        async with self._lock:
+            embed, view = self.render()
+            if self.message is not None:
+                try:
+                    await self.message.edit(embed=embed, view=view)
+                    stats["edit"] += 1
+                    return
+                except discord.NotFound:
+                    self.message = None
+            if self.channel is not None:
+                self.message = await self.channel.send(embed=embed, view=view)
+                stats["send"] += 1
+
+    async def delete(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._pending = False
+        message, self.message = self.message, None
+        if message is None:
+            return
+        try:
+            await message.delete()
+            stats["delete"] += 1
+        except (discord.NotFound, discord.HTTPException):
+            pass
+
+
+def rest_calls():
+    return stats["send"] + stats["edit"] + stats["delete"]
@@ -0,0 +1,218 @@
+import asyncio
+import atexit
+import copy
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+DB_NAME = "reSwan"
+MAX_WORKERS = 4
+OP_TIMEOUT = 15
+FLUSH_DELAY = 1.0
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 120
+MAX_ATTEMPTS = 8
+MAX_RETRY_QUEUE = 200
+
+
+class MongoPersistence:
+    """
+    Lapisan persistensi MongoDB yang tidak memblokir event loop.
+    Semua panggilan pymongo dijalankan di thread pool, upsert untuk key
+    dokumen yang sama digabung (hanya versi terakhir yang ditulis), dan
+    tulisan yang gagal masuk antrean retry yang ukurannya dibatasi.
+    """
+
+    def __init__(self, client, db_name=DB_NAME):
+        self.client = client
+        self.db = client[db_name] if client is not None else None
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="mongo")
+        self._pending = {}
+        self._attempts = {}
+        self._inflight = {}
+        self._mirrors = {}
+        self._wakeup = None
+        self._worker = None
+        self._failures = 0
+
+    @property
+    def enabled(self):
+        return self.db is not None
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        return await asyncio.wait_for(loop.run_in_executor(self._executor, call), timeout=OP_TIMEOUT)
+
+    async def load(self, collection, doc_id):
+        """Ambil field `data` dari dokumen, atau None jika tidak ada / Mongo bermasalah."""
+        if not self.enabled:
+            return None
+        try:
+            doc = await self._run(self.db[collection].find_one, {"_id": doc_id})
+        except Exception as e:
+            log.warning(f"Gagal membaca {collection}/{doc_id} dari MongoDB: {e}")
+            return None
+        if doc and "data" in doc:
+            return doc["data"]
+        return None
+
+    async def preload(self, collection):
+        """Muat seluruh dokumen satu koleksi ke memori agar pembacaan berikutnya tanpa I/O."""
+        if collection in self._mirrors:
+            return self._mirrors[collection]
+        mirror = self._mirrors.setdefault(collection, {})
+        if not self.enabled:
+            return mirror
+        try:
+            docs = await self._run(lambda: list(self.db[collection].find({}, {"data": 1})))
+        except Exception as e:
+            log.warning(f"Gagal preload koleksi {collection} dari MongoDB: {e}")
+            return mirror
+        for doc in docs:
+            if "data" in doc and doc["_id"] not in mirror:
+                mirror[doc["_id"]] = doc["data"]
+        return mirror
+
+    def cached(self, collection, doc_id):
+        return self._mirrors.get(collection, {}).get(doc_id)
+
+    def upsert(self, collection, doc_id, data, mode="replace"):
+        """
+        Jadwalkan penulisan dokumen. Mode "replace" menulis {"_id", "data"},
+        mode "set" memakai $set dengan timestamp updated_at.
+        """
+        if not self.enabled:
+            return
+        mirror = self._mirrors.get(collection)
+        if mirror is not None:
+            mirror[doc_id] = data
+        key = (collection, doc_id)
+        self._pending[key] = (mode, data)
+        self._attempts.pop(key, None)
+        if self._ensure_worker():
+            self._wakeup.set()
+
+    def _ensure_worker(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._worker_loop())
+        return True
+
+    def _write(self, key, mode, data):
+        collection, doc_id = key
+        col = self.db[collection]
+        if mode == "set":
+            col.update_one({"_id": doc_id}, {"$set": {"data": data, "updated_at": time.time()}}, upsert=True)
+        else:
+            col.replace_one({"_id": doc_id}, {"_id": doc_id, "data": data}, upsert=True)
+
+    def _submit(self, key, mode, data):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._write, key, mode, data)
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._write_finished(key, f))
+        return future
+
+    def _write_finished(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if key in self._pending and self._ensure_worker():
+            self._wakeup.set()
+
+    async def _write_one(self, key, mode, data):
+        if key in self._inflight:
+            # Tulisan sebelumnya untuk dokumen ini masih berjalan di thread (kena timeout).
+            # Versi ini ditahan sampai thread itu selesai supaya snapshot lama tidak
+            # mendarat setelah yang baru.
+            self._pending.setdefault(key, (mode, data))
+            return True
+        future = self._submit(key, mode, copy.deepcopy(data))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=OP_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning(f"Menulis {key[0]}/{key[1]} ke MongoDB melewati {OP_TIMEOUT} s, menunggu thread selesai.")
+            future.add_done_callback(lambda f: self._orphan_done(key, mode, data, f))
+            return False
+        except Exception as e:
+            self._requeue(key, mode, data, e)
+            return False
+        self._attempts.pop(key, None)
+        return True
+
+    def _orphan_done(self, key, mode, data, future):
+        """Tulisan yang kena timeout akhirnya selesai: ulangi hanya jika gagal, lalu lanjutkan antrean."""
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            self._requeue(key, mode, data, error)
+        else:
+            self._attempts.pop(key, None)
+        if self._pending and self._ensure_worker():
+            self._wakeup.set()
+
+    def _requeue(self, key, mode, data, error):
+        if key in self._pending:
+            return
+        attempts = self._attempts.get(key, 0) + 1
+        if attempts > MAX_ATTEMPTS:
+            self._attempts.pop(key, None)
+            log.error(f"Menyerah menulis {key[0]}/{key[1]} ke MongoDB setelah {MAX_ATTEMPTS} percobaan: {error}")
+            return
+        if len(self._attempts) >= MAX_RETRY_QUEUE and key not in self._attempts:
+            log.error(f"Antrean retry MongoDB penuh, {key[0]}/{key[1]} dibuang: {error}")
+            return
+        self._attempts[key] = attempts
+        self._pending[key] = (mode, data)
+        log.warning(f"Gagal menulis {key[0]}/{key[1]} ke MongoDB (percobaan {attempts}): {error}")
+
+    async def _worker_loop(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(FLUSH_DELAY)
+            self._wakeup.clear()
+            batch, self._pending = self._pending, {}
+            results = await asyncio.gather(*(self._write_one(key, mode, data) for key, (mode, data) in batch.items()))
+            if all(results):
+                self._failures = 0
+                continue
+            self._failures += 1
+            delay = min(RETRY_BASE_DELAY * (2 ** (self._failures - 1)), RETRY_MAX_DELAY)
+            await asyncio.sleep(delay)
+            if self._pending:
+                self._wakeup.set()
+
+    async def flush(self):
+        batch, self._pending = self._pending, {}
+        await asyncio.gather(*(self._write_one(key, mode, data) for key, (mode, data) in batch.items()))
+
+    def flush_sync(self):
+        batch, self._pending = self._pending, {}
+        for key, (mode, data) in batch.items():
+            try:
+                self._write(key, mode, data)
+            except Exception as e:
+                log.error(f"Gagal menulis {key[0]}/{key[1]} ke MongoDB saat shutdown: {e}")
+
+
+_instance = None
+
+
+def get_persistence(bot):
+    """Satu instance untuk seluruh proses, memakai MongoClient milik bot (sudah punya connection pool)."""
+    global _instance
+    if _instance is None:
+        _instance = MongoPersistence(getattr(bot, 'mongo_client', None))
+        atexit.register(_instance.flush_sync)
+    return _instance
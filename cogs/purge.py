@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# Batas endpoint bulk delete Discord: 100 pesan per request, pesan maksimal 14 hari.
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+# Channel berbeda memakai bucket rate-limit berbeda, jadi boleh jalan paralel,
+# tapi dibatasi supaya tidak menabrak global rate limit.
+PURGE_CONCURRENCY = 5
+
+
+def group_by_channel(messages):
+    """{channel_id: [message_id, ...]} dari list (channel_id, message_id), tanpa duplikat."""
+    grouped = {}
+    for channel_id, message_id in messages:
+        ids = grouped.setdefault(channel_id, [])
+        if message_id not in ids:
+            ids.append(message_id)
+    return grouped
+
+
+async def _purge_channel(channel, message_ids, reason, result):
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    recent = [i for i in message_ids if discord.utils.snowflake_time(i) > cutoff]
+    old = [i for i in message_ids if discord.utils.snowflake_time(i) <= cutoff]
+
+    # Request dalam satu channel dikirim berurutan: semuanya berbagi bucket route yang sama.
+    for start in range(0, len(recent), BULK_DELETE_LIMIT):
+        chunk = recent[start:start + BULK_DELETE_LIMIT]
+        try:
+            await channel.delete_messages([discord.Object(id=i) for i in chunk], reason=reason)
+            result["deleted"] += len(chunk)
+        except discord.NotFound:
+            # Bulk delete gagal seluruhnya jika ada pesan yang sudah terhapus; ulangi satu per satu.
+            old.extend(chunk)
+        except discord.HTTPException as e:
+            log.warning(f"Bulk delete di channel {channel.id} gagal: {e}")
+            result["failed"] += len(chunk)
+        result["requests"] += 1
+
+    for message_id in old:
+        try:
+            await channel.get_partial_message(message_id).delete()
+            result["deleted"] += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
+            result["failed"] += 1
+        result["requests"] += 1
+
+
+async def purge_messages(guild, messages, reason=None):
+    """
+    Hapus banyak pesan sekaligus dari list (channel_id, message_id): dikelompokkan
+    per channel lalu dihapus dengan bulk delete (100 per request); pesan yang lebih
+    tua dari 14 hari dihapus satu per satu. Mengembalikan statistik purge.
+    """
+    started = time.perf_counter()
+    result = {"deleted": 0, "failed": 0, "requests": 0, "channels": 0, "elapsed": 0.0}
+    semaphore = asyncio.Semaphore(PURGE_CONCURRENCY)
+
+    async def run(channel, message_ids):
+        async with semaphore:
+            await _purge_channel(channel, message_ids, reason, result)
+
+    jobs = []
+    for channel_id, message_ids in group_by_channel(messages).items():
+        channel = guild.get_channel_or_thread(channel_id)
+        if channel is None:
+            # Pesan di guild lain (riwayat spam disimpan per user, bukan per guild).
+            continue
+        if not channel.permissions_for(guild.me).manage_messages:
+            result["failed"] += len(message_ids)
+            continue
+        jobs.append(run(channel, message_ids))
+    result["channels"] = len(jobs)
+    if jobs:
+        await asyncio.gather(*jobs)
+    result["elapsed"] = time.perf_counter() - started
+    if result["requests"]:
+        log.info(
+            f"Purge di guild {guild.id}: {result['deleted']} pesan dari {result['channels']} channel "
+            f"dengan {result['requests']} request dalam {result['elapsed']:.2f} s ({result['failed']} gagal)"
+        )
+    return result
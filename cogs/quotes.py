@@ -4,6 +4,7 @@ import json
 import os
 from datetime import datetime
 import logging
+from cogs import data_store
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -12,8 +13,6 @@ class Quotes(commands.Cog):
         self.bot = bot
         self.config_file_path = os.path.join('data', 'quotes_config.json')
         self.quotes_file_path = os.path.join('data', 'quotes.json')
-        self.bank_file_path = os.path.join('data', 'bank_data.json')
-        self.level_file_path = os.path.join('data', 'level_data.json')
         self.config = self.load_config()
 
     def load_config(self):
@@ -178,34 +177,17 @@ class Quotes(commands.Cog):
 
     async def give_reward(self, server_id, user_id, exp, rswn):
         try:
-            with open(self.level_file_path, 'r', encoding='utf-8') as f:
-                level_data = json.load(f)
-            
-            server_data = level_data.get(str(server_id), {})
-            user_levels = server_data.get(user_id, {'level': 1, 'exp': 0})
+            user_levels = data_store.get_level_user(server_id, user_id, {'level': 1, 'exp': 0})
             user_levels['exp'] += exp
 
             if user_levels['exp'] >= 10000:
                 user_levels['level'] += 1
                 user_levels['exp'] -= 10000
-            
-            if str(server_id) not in level_data:
-                level_data[str(server_id)] = {}
-            level_data[str(server_id)][user_id] = user_levels
-
-            with open(self.level_file_path, 'w', encoding='utf-8') as f:
-                json.dump(level_data, f, indent=4)
-
-            with open(self.bank_file_path, 'r', encoding='utf-8') as f:
-                bank_data = json.load(f)
-            
-            if user_id in bank_data:
-                bank_data[user_id]['balance'] += rswn
-            else:
-                bank_data[user_id] = {'balance': rswn, 'debt': 0}
+            data_store.level_store().mark_dirty(str(server_id), user_id)
 
-            with open(self.bank_file_path, 'w', encoding='utf-8') as f:
-                json.dump(bank_data, f, indent=4)
+            bank_user = data_store.get_bank_user(user_id)
+            bank_user['balance'] += rswn
+            data_store.bank_store().mark_dirty(user_id)
 
             logging.info(f"User {user_id} di server {server_id} diberi hadiah: {exp} EXP dan {rswn} RSWN.")
         except Exception as e:
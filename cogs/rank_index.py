@@ -0,0 +1,162 @@
+from sortedcontainers import SortedList
+
+from cogs import data_store
+
+FIELDS = ("exp", "weekly_exp")
+
+
+def _score(user_data, field):
+    value = user_data.get(field, 0) if isinstance(user_data, dict) else 0
+    return value if isinstance(value, (int, float)) else 0
+
+
+class _FieldIndex:
+    """Urutan user di satu guild untuk satu field (exp / weekly_exp), terbesar di depan."""
+
+    __slots__ = ("field", "scores", "order")
+
+    def __init__(self, field, users):
+        self.field = field
+        self.scores = {uid: _score(udata, field) for uid, udata in users.items()}
+        self.order = SortedList((-score, uid) for uid, score in self.scores.items())
+
+    def update(self, user_id, user_data):
+        old = self.scores.get(user_id)
+        new = None if user_data is None else _score(user_data, self.field)
+        if old == new:
+            return
+        if old is not None:
+            self.order.remove((-old, user_id))
+        if new is None:
+            del self.scores[user_id]
+        else:
+            self.scores[user_id] = new
+            self.order.add((-new, user_id))
+
+    def position(self, user_id):
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self.order.index((-score, user_id)) + 1
+
+    def __iter__(self):
+        for _, user_id in self.order:
+            yield user_id
+
+
+class RankIndex:
+    """
+    Index peringkat per guild di atas store level_data. Dibangun saat pertama
+    kali dipakai, lalu diperbarui per user lewat listener mark_dirty(guild_id, user_id).
+    mark_dirty tanpa user (save seluruh guild/file) membuat index guild dibangun ulang.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._guilds = {}
+        store.add_listener(self._on_change)
+
+    def _on_change(self, keys):
+        if len(keys) >= 2:
+            self.update(keys[0], keys[1])
+        elif keys:
+            self._guilds.pop(str(keys[0]), None)
+        else:
+            self._guilds.clear()
+
+    def _get(self, guild_id, field):
+        indexes = self._guilds.setdefault(str(guild_id), {})
+        index = indexes.get(field)
+        if index is None:
+            index = indexes[field] = _FieldIndex(field, self.store.data.get(str(guild_id), {}))
+        return index
+
+    def update(self, guild_id, user_id):
+        indexes = self._guilds.get(str(guild_id))
+        if not indexes:
+            return
+        user_data = self.store.data.get(str(guild_id), {}).get(str(user_id))
+        for index in indexes.values():
+            index.update(str(user_id), user_data)
+
+    def rank_of(self, guild_id, user_id, field="exp"):
+        """Posisi user (mulai dari 1), atau None jika user belum punya data."""
+        return self._get(guild_id, field).position(str(user_id))
+
+    def top(self, guild_id, limit, field="exp", predicate=None):
+        """List (user_id, user_data) teratas; user yang tidak lolos predicate dilewati."""
+        users = self.store.data.get(str(guild_id), {})
+        result = []
+        for user_id in self._get(guild_id, field):
+            if predicate is not None and not predicate(user_id):
+                continue
+            user_data = users.get(user_id)
+            if user_data is None:
+                continue
+            result.append((user_id, user_data))
+            if len(result) >= limit:
+                break
+        return result
+
+
+_instance = None
+
+
+def get_rank_index():
+    global _instance
+    if _instance is None:
+        _instance = RankIndex(data_store.level_store())
+    return _instance
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+
+    random.seed(1)
+    members = 100_000
+    guild_id = "1"
+
+    store = data_store.JsonStore(os.path.join(tempfile.mkdtemp(), "level_data.json"))
+    store.replace({guild_id: {
+        str(uid): {"exp": random.randint(0, 500_000), "weekly_exp": random.randint(0, 20_000), "level": 0}
+        for uid in range(members)
+    }})
+    users = store.data[guild_id]
+    index = RankIndex(store)
+    sample = random.sample(list(users), 200)
+
+    start = time.perf_counter()
+    for uid in sample[:20]:
+        sorted_users = sorted(users.items(), key=lambda x: x[1].get('exp', 0), reverse=True)
+        next(i for i, (u, _) in enumerate(sorted_users) if u == uid)
+    old_ms = (time.perf_counter() - start) / 20 * 1000
+
+    start = time.perf_counter()
+    index.rank_of(guild_id, sample[0])
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for uid in sample:
+        index.rank_of(guild_id, uid)
+    rank_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    start = time.perf_counter()
+    for uid in sample:
+        users[uid]["exp"] += random.randint(1, 50)
+        users[uid]["weekly_exp"] += 10
+        store.mark_dirty(guild_id, uid)
+    update_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(200):
+        index.top(guild_id, 10)
+    top_us = (time.perf_counter() - start) / 200 * 1e6
+
+    expected = sorted(users, key=lambda u: (-users[u]["exp"], u))
+    assert [u for u, _ in index.top(guild_id, 10)] == expected[:10]
+    assert all(index.rank_of(guild_id, uid) == expected.index(uid) + 1 for uid in sample[:5])
+    print(f"{members} member | sort penuh per !rank: {old_ms:.1f} ms | build index: {build_ms:.0f} ms | "
+          f"rank_of: {rank_us:.1f} us | update exp: {update_us:.1f} us | top 10: {top_us:.1f} us")
@@ -0,0 +1,150 @@
+import time
+from collections import deque
+
+
+class Rule:
+    """Batas: lebih dari `rate` kejadian dalam jendela geser `per` detik dianggap pelanggaran."""
+
+    __slots__ = ("name", "rate", "per")
+
+    def __init__(self, name, rate, per):
+        self.name = name
+        self.rate = rate
+        self.per = per
+
+
+# Aturan anti-spam ServerAdminCog (sebelumnya satu CooldownMapping per aturan).
+SPAM_RULES = (
+    Rule("global", 8, 15.0),
+    Rule("fast", 5, 10.0),
+    Rule("media_rapid", 5, 10.0),
+    Rule("media", 3, 30.0),
+    Rule("media_heavy", 8, 60.0),
+)
+TEXT_RULES = ("global", "fast")
+MEDIA_RULES = ("media_rapid", "media", "media_heavy")
+# Pesan yang diingat per user untuk dihapus saat spam terdeteksi.
+MESSAGE_WINDOW = 30
+MAX_TRACKED_MESSAGES = 50
+
+
+class _UserState:
+    __slots__ = ("hits", "messages", "last_seen")
+
+    def __init__(self, max_messages):
+        self.hits = {}
+        self.messages = deque(maxlen=max_messages)
+        self.last_seen = 0
+
+
+class RateLimiter:
+    """
+    Rate-limit sliding window untuk banyak aturan per user. Setiap aturan menyimpan
+    paling banyak `rate` timestamp terakhir di ring buffer (deque dengan maxlen), jadi
+    memori per user tetap terbatas berapa pun laju pesannya. Referensi pesan yang
+    dihapus saat spam terdeteksi disimpan di state yang sama.
+    """
+
+    def __init__(self, rules=SPAM_RULES, message_window=MESSAGE_WINDOW, max_messages=MAX_TRACKED_MESSAGES):
+        self.rules = {rule.name: rule for rule in rules}
+        self.message_window = message_window
+        self.max_messages = max_messages
+        self.idle_after = max([rule.per for rule in rules] + [message_window])
+        self._users = {}
+
+    def __len__(self):
+        return len(self._users)
+
+    def hit(self, key, rule_names, now=None, channel_id=None, message_id=None):
+        """Catat satu pesan untuk semua aturan sekaligus; kembalikan set nama aturan yang terlampaui."""
+        now = time.time() if now is None else now
+        state = self._users.get(key)
+        if state is None:
+            state = self._users[key] = _UserState(self.max_messages)
+        state.last_seen = now
+        if message_id is not None:
+            state.messages.append((now, channel_id, message_id))
+        violated = set()
+        for name in rule_names:
+            rule = self.rules[name]
+            window = state.hits.get(name)
+            if window is None:
+                window = state.hits[name] = deque(maxlen=rule.rate)
+            # Buffer penuh dan kejadian tertua masih di dalam jendela: ini kejadian ke-(rate + 1).
+            if len(window) == rule.rate and now - window[0] < rule.per:
+                violated.add(name)
+            window.append(now)
+        return violated
+
+    def take_messages(self, key, window=None, now=None):
+        """Ambil (dan lupakan) pesan user dari `window` detik terakhir sebagai list (channel_id, message_id)."""
+        state = self._users.get(key)
+        if state is None:
+            return []
+        now = time.time() if now is None else now
+        window = self.message_window if window is None else window
+        messages = [(channel_id, message_id) for at, channel_id, message_id in state.messages if now - at <= window]
+        state.messages.clear()
+        return messages
+
+    def sweep(self, now=None):
+        """Buang state user yang sudah tidak aktif lebih lama dari jendela terpanjang."""
+        now = time.time() if now is None else now
+        idle = [key for key, state in self._users.items() if now - state.last_seen > self.idle_after]
+        for key in idle:
+            del self._users[key]
+        return len(idle)
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description="Load test RateLimiter: memutar ulang aliran pesan sintetis.")
+    parser.add_argument("--rate", type=int, default=10000, help="pesan per detik (waktu simulasi)")
+    parser.add_argument("--seconds", type=int, default=30, help="lama aliran pesan (waktu simulasi)")
+    parser.add_argument("--users", type=int, default=50000, help="jumlah user aktif")
+    parser.add_argument("--spammers", type=float, default=0.01, help="porsi user yang mengirim 20x lebih sering")
+    parser.add_argument("--media", type=float, default=0.1, help="porsi pesan yang berisi lampiran")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    spammers = max(1, int(args.users * args.spammers))
+    # Spammer mendapat bobot 20x, sisanya user biasa.
+    weights = [20] * spammers + [1] * (args.users - spammers)
+    total = args.rate * args.seconds
+    authors = rng.choices(range(args.users), weights=weights, k=total)
+    has_media = [rng.random() < args.media for _ in range(total)]
+
+    limiter = RateLimiter()
+    tracemalloc.start()
+    violations = 0
+    deletions = 0
+    latencies = []
+    started = time.perf_counter()
+    for i in range(total):
+        now = i / args.rate
+        rules = TEXT_RULES + MEDIA_RULES if has_media[i] else TEXT_RULES
+        t0 = time.perf_counter()
+        violated = limiter.hit(authors[i], rules, now=now, channel_id=i % 50, message_id=i)
+        if "global" in violated or "fast" in violated:
+            deletions += len(limiter.take_messages(authors[i], now=now))
+        if i % 100 == 0:
+            latencies.append(time.perf_counter() - t0)
+        violations += bool(violated)
+        if i % args.rate == 0:
+            limiter.sweep(now)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    throughput = total / elapsed
+    print(f"{total} pesan ({args.rate}/s selama {args.seconds} s simulasi, {args.users} user) diproses dalam {elapsed:.2f} s")
+    print(f"throughput {throughput:,.0f} pesan/s ({throughput / args.rate:.1f}x target) | "
+          f"latensi p50 {latencies[len(latencies) // 2] * 1e6:.1f} us, p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us")
+    print(f"{violations} pesan melanggar, {deletions} referensi pesan diambil untuk dihapus | "
+          f"{len(limiter)} user di memori, puncak memori {peak / 1024 / 1024:.1f} MiB")
+    if throughput < args.rate:
+        raise SystemExit("GAGAL: limiter tidak mampu mengikuti laju target.")
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import discord
+
+from cogs import data_store
+
+log = logging.getLogger(__name__)
+
+SANCTIONS_FILE = os.path.join(data_store.BASE_DIR, "data", "global_sanctions.json")
+# Timeout di guild berbeda memakai bucket route berbeda, jadi bisa paralel; batas ini
+# menjaga agar tetap di bawah global rate limit.
+SANCTION_CONCURRENCY = 10
+
+OK = "ok"
+NOT_MEMBER = "bukan member"
+ALREADY = "sudah timeout"
+FORBIDDEN = "izin kurang"
+
+
+class MembershipIndex:
+    """user_id -> set guild_id, diisi sekali dari cache member lalu dijaga lewat event member/guild."""
+
+    def __init__(self):
+        self._guilds = {}
+        self.built = False
+
+    def build(self, guilds):
+        self._guilds.clear()
+        for guild in guilds:
+            self.add_guild(guild)
+        self.built = True
+
+    def add_guild(self, guild):
+        for member in guild.members:
+            self._guilds.setdefault(member.id, set()).add(guild.id)
+
+    def drop_guild(self, guild_id):
+        for user_id in [u for u, guilds in self._guilds.items() if guild_id in guilds]:
+            self.remove(user_id, guild_id)
+
+    def add(self, user_id, guild_id):
+        self._guilds.setdefault(user_id, set()).add(guild_id)
+
+    def remove(self, user_id, guild_id):
+        guilds = self._guilds.get(user_id)
+        if guilds is not None:
+            guilds.discard(guild_id)
+            if not guilds:
+                del self._guilds[user_id]
+
+    def guilds_of(self, user_id):
+        return set(self._guilds.get(user_id, ()))
+
+
+class SanctionDispatcher:
+    """
+    Timeout global (lintas guild) untuk satu user, dikirim paralel ke semua guild
+    tempat user itu menjadi member. Progres per guild disimpan ke
+    data/global_sanctions.json sehingga sanksi yang terpotong restart dilanjutkan.
+    """
+
+    def __init__(self, bot, index, on_complete=None):
+        self.bot = bot
+        self.index = index
+        self.on_complete = on_complete
+        self.store = data_store.get_store(SANCTIONS_FILE)
+        self._tasks = {}
+
+    def dispatch(self, user_id, duration, reason, origin_guild_id=None, origin_channel_id=None):
+        """Mulai (atau kembalikan yang sedang jalan) timeout global untuk user; tidak menunggu selesai."""
+        task = self._tasks.get(user_id)
+        if task is not None and not task.done():
+            return task
+        if not self.index.built:
+            self.index.build(self.bot.guilds)
+        job = {
+            "until": (discord.utils.utcnow() + duration).timestamp(),
+            "reason": reason,
+            "origin_guild_id": origin_guild_id,
+            "origin_channel_id": origin_channel_id,
+            "started_at": time.time(),
+            "pending": sorted(self.index.guilds_of(user_id)),
+            "results": {},
+        }
+        self.store.data[str(user_id)] = job
+        self.store.mark_dirty(str(user_id))
+        return self._start(user_id, job)
+
+    def resume(self):
+        """Lanjutkan sanksi yang belum selesai sebelum bot restart."""
+        for user_id, job in list(self.store.data.items()):
+            if int(user_id) not in self._tasks:
+                self._start(int(user_id), job)
+
+    def _start(self, user_id, job):
+        task = self._tasks[user_id] = asyncio.create_task(self._run(user_id, job))
+        task.add_done_callback(lambda t: self._tasks.pop(user_id, None) if self._tasks.get(user_id) is t else None)
+        return task
+
+    async def _run(self, user_id, job):
+        until = datetime.fromtimestamp(job["until"], tz=timezone.utc)
+        semaphore = asyncio.Semaphore(SANCTION_CONCURRENCY)
+
+        async def apply(guild_id):
+            async with semaphore:
+                outcome = await self._timeout_in_guild(guild_id, user_id, until, job["reason"])
+            job["results"][str(guild_id)] = outcome
+            if guild_id in job["pending"]:
+                job["pending"].remove(guild_id)
+            self.store.mark_dirty(str(user_id))
+
+        if until > discord.utils.utcnow():
+            await asyncio.gather(*(apply(guild_id) for guild_id in list(job["pending"])))
+        job["pending"] = []
+        job["elapsed"] = time.time() - job["started_at"]
+        self.store.data.pop(str(user_id), None)
+        self.store.mark_dirty(str(user_id))
+        log.info(f"Timeout global user {user_id}: {len(job['results'])} guild dalam {job['elapsed']:.1f} s")
+        if self.on_complete is not None:
+            try:
+                await self.on_complete(user_id, job)
+            except Exception as e:
+                log.error(f"Gagal melaporkan timeout global user {user_id}: {e}", exc_info=True)
+        return job
+
+    async def _timeout_in_guild(self, guild_id, user_id, until, reason):
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member is None:
+            return NOT_MEMBER
+        if member.is_timed_out():
+            return ALREADY
+        try:
+            await member.timeout(until, reason=reason)
+            return OK
+        except discord.Forbidden:
+            return FORBIDDEN
+        except discord.HTTPException as e:
+            return f"gagal ({e.status})"
+
+
+def summarize(job):
+    """Ringkasan hasil per guild: {hasil: jumlah guild}."""
+    summary = {}
+    for outcome in job["results"].values():
+        summary[outcome] = summary.get(outcome, 0) + 1
+    return summary
@@ -0,0 +1,122 @@
+import re
+
+# Pola link mencurigakan yang dipakai ServerAdminCog.detect_suspicious_links,
+# digabung jadi satu regex agar cukup satu kali scan per pesan.
+SUSPICIOUS_LINK_PATTERNS = [
+    r'discord\.gift', r'discord\.com\/gifts', r'discordapp\.com\/gifts',
+    r'free-nitro', r'steam-community', r'steamcommunity\.com',
+    r'bit\.ly', r'tinyurl\.com', r'shorturl\.at', r'rb\.gy',
+    r'discord-nitro', r'claim-reward', r'free-gift'
+]
+SUSPICIOUS_LINK_REGEX = re.compile("|".join(SUSPICIOUS_LINK_PATTERNS), re.IGNORECASE)
+SUSPICIOUS_URL_REGEX = re.compile(r'discordgift|nitro-free|steamgift', re.IGNORECASE)
+
+
+def _build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return trie
+
+
+def _trie_to_pattern(node):
+    # Kata yang lebih pendek sudah cukup untuk cek "mengandung", jadi cabang
+    # di bawah node akhir kata tidak perlu dimasukkan ke regex.
+    if "" in node:
+        return ""
+    singles = []
+    branches = []
+    for ch in sorted(node):
+        sub = _trie_to_pattern(node[ch])
+        if sub:
+            branches.append(re.escape(ch) + sub)
+        else:
+            singles.append(re.escape(ch))
+    if singles:
+        branches.append(singles[0] if len(singles) == 1 else "[" + "".join(singles) + "]")
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+class KeywordMatcher:
+    """
+    Cek substring untuk banyak kata sekaligus (case-insensitive).
+    Daftar kata dikompilasi menjadi satu regex berbentuk trie, sehingga biaya
+    scan ditentukan panjang pesan, bukan jumlah kata di daftar.
+    """
+
+    __slots__ = ("words", "_regex")
+
+    def __init__(self, words):
+        self.words = sorted({w.lower().strip() for w in words if isinstance(w, str) and w.strip()})
+        self._regex = re.compile(_trie_to_pattern(_build_trie(self.words))) if self.words else None
+
+    def __bool__(self):
+        return self._regex is not None
+
+    def search(self, text_lower):
+        """Kembalikan kata pertama yang ditemukan di teks (sudah lower-case), atau None."""
+        if self._regex is None:
+            return None
+        match = self._regex.search(text_lower)
+        return match.group(0) if match else None
+
+
+_EMPTY = KeywordMatcher([])
+_matchers = {}
+
+
+def get_matcher(key, version, words):
+    """
+    Ambil matcher dari cache bersama. Matcher hanya dibangun ulang jika
+    `version` berbeda dari versi saat terakhir dibangun (filter berubah).
+    `words` boleh berupa callable agar daftar kata (misal gabungan beberapa
+    daftar) hanya disusun saat matcher perlu dibangun ulang.
+    """
+    entry = _matchers.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    if callable(words):
+        words = words()
+    matcher = KeywordMatcher(words) if words else _EMPTY
+    _matchers[key] = (version, matcher)
+    return matcher
+
+
+def contains_suspicious_link(content, url_regex):
+    if SUSPICIOUS_LINK_REGEX.search(content):
+        return True
+    return any(SUSPICIOUS_URL_REGEX.search(url) for url in url_regex.findall(content))
+
+
+if __name__ == "__main__":
+    import random
+    import string
+    import time
+
+    random.seed(1)
+
+    def random_word():
+        return "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10)))
+
+    words = [random_word() for _ in range(10000)]
+    messages = [" ".join(random_word() for _ in range(20)) for _ in range(1000)]
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(words)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    naive_hits = sum(1 for msg in messages if any(w in msg.lower() for w in words))
+    naive_us = (time.perf_counter() - start) / len(messages) * 1e6
+
+    start = time.perf_counter()
+    compiled_hits = sum(1 for msg in messages if matcher.search(msg.lower()))
+    compiled_us = (time.perf_counter() - start) / len(messages) * 1e6
+
+    assert naive_hits == compiled_hits
+    print(f"10k kata | build: {build_ms:.1f} ms | loop lama: {naive_us:.1f} us/pesan | matcher: {compiled_us:.1f} us/pesan | hit: {compiled_hits}")
@@ -0,0 +1,128 @@
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
+from cogs import data_store
+
+TRACK_CACHE_FILE = os.path.join(data_store.BASE_DIR, "data", "track_cache.json")
+
+MAX_QUERIES = 5000
+MAX_VIDEOS = 5000
+QUERY_TTL = 30 * 86400
+METADATA_TTL = 7 * 86400
+# URL stream YouTube ditandatangani dan kedaluwarsa (parameter expire=), jadi
+# dipakai hanya sampai sedikit sebelum waktu itu.
+STREAM_TTL = 3 * 3600
+STREAM_EXPIRY_MARGIN = 600
+
+META_FIELDS = ("title", "artist", "uploader", "duration", "thumbnail", "webpage_url")
+
+
+def _store():
+    # Bisa mencapai beberapa MB (URL stream bertanda tangan ~1KB per video).
+    return data_store.get_store(TRACK_CACHE_FILE, compact=True)
+
+
+def _section(name):
+    return _store().data.setdefault(name, {})
+
+
+def _touch(section, key, entry):
+    # dict menjaga urutan insert: pindahkan ke belakang = paling baru dipakai (LRU).
+    section.pop(key, None)
+    section[key] = entry
+
+
+def _evict(section, limit):
+    while len(section) > limit:
+        section.pop(next(iter(section)))
+
+
+def query_key(search_query):
+    return "q:" + " ".join(search_query.lower().split())
+
+
+def spotify_key(track_id):
+    return f"spotify:{track_id}"
+
+
+def get_url(key):
+    """URL YouTube untuk query/ID Spotify, atau None jika belum ada / kedaluwarsa."""
+    queries = _section("queries")
+    entry = queries.get(key)
+    if not entry:
+        return None
+    if time.time() - entry.get("at", 0) > QUERY_TTL:
+        queries.pop(key, None)
+        _store().mark_dirty("queries")
+        return None
+    _touch(queries, key, entry)
+    return entry["url"]
+
+
+def put_url(key, url):
+    queries = _section("queries")
+    _touch(queries, key, {"url": url, "at": time.time()})
+    _evict(queries, MAX_QUERIES)
+    _store().mark_dirty("queries")
+
+
+def _stream_expiry(stream_url, now):
+    try:
+        expire = int(parse_qs(urlparse(stream_url).query).get("expire", [0])[0])
+    except (TypeError, ValueError):
+        expire = 0
+    default = now + STREAM_TTL
+    return min(expire - STREAM_EXPIRY_MARGIN, default) if expire else default
+
+
+def get_video(url):
+    """Metadata video (title, artist, duration, ...) untuk URL, atau None."""
+    videos = _section("videos")
+    entry = videos.get(url)
+    if not entry:
+        return None
+    if time.time() - entry.get("at", 0) > METADATA_TTL:
+        videos.pop(url, None)
+        _store().mark_dirty("videos")
+        return None
+    _touch(videos, url, entry)
+    return entry
+
+
+def get_stream(url, min_ttl=0):
+    """Data siap-putar (metadata + URL stream yang masih berlaku minimal min_ttl detik), atau None."""
+    entry = get_video(url)
+    if not entry or not entry.get("stream_url") or entry.get("stream_expires", 0) <= time.time() + min_ttl:
+        return None
+    return entry
+
+
+def put_video(info, *aliases, with_stream=False):
+    """
+    Simpan metadata dari hasil ytdl.extract_info. with_stream=True hanya untuk
+    hasil yang sudah diproses (format terpilih), sehingga info["url"] adalah URL stream.
+    """
+    webpage_url = info.get("webpage_url")
+    if not webpage_url:
+        return None
+    now = time.time()
+    videos = _section("videos")
+    entry = dict(videos.get(webpage_url) or {})
+    entry.update({field: info[field] for field in META_FIELDS if info.get(field) is not None})
+    if not entry.get("artist"):
+        entry["artist"] = info.get("uploader")
+    stream_url = info.get("url")
+    if with_stream and stream_url and stream_url != webpage_url:
+        entry["stream_url"] = stream_url
+        entry["stream_expires"] = _stream_expiry(stream_url, now)
+        # Codec stream dipakai jalur Opus passthrough agar tidak perlu ffprobe.
+        entry["acodec"] = info.get("acodec")
+        entry["abr"] = info.get("abr")
+    entry["at"] = now
+    for key in {webpage_url, *aliases}:
+        if key:
+            _touch(videos, key, entry)
+    _evict(videos, MAX_VIDEOS)
+    _store().mark_dirty("videos")
+    return entry
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+
+from cogs import track_cache
+
+log = logging.getLogger(__name__)
+
+# Jumlah pencarian YouTube yang boleh berjalan bersamaan untuk satu playlist.
+SEARCH_CONCURRENCY = int(os.getenv("MUSIC_SEARCH_CONCURRENCY", "4"))
+
+
+def spotify_search_query(track):
+    return f"{track['name']} {track['artists'][0]['name']} audio"
+
+
+async def fetch_spotify_tracks(spotify, query):
+    """Ambil semua track playlist/album Spotify di thread, mengikuti paginasi (lebih dari 100 item)."""
+    is_playlist = "playlist" in query
+    fetch_page = spotify.playlist_tracks if is_playlist else spotify.album_tracks
+    page = await asyncio.to_thread(fetch_page, query)
+
+    tracks = []
+    while page:
+        for item in page.get('items', []):
+            track = item.get('track') if is_playlist else item
+            if track and track.get('name') and track.get('artists'):
+                tracks.append(track)
+        page = await asyncio.to_thread(spotify.next, page) if page.get('next') else None
+    return tracks
+
+
+async def search_youtube(ytdl, search_query):
+    """URL video YouTube pertama untuk query (dari cache jika ada), atau None jika tidak ada hasil."""
+    key = track_cache.query_key(search_query)
+    url = track_cache.get_url(key)
+    if url:
+        return url
+    info = await asyncio.to_thread(lambda: ytdl.extract_info(search_query, download=False, process=True))
+    entries = info.get('entries') if info else None
+    if isinstance(entries, list) and entries and entries[0]:
+        entry = entries[0]
+        url = entry.get('webpage_url')
+        if url:
+            track_cache.put_url(key, url)
+            track_cache.put_video(entry, with_stream=True)
+        return url
+    return None
+
+
+async def resolve_spotify_track(ytdl, track):
+    """Cari URL YouTube untuk track Spotify; hasil diingat per ID track Spotify."""
+    key = track_cache.spotify_key(track['id']) if track.get('id') else None
+    url = track_cache.get_url(key) if key else None
+    if url:
+        return url
+    url = await search_youtube(ytdl, spotify_search_query(track))
+    if url and key:
+        track_cache.put_url(key, url)
+    return url
+
+
+async def resolve_in_order(items, resolve, concurrency=SEARCH_CONCURRENCY):
+    """
+    Async generator yang menjalankan resolve(item) secara paralel (dibatasi semaphore)
+    tetapi menghasilkan URL sesuai urutan playlist, segera setelah tersedia.
+    Pencarian yang belum selesai dibatalkan saat generator ditutup.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            try:
+                return await resolve(item)
+            except Exception as e:
+                log.warning(f"Gagal me-resolve track: {e}")
+                return None
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for task in tasks:
+            url = await task
+            if url:
+                yield url
+    finally:
+        for task in tasks:
+            task.cancel()
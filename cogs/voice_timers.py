@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def has_humans(channel):
+    return any(not member.bot for member in channel.members)
+
+
+class DeadlineTimers:
+    """
+    Timer per key (misal id channel) yang bisa dibatalkan. Dipakai untuk aksi
+    "kalau channel masih kosong setelah N detik": dijadwalkan saat user terakhir
+    keluar dan dibatalkan begitu ada yang masuk lagi.
+    """
+
+    def __init__(self):
+        self._timers = {}
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def __len__(self):
+        return len(self._timers)
+
+    def schedule(self, key, delay, callback):
+        """Jalankan await callback() setelah delay detik; timer lama dengan key sama diganti."""
+        self.cancel(key)
+        self._timers[key] = asyncio.create_task(self._run(key, delay, callback))
+
+    def cancel(self, key):
+        task = self._timers.pop(key, None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    def cancel_all(self):
+        for key in list(self._timers):
+            self.cancel(key)
+
+    async def _run(self, key, delay, callback):
+        await asyncio.sleep(delay)
+        if self._timers.get(key) is asyncio.current_task():
+            del self._timers[key]
+        try:
+            await callback()
+        except Exception as e:
+            log.error(f"Timer {key} gagal: {e}", exc_info=True)
@@ -0,0 +1,55 @@
+import time
+
+
+class VoiceSessionTracker:
+    """
+    Mencatat sesi voice per (guild_id, user_id) dari event on_voice_state_update.
+    Waktu dikreditkan per menit penuh: saat sesi berakhir atau saat checkpoint,
+    menit yang sudah lewat dipindah ke `pending` untuk di-commit sekali per tick.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.sessions = {}
+        self.pending = {}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def start(self, guild_id, user_id):
+        self.sessions.setdefault((str(guild_id), str(user_id)), self.clock())
+
+    def stop(self, guild_id, user_id):
+        key = (str(guild_id), str(user_id))
+        credited_until = self.sessions.pop(key, None)
+        if credited_until is not None:
+            self._credit(key, credited_until, self.clock())
+
+    def is_active(self, guild_id, user_id):
+        return (str(guild_id), str(user_id)) in self.sessions
+
+    def _credit(self, key, credited_until, now):
+        minutes = int((now - credited_until) // 60)
+        if minutes > 0:
+            self.pending[key] = self.pending.get(key, 0) + minutes
+        return credited_until + minutes * 60
+
+    def checkpoint(self):
+        """Kreditkan menit penuh dari semua sesi aktif ke pending (sisa detik tetap di sesi)."""
+        now = self.clock()
+        for key, credited_until in self.sessions.items():
+            self.sessions[key] = self._credit(key, credited_until, now)
+
+    def drain(self):
+        """Ambil dan kosongkan pending: {(guild_id, user_id): menit}."""
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def reconcile(self, guild_id, eligible_user_ids):
+        """Samakan sesi satu guild dengan state voice saat ini (setelah startup/reconnect)."""
+        guild_id = str(guild_id)
+        eligible = {str(uid) for uid in eligible_user_ids}
+        for key in [k for k in self.sessions if k[0] == guild_id and k[1] not in eligible]:
+            self.stop(*key)
+        for user_id in eligible:
+            self.start(guild_id, user_id)
@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 from datetime import datetime, timezone 
 import zipfile
 import time 
+from cogs import asset_cache
 
 base_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
 
@@ -91,47 +92,51 @@ def save_cookies_from_env():
     except Exception as e:
         log.error(f"❌ Failed to decode or save cookies: {e}")
 
-mongo_uri = os.getenv("MONGODB_URI")
-if not mongo_uri:
-    log.critical("Environment variable MONGODB_URI not found. Bot cannot connect to MongoDB.")
-    raise ValueError("Environment variable MONGODB_URI not found. Please set it up.")
-
 client = None
 db = None
 collection = None
 
 MAX_RETRIES = 3
 RETRY_DELAY = 5 
+MONGO_POOL_SIZE = 10
 
-for attempt in range(MAX_RETRIES):
-    try:
-        log.info(f"Attempting to connect to MongoDB... (Percobaan {attempt + 1}/{MAX_RETRIES})")
-        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-        db = client["reSwan"]
-        collection = db["Data collection"]
-        client.admin.command('ping') 
-        log.info("✅ Successfully connected to MongoDB!")
-        break
-    except pymongo_errors.ServerSelectionTimeoutError as err:
-        log.critical(f"❌ MongoDB Server Selection Timeout: {err}. Mencoba lagi dalam {RETRY_DELAY}s.")
-    except pymongo_errors.ConfigurationError as err:
-        log.critical(f"❌ MongoDB Configuration Error: {err}. Mencoba lagi dalam {RETRY_DELAY}s.")
-    except Exception as e:
-        log.critical(f"❌ An unexpected error occurred during MongoDB connection: {e}. Mencoba lagi dalam {RETRY_DELAY}s.")
-    
-    if attempt == MAX_RETRIES - 1:
-        raise Exception("MongoDB connection failed after multiple retries.") from e
+def connect_mongo():
+    global client, db, collection
+    mongo_uri = os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        log.critical("Environment variable MONGODB_URI not found. Bot cannot connect to MongoDB.")
+        raise ValueError("Environment variable MONGODB_URI not found. Please set it up.")
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            log.info(f"Attempting to connect to MongoDB... (Percobaan {attempt + 1}/{MAX_RETRIES})")
+            client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000, maxPoolSize=MONGO_POOL_SIZE)
+            db = client["reSwan"]
+            collection = db["Data collection"]
+            client.admin.command('ping') 
+            log.info("✅ Successfully connected to MongoDB!")
+            break
+        except pymongo_errors.ServerSelectionTimeoutError as err:
+            log.critical(f"❌ MongoDB Server Selection Timeout: {err}. Mencoba lagi dalam {RETRY_DELAY}s.")
+        except pymongo_errors.ConfigurationError as err:
+            log.critical(f"❌ MongoDB Configuration Error: {err}. Mencoba lagi dalam {RETRY_DELAY}s.")
+        except Exception as e:
+            log.critical(f"❌ An unexpected error occurred during MongoDB connection: {e}. Mencoba lagi dalam {RETRY_DELAY}s.")
+        
+        if attempt == MAX_RETRIES - 1:
+            raise Exception("MongoDB connection failed after multiple retries.")
 
-    time.sleep(RETRY_DELAY) 
+        time.sleep(RETRY_DELAY) 
 
-try:
-    from keep_alive import keep_alive
-    keep_alive()
-    log.info("✅ `keep_alive.py` found and initiated.")
-except ImportError:
-    log.warning("`keep_alive.py` not found. If you are not using Replit, this is normal.")
-except Exception as e:
-    log.error(f"❌ Error calling keep_alive: {e}", exc_info=True)
+def start_keep_alive():
+    try:
+        from keep_alive import keep_alive
+        keep_alive()
+        log.info("✅ `keep_alive.py` found and initiated.")
+    except ImportError:
+        log.warning("`keep_alive.py` not found. If you are not using Replit, this is normal.")
+    except Exception as e:
+        log.error(f"❌ Error calling keep_alive: {e}", exc_info=True)
 
 class CogBackupView(ui.View):
     def __init__(self, ctx, files, webhook_url, log_obj):
@@ -262,7 +267,6 @@ intents.members = True
 intents.voice_states = True
 
 bot = commands.Bot(command_prefix=("!", "?"), intents=intents, help_command=None)
-bot.mongo_client = client
 
 @bot.event
 async def on_resumed():
@@ -684,8 +688,15 @@ async def load_cogs():
 async def setup_hook():
     log.info("🚀 Memulai setup_hook dan memuat cogs...")
     bot.session = aiohttp.ClientSession()
+    bot.loop.create_task(asset_cache.prefetch())
     await load_cogs()
     log.info("✅ setup_hook selesai.")
 
-save_cookies_from_env()
-bot.run(os.getenv("DISCORD_TOKEN"))
+# Worker render kartu (ProcessPoolExecutor "spawn") mengimpor ulang file ini sebagai
+# __mp_main__; startup bot hanya boleh jalan di proses utama.
+if __name__ == "__main__":
+    connect_mongo()
+    start_keep_alive()
+    bot.mongo_client = client
+    save_cookies_from_env()
+    bot.run(os.getenv("DISCORD_TOKEN"))